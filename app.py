@@ -13,7 +13,9 @@ from web.app import create_app
 
 if __name__ == '__main__':
     app = create_app()
-    print("Starting Data Analytics Dashboard...")
+    # Development server only; production uses gunicorn (gunicorn -c gunicorn.conf.py wsgi:app)
+    debug_mode = os.environ.get('FLASK_DEBUG', 'False').lower() == 'true'
+    print("Starting Data Analytics Dashboard (development server)...")
     print("Access the application at: http://localhost:5000")
     print("Default login: admin@example.com / admin123")
-    app.run(debug=True, host='0.0.0.0', port=5000)
+    app.run(debug=debug_mode, host='0.0.0.0', port=5000, threaded=True)
@@ -0,0 +1,89 @@
+"""
+Gunicorn configuration for the production launch mode
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+Preforking server: WEB_WORKERS processes, each serving WEB_THREADS requests
+concurrently (gthread worker). Every process has its own SQLAlchemy connection
+pool (DB_POOL_SIZE / DB_MAX_OVERFLOW, see core.database.get_engine_options),
+so PostgreSQL sees at most WEB_WORKERS * (DB_POOL_SIZE + DB_MAX_OVERFLOW)
+connections. Keep DB_POOL_SIZE >= WEB_THREADS.
+
+Environment:
+- WEB_BIND: listen address (default 0.0.0.0:5000)
+- WEB_WORKERS: worker processes (default 2 * CPU + 1)
+- WEB_THREADS: threads per worker (default 4)
+- WEB_TIMEOUT: seconds before a silent worker is restarted (default 120)
+- WEB_MAX_REQUESTS: restart a worker after this many requests, 0 = never (default 0)
+- WEB_GRACEFUL_TIMEOUT: seconds a stopping worker gets on shutdown/reload (default 30)
+- WEB_UPLOAD_DRAIN_TIMEOUT: seconds a recycled worker waits for its upload jobs (default 600)
+- WEB_PRELOAD: import the app in the master before forking (default false)
+
+Upload jobs run in threads of the worker that received them. A worker that
+exits waits for its queue in worker_exit: up to WEB_UPLOAD_DRAIN_TIMEOUT when
+it is recycled by max_requests (it keeps sending heartbeats, so WEB_TIMEOUT
+does not kill it), but at most WEB_GRACEFUL_TIMEOUT on shutdown or reload,
+after which the master kills it. Jobs that do not finish are requeued or
+marked failed by the next worker (UploadJobQueue.recover_stale_jobs), so
+recycling loses no uploads but may restart a long one; keep WEB_MAX_REQUESTS
+at 0 unless memory growth requires it.
+"""
+import multiprocessing
+import os
+
+bind = os.environ.get('WEB_BIND', '0.0.0.0:5000')
+workers = int(os.environ.get('WEB_WORKERS', multiprocessing.cpu_count() * 2 + 1))
+threads = int(os.environ.get('WEB_THREADS', 4))
+worker_class = 'gthread'
+
+# Uploads are saved by the request thread before being queued, so allow slow clients
+timeout = int(os.environ.get('WEB_TIMEOUT', 120))
+graceful_timeout = int(os.environ.get('WEB_GRACEFUL_TIMEOUT', 30))
+keepalive = 5
+
+# Optional periodic recycling to bound memory growth from large DataFrames (off by default,
+# a recycled worker first drains its upload queue, see worker_exit)
+max_requests = int(os.environ.get('WEB_MAX_REQUESTS', 0))
+max_requests_jitter = max_requests // 10
+UPLOAD_DRAIN_TIMEOUT = int(os.environ.get('WEB_UPLOAD_DRAIN_TIMEOUT', 600))
+
+preload_app = os.environ.get('WEB_PRELOAD', 'false').lower() in ('1', 'true', 'yes')
+
+accesslog = os.environ.get('WEB_ACCESS_LOG', '-')
+errorlog = '-'
+loglevel = os.environ.get('WEB_LOG_LEVEL', 'info')
+
+
+def post_fork(server, worker):
+    """
+    Drop connections inherited from the master when the app is preloaded
+
+    create_app() connects to the database (db.create_all), and pooled sockets
+    must not be shared between processes.
+    """
+    if not preload_app:
+        return
+
+    from core.database import db
+
+    app = worker.app.wsgi()
+    with app.app_context():
+        db.engine.dispose(close=False)
+
+
+def worker_exit(server, worker):
+    """
+    Let queued and running upload jobs of the exiting worker finish
+
+    Heartbeats keep the master from killing a recycled worker while it drains;
+    on shutdown the master still kills it after graceful_timeout.
+    """
+    try:
+        app = worker.app.wsgi()
+    except Exception as e:
+        server.log.warning(f"Upload queue not drained, app not loaded: {e}")
+        return
+
+    upload_jobs = app.extensions.get('upload_jobs')
+    if upload_jobs is not None:
+        upload_jobs.drain(UPLOAD_DRAIN_TIMEOUT, tick=worker.notify)
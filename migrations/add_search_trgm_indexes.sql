@@ -0,0 +1,29 @@
+-- Index pencarian untuk data_analytics
+-- Filter teks (nama pasien, MRN, DPJP, INACBG, diagnosa, prosedur) memakai ILIKE '%nilai%'
+-- yang dilayani index GIN pg_trgm, nomor SEP/kartu dicari sebagai prefix (LIKE 'nilai%')
+-- dan kode kelas/rawat memakai equality.
+--
+-- Jalankan: python tools/run_sql_files.py migrations/add_search_trgm_indexes.sql
+-- Untuk tabel besar yang sedang dipakai, jalankan tiap CREATE INDEX secara terpisah
+-- dengan CREATE INDEX CONCURRENTLY supaya tabel tidak terkunci.
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+-- Trigram (ILIKE '%nilai%' dan similarity() untuk ranking /search)
+CREATE INDEX IF NOT EXISTS ix_data_analytics_nama_pasien_trgm ON data_analytics USING gin (nama_pasien gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS ix_data_analytics_mrn_trgm ON data_analytics USING gin (mrn gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS ix_data_analytics_dpjp_trgm ON data_analytics USING gin (dpjp gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS ix_data_analytics_inacbg_trgm ON data_analytics USING gin (inacbg gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS ix_data_analytics_deskripsi_inacbg_trgm ON data_analytics USING gin (deskripsi_inacbg gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS ix_data_analytics_diaglist_trgm ON data_analytics USING gin (diaglist gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS ix_data_analytics_proclist_trgm ON data_analytics USING gin (proclist gin_trgm_ops);
+
+-- Prefix (LIKE 'nilai%') dan equality MRN untuk ranking /search
+CREATE INDEX IF NOT EXISTS ix_data_analytics_sep_pattern ON data_analytics (sep varchar_pattern_ops);
+CREATE INDEX IF NOT EXISTS ix_data_analytics_nokartu_pattern ON data_analytics (nokartu text_pattern_ops);
+CREATE INDEX IF NOT EXISTS ix_data_analytics_mrn_pattern ON data_analytics (mrn text_pattern_ops);
+
+-- Equality untuk kode dengan sedikit variasi nilai
+CREATE INDEX IF NOT EXISTS ix_data_analytics_kelas_rawat ON data_analytics (kelas_rawat);
+
+ANALYZE data_analytics;
@@ -0,0 +1,40 @@
+-- =============================================
+-- MIGRATION SCRIPT: Typed date columns untuk data_analytics
+-- Database: DAV (Data Analytics Visualization)
+-- =============================================
+-- admission_date, discharge_date dan birth_date sebelumnya disimpan sebagai TEXT
+-- dengan format 'YYYY-MM-DD HH:MM:SS' (hasil RobustDataExtractor.convert_date_columns).
+-- Script ini mengubah kolom tersebut menjadi TIMESTAMP/DATE dan menambahkan B-tree index
+-- sehingga filter rentang tanggal memakai index range scan.
+-- Nilai yang tidak sesuai format (kosong, 'nan', 'NaT', dll) diubah menjadi NULL.
+-- Jalankan dengan: python tools/run_date_columns_migration.py
+
+-- Backfill admission_date dari TEXT ke TIMESTAMP
+ALTER TABLE data_analytics
+    ALTER COLUMN admission_date TYPE TIMESTAMP
+    USING CASE
+        WHEN admission_date ~ '^\d{4}-\d{2}-\d{2}( \d{2}:\d{2}:\d{2})?$' THEN admission_date::timestamp
+        ELSE NULL
+    END;
+
+-- Backfill discharge_date dari TEXT ke TIMESTAMP
+ALTER TABLE data_analytics
+    ALTER COLUMN discharge_date TYPE TIMESTAMP
+    USING CASE
+        WHEN discharge_date ~ '^\d{4}-\d{2}-\d{2}( \d{2}:\d{2}:\d{2})?$' THEN discharge_date::timestamp
+        ELSE NULL
+    END;
+
+-- Backfill birth_date dari TEXT ke DATE
+ALTER TABLE data_analytics
+    ALTER COLUMN birth_date TYPE DATE
+    USING CASE
+        WHEN birth_date ~ '^\d{4}-\d{2}-\d{2}( \d{2}:\d{2}:\d{2})?$' THEN birth_date::timestamp::date
+        ELSE NULL
+    END;
+
+-- B-tree index untuk filter rentang tanggal (nama sama dengan index dari model SQLAlchemy)
+CREATE INDEX IF NOT EXISTS ix_data_analytics_admission_date ON data_analytics(admission_date);
+CREATE INDEX IF NOT EXISTS ix_data_analytics_discharge_date ON data_analytics(discharge_date);
+
+ANALYZE data_analytics;
@@ -1,6 +1,7 @@
 """
 Base handler class for all data handlers
 """
+import json
 import pandas as pd
 from typing import List, Optional, Tuple, Dict, Any
 from abc import ABC, abstractmethod
@@ -8,10 +9,16 @@ import logging
 
 from utils.validators import validate_required_columns, validate_date_range, validate_sort_parameters
 from utils.data_processing import apply_date_filter, apply_sorting, apply_specific_filter
-from core.database_query_service import DatabaseQueryService
+from utils.formatters import format_rupiah_series, format_column_label
+from core.database_query_service import DatabaseQueryService, MAX_PAGE_SIZE
+from core.derived_metrics import DerivedMetric, apply_metrics
+from core.request_metrics import request_metrics
 
 logger = logging.getLogger(__name__)
 
+# Rows per page of the HTML tables (filter, sort and LIMIT run in SQL)
+TABLE_PAGE_SIZE = MAX_PAGE_SIZE
+
 
 class BaseHandler(ABC):
     """
@@ -24,6 +31,8 @@ class BaseHandler(ABC):
         self.required_columns = self._get_required_columns()
         self.view_name = self._get_view_name()
         self.db_query_service = DatabaseQueryService()
+        self._output_schema: Optional[List[Dict[str, str]]] = None
+        self._output_template: Optional[pd.DataFrame] = None
     
     @abstractmethod
     def _get_required_columns(self) -> List[str]:
@@ -45,6 +54,54 @@ class BaseHandler(ABC):
         """Process the data with specific business logic"""
         pass
     
+    @abstractmethod
+    def _get_query_view(self) -> str:
+        """Get the DatabaseQueryService view name used for paginated queries"""
+        pass
+    
+    def _get_currency_columns(self) -> List[str]:
+        """Get numeric columns that are rendered as Rupiah (formatted only for display)"""
+        return []
+    
+    def _get_derived_metrics(self) -> List[DerivedMetric]:
+        """
+        Get derived metric columns of this view
+        
+        Metrics are computed in SQL for paginated queries (so sorting and filtering
+        on them run in the database) and with NumPy for full DataFrames.
+        """
+        return []
+    
+    def _apply_derived_metrics(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Add derived metrics that are not already in the DataFrame (vectorized)"""
+        return apply_metrics(df, self._get_derived_metrics())
+    
+    def format_for_display(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Format numeric currency columns of the rows being rendered
+        
+        Filtering and sorting run on the numeric columns; this is the last step
+        before rendering and only touches the rows that are actually shown.
+        """
+        currency_columns = [col for col in self._get_currency_columns() if col in df.columns]
+        if df.empty or not currency_columns:
+            return df
+        
+        return df.assign(**{col: format_rupiah_series(df[col]) for col in currency_columns})
+    
+    def _to_query_column(self, column: Optional[str]) -> Optional[str]:
+        """
+        Map a displayed column name to the query column it is derived from
+        
+        Legacy '*_FORMATTED' column names map to their numeric column.
+        """
+        if not column:
+            return None
+        for suffix in ('_FORMATTED', '_formatted'):
+            if column.endswith(suffix):
+                return column[:-len(suffix)]
+        return column
+    
     def process_data(self, sort_column: Optional[str] = None, sort_order: str = 'ASC', 
                     start_date: Optional[str] = None, end_date: Optional[str] = None,
                     filter_column: Optional[str] = None, filter_value: Optional[str] = None) -> Tuple[Optional[pd.DataFrame], Optional[str]]:
@@ -72,22 +129,26 @@ class BaseHandler(ABC):
                 filters['end_date'] = end_date
             
             # Get data from database (with date filters if any)
-            df = self._query_database(filters)
+            with request_metrics.phase(self.view_name, 'query') as timer:
+                df = self._query_database(filters)
+                timer.rows = len(df)
             
             if df.empty:
                 return None, f"No {self.view_name} data available in database. Please import data first."
             
-            # Apply specific processing logic
-            df = self._process_data(df)
-            
-            # Apply column-specific filter if provided
-            if filter_column and filter_value and filter_column in df.columns:
-                df = apply_specific_filter(df, filter_column, filter_value)
-            
-            # Apply sorting if provided
-            if sort_column and sort_column in df.columns:
-                ascending = sort_order.upper() == 'ASC'
-                df = df.sort_values(by=sort_column, ascending=ascending)
+            with request_metrics.phase(self.view_name, 'process') as timer:
+                # Apply specific processing logic
+                df = self._process_data(df)
+                
+                # Apply column-specific filter if provided
+                if filter_column and filter_value and filter_column in df.columns:
+                    df = apply_specific_filter(df, filter_column, filter_value)
+                
+                # Apply sorting if provided
+                if sort_column and sort_column in df.columns:
+                    ascending = sort_order.upper() == 'ASC'
+                    df = df.sort_values(by=sort_column, ascending=ascending)
+                timer.rows = len(df)
             
             return df, None
             
@@ -120,11 +181,16 @@ class BaseHandler(ABC):
     
     def get_table(self, sort_column: Optional[str] = None, sort_order: str = 'ASC',
                   start_date: Optional[str] = None, end_date: Optional[str] = None,
-                  filter_column: Optional[str] = None, filter_value: Optional[str] = None) -> Tuple[str, Optional[str]]:
+                  filter_column: Optional[str] = None, filter_value: Optional[str] = None,
+                  page: int = 1, per_page: int = TABLE_PAGE_SIZE) -> Tuple[str, Optional[str]]:
         """
-        Get HTML table representation of processed data with flexible filtering
+        Get HTML table of one page of processed data with flexible filtering
         Supports any combination of filters
         
+        Filtering, sorting and paging run in SQL like get_page, so the response
+        time does not grow with the view. The table is followed by the row range,
+        the total and previous/next buttons (handled in script.js).
+        
         Args:
             sort_column: Column name to sort by
             sort_order: Sort order ('ASC' or 'DESC')
@@ -132,24 +198,58 @@ class BaseHandler(ABC):
             end_date: End date for filtering
             filter_column: Column name to filter by
             filter_value: Value to filter for
+            page: Page number (1-based)
+            per_page: Number of rows per page
             
         Returns:
-            Tuple of (html_table, error_message)
+            Tuple of (html_table, error_message); html_table is empty when the filters match no rows
         """
-        df, error = self.process_data(sort_column, sort_order, start_date, end_date, filter_column, filter_value)
-        if error:
-            return "", error
-        
         try:
-            # Use Bootstrap table classes + existing custom class for consistent styling
-            table_html = df.to_html(classes='table table-striped table-hover data-table', index=False, escape=False)
+            result, df = self._query_page(page, per_page, sort_column, sort_order,
+                                          start_date, end_date, filter_column, filter_value)
+            if result.get('error'):
+                return "", f"Error processing {self.view_name} data: {result['error']}"
+            
+            if not result['total']:
+                if start_date or end_date or (filter_column and filter_value):
+                    return "", None
+                return "", f"No {self.view_name} data available in database. Please import data first."
+            
+            with request_metrics.phase(self.view_name, 'render') as timer:
+                if df.empty:
+                    # Page past the end: keep the header row
+                    df = self._get_output_template()
+                df = self.format_for_display(df)
+                
+                # Use Bootstrap table classes + existing custom class for consistent styling
+                table_html = df.to_html(classes='table table-striped table-hover data-table', index=False, escape=False)
+                table_html += self._pagination_html(result, len(df))
+                timer.rows = len(df)
+                timer.bytes = len(table_html)
             return table_html, None
         except Exception as e:
             return "", f"Error generating {self.view_name} table: {str(e)}"
     
+    def _pagination_html(self, result: Dict[str, Any], rows: int) -> str:
+        """Row range, total and previous/next buttons below an HTML table page"""
+        page, pages = result['page'], result['pages']
+        first = (page - 1) * result['per_page'] + 1 if rows else 0
+        last = first + rows - 1 if rows else 0
+        total = f"{'about ' if result.get('total_is_estimate') else ''}{result['total']:,}"
+        
+        buttons = []
+        for label, target, enabled in (('Previous', page - 1, page > 1), ('Next', page + 1, page < pages)):
+            disabled = '' if enabled else ' disabled'
+            buttons.append(f'<button type="button" class="filter-btn filter-btn-secondary" '
+                           f'data-page="{target}"{disabled}>{label}</button>')
+        return (f'<div class="table-pagination" data-page="{page}" data-pages="{pages}">'
+                f'<span class="table-pagination-info">Rows {first:,}–{last:,} of {total} '
+                f'(page {page:,} of {pages:,})</span>{"".join(buttons)}</div>')
+    
     def get_table_with_specific_filter(self, filter_column: str, filter_value: str,
                                      sort_column: Optional[str] = None, sort_order: str = 'ASC',
-                                     start_date: Optional[str] = None, end_date: Optional[str] = None) -> Tuple[str, Optional[str]]:
+                                     start_date: Optional[str] = None, end_date: Optional[str] = None,
+                                     page: int = 1) -> Tuple[str, Optional[str]]:
         """
         Get HTML table with specific column filter
         This method now uses the unified get_table method for consistency
@@ -161,12 +261,226 @@ class BaseHandler(ABC):
             sort_order: Sort order ('ASC' or 'DESC')
             start_date: Start date for filtering
             end_date: End date for filtering
+            page: Page number (1-based)
             
         Returns:
             Tuple of (html_table, error_message)
         """
         # Use the unified get_table method which now supports all filter combinations
-        return self.get_table(sort_column, sort_order, start_date, end_date, filter_column, filter_value)
+        return self.get_table(sort_column, sort_order, start_date, end_date, filter_column, filter_value, page)
+    
+    def get_page(self, page: int = 1, per_page: int = 100,
+                 sort_column: Optional[str] = None, sort_order: str = 'ASC',
+                 start_date: Optional[str] = None, end_date: Optional[str] = None,
+                 filter_column: Optional[str] = None, filter_value: Optional[str] = None) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+        """
+        Get one page of processed data, with filtering, sorting and paging done in SQL
+        
+        Args:
+            page: Page number (1-based)
+            per_page: Number of rows per page
+            sort_column: Column name to sort by
+            sort_order: Sort order ('ASC' or 'DESC')
+            start_date: Start date for filtering
+            end_date: End date for filtering
+            filter_column: Column name to filter by
+            filter_value: Value to filter for
+            
+        Returns:
+            Tuple of (page_dict, error_message)
+        """
+        try:
+            result, df = self._query_page(page, per_page, sort_column, sort_order,
+                                          start_date, end_date, filter_column, filter_value)
+            if result.get('error'):
+                return None, f"Error processing {self.view_name} data: {result['error']}"
+            
+            with request_metrics.phase(self.view_name, 'render') as timer:
+                # Only the rows of this page are formatted
+                df = self.format_for_display(df)
+                
+                result['view'] = self.view_name
+                result['columns'] = list(df.columns)
+                result['rows'] = self._to_json_rows(df)
+                timer.rows = len(df)
+            return result, None
+            
+        except Exception as e:
+            return None, f"Error processing {self.view_name} data: {str(e)}"
+    
+    def get_columnar_page(self, page: int = 1, per_page: int = 100,
+                          sort_column: Optional[str] = None, sort_order: str = 'ASC',
+                          start_date: Optional[str] = None, end_date: Optional[str] = None,
+                          filter_column: Optional[str] = None, filter_value: Optional[str] = None) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+        """
+        Get one page of processed data as a column-oriented JSON payload
+        
+        Values stay unformatted (numbers as numbers) so the client can sort and
+        render the page locally; currency_columns tells it which to show as Rupiah.
+        
+        Args:
+            page: Page number (1-based)
+            per_page: Number of rows per page
+            sort_column: Column name to sort by
+            sort_order: Sort order ('ASC' or 'DESC')
+            start_date: Start date for filtering
+            end_date: End date for filtering
+            filter_column: Column name to filter by
+            filter_value: Value to filter for
+            
+        Returns:
+            Tuple of (page_dict with columns, dtypes and values, error_message)
+        """
+        try:
+            result, df = self._query_page(page, per_page, sort_column, sort_order,
+                                          start_date, end_date, filter_column, filter_value)
+            if result.get('error'):
+                return None, f"Error processing {self.view_name} data: {result['error']}"
+            
+            result['view'] = self.view_name
+            with request_metrics.phase(self.view_name, 'render') as timer:
+                result.update(self._to_columnar(df))
+                timer.rows = len(df)
+            result['currency_columns'] = [col for col in self._get_currency_columns() if col in df.columns]
+            return result, None
+            
+        except Exception as e:
+            return None, f"Error processing {self.view_name} data: {str(e)}"
+    
+    def _query_page(self, page: int, per_page: int, sort_column: Optional[str], sort_order: str,
+                    start_date: Optional[str], end_date: Optional[str],
+                    filter_column: Optional[str], filter_value: Optional[str]) -> Tuple[Dict[str, Any], pd.DataFrame]:
+        """Query one page in SQL and process its rows; returns (pagination dict, processed DataFrame)"""
+        filters = {
+            'start_date': start_date,
+            'end_date': end_date,
+            'filter_column': self._to_query_column(filter_column),
+            'filter_value': filter_value
+        }
+        
+        with request_metrics.phase(self.view_name, 'query') as timer:
+            result = self.db_query_service.get_paginated_data(
+                self._get_query_view(), filters, page, per_page,
+                self._to_query_column(sort_column), sort_order,
+                derived_metrics=self._get_derived_metrics()
+            )
+            df = result.pop('data', pd.DataFrame())
+            timer.rows = len(df)
+        
+        if not df.empty:
+            # Only the rows of this page are processed
+            with request_metrics.phase(self.view_name, 'process') as timer:
+                df = self._process_data(df)
+                timer.rows = len(df)
+        return result, df
+    
+    def iter_export_batches(self, sort_column: Optional[str] = None, sort_order: str = 'ASC',
+                            start_date: Optional[str] = None, end_date: Optional[str] = None,
+                            filter_column: Optional[str] = None, filter_value: Optional[str] = None):
+        """
+        Stream the whole filtered and sorted view as processed DataFrame batches
+        
+        Filtering and sorting are done in SQL like get_page; rows come from a
+        server-side cursor so the full view is never held in memory.
+        
+        Args:
+            sort_column: Column name to sort by
+            sort_order: Sort order ('ASC' or 'DESC')
+            start_date: Start date for filtering
+            end_date: End date for filtering
+            filter_column: Column name to filter by
+            filter_value: Value to filter for
+            
+        Yields:
+            Processed DataFrame batches (numeric, not formatted for display); a
+            single empty batch with the output columns when no rows match
+        """
+        filters = {
+            'start_date': start_date,
+            'end_date': end_date,
+            'filter_column': self._to_query_column(filter_column),
+            'filter_value': filter_value
+        }
+        
+        has_rows = False
+        for batch in self.db_query_service.iter_view_batches(
+            self._get_query_view(), filters,
+            self._to_query_column(sort_column), sort_order,
+            derived_metrics=self._get_derived_metrics()
+        ):
+            with request_metrics.phase(self.view_name, 'process') as timer:
+                processed = self._process_data(batch)
+                timer.rows = len(processed)
+            has_rows = True
+            yield processed
+        
+        if not has_rows:
+            # No matching rows: writers still get the columns and dtypes for the header/schema
+            yield self._get_output_template()
+    
+    def _to_columnar(self, df: pd.DataFrame) -> Dict[str, Any]:
+        """
+        Convert a page DataFrame to column-oriented JSON values
+        
+        Returns:
+            Dict with columns (names), dtypes ('integer', 'number', 'boolean',
+            'datetime', 'string') and values (one array per column)
+        """
+        columns, dtypes, values = [], [], []
+        for col in df.columns:
+            series = df[col]
+            dtype = _json_dtype(series)
+            if dtype == 'datetime':
+                series = series.dt.strftime('%Y-%m-%d %H:%M:%S')
+            columns.append(col)
+            dtypes.append(dtype)
+            values.append(json.loads(series.to_json(orient='values', double_precision=15)))
+        
+        return {
+            'columns': columns,
+            'dtypes': dtypes,
+            'values': values
+        }
+    
+    def _to_json_rows(self, df: pd.DataFrame) -> List[List[Any]]:
+        """Convert a page DataFrame to JSON-serializable rows"""
+        if df.empty:
+            return []
+        
+        df = df.copy()
+        for col in df.columns:
+            if pd.api.types.is_datetime64_any_dtype(df[col]):
+                df[col] = df[col].dt.strftime('%Y-%m-%d %H:%M:%S')
+        
+        return json.loads(df.to_json(orient='values', double_precision=15))
+    
+    def get_output_schema(self) -> List[Dict[str, str]]:
+        """
+        Get the output schema of this view: name, dtype and label of every column
+        
+        Derived once per process by running _process_data over a one-row frame
+        typed like the paginated view query, derived metrics included (no data is
+        read), then served from memory.
+        
+        Returns:
+            List of dicts with name, dtype (see _json_dtype) and label
+        """
+        if self._output_schema is None:
+            template = self._get_output_template()
+            self._output_schema = [
+                {'name': col, 'dtype': _json_dtype(template[col]), 'label': format_column_label(col)}
+                for col in template.columns
+            ]
+        return self._output_schema
+    
+    def _get_output_template(self) -> pd.DataFrame:
+        """Empty DataFrame with the output columns and dtypes of this view (see get_output_schema)"""
+        if self._output_template is None:
+            template = self.db_query_service.get_view_template(
+                self._get_query_view(), derived_metrics=self._get_derived_metrics()
+            )
+            self._output_template = self._process_data(template).iloc[:0]
+        return self._output_template
     
     def get_columns(self) -> List[str]:
         """
@@ -176,14 +490,20 @@ class BaseHandler(ABC):
             List of column names
         """
         try:
-            # Get sample data from database and process it to get final columns
-            sample_df = self._query_database({})
-            if sample_df.empty:
-                return self.required_columns
-            
-            # Process the data to get the final column structure (after removing duplicates)
-            processed_df = self._process_data(sample_df)
-            return list(processed_df.columns)
+            return [column['name'] for column in self.get_output_schema()]
         except Exception as e:
             logger.error(f"Error getting columns: {e}", exc_info=True)
             return self.required_columns
+
+
+def _json_dtype(series: pd.Series) -> str:
+    """JSON API dtype name of a DataFrame column"""
+    if pd.api.types.is_bool_dtype(series):
+        return 'boolean'
+    if pd.api.types.is_integer_dtype(series):
+        return 'integer'
+    if pd.api.types.is_float_dtype(series):
+        return 'number'
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return 'datetime'
+    return 'string'
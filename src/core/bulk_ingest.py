@@ -0,0 +1,283 @@
+"""
+Bulk Ingest untuk memasukkan DataFrame ke tabel data_analytics secara massal
+"""
+import io
+import numpy as np
+import pandas as pd
+from typing import Dict, Any, List, Optional
+import logging
+from sqlalchemy import Integer, Numeric, Date, DateTime
+
+from core.database import db, DataAnalytics
+
+logger = logging.getLogger(__name__)
+
+# Mapping kolom file (uppercase) ke kolom database (lowercase)
+DATA_ANALYTICS_COLUMN_MAPPING = {
+    'KODE_RS': 'kode_rs',
+    'KELAS_RS': 'kelas_rs',
+    'KELAS_RAWAT': 'kelas_rawat',
+    'KODE_TARIF': 'kode_tarif',
+    'PTD': 'ptd',
+    'ADMISSION_DATE': 'admission_date',
+    'DISCHARGE_DATE': 'discharge_date',
+    'BIRTH_DATE': 'birth_date',
+    'BIRTH_WEIGHT': 'birth_weight',
+    'SEX': 'sex',
+    'DISCHARGE_STATUS': 'discharge_status',
+    'DIAGLIST': 'diaglist',
+    'PROCLIST': 'proclist',
+    'ADL1': 'adl1',
+    'ADL2': 'adl2',
+    'IN_SP': 'in_sp',
+    'IN_SR': 'in_sr',
+    'IN_SI': 'in_si',
+    'IN_SD': 'in_sd',
+    'INACBG': 'inacbg',
+    'SUBACUTE': 'subacute',
+    'CHRONIC': 'chronic',
+    'SP': 'sp',
+    'SR': 'sr',
+    'SI': 'si',
+    'SD': 'sd',
+    'DESKRIPSI_INACBG': 'deskripsi_inacbg',
+    'TARIF_INACBG': 'tarif_inacbg',
+    'TARIF_SUBACUTE': 'tarif_subacute',
+    'TARIF_CHRONIC': 'tarif_chronic',
+    'DESKRIPSI_SP': 'deskripsi_sp',
+    'TARIF_SP': 'tarif_sp',
+    'DESKRIPSI_SR': 'deskripsi_sr',
+    'TARIF_SR': 'tarif_sr',
+    'DESKRIPSI_SI': 'deskripsi_si',
+    'TARIF_SI': 'tarif_si',
+    'DESKRIPSI_SD': 'deskripsi_sd',
+    'TARIF_SD': 'tarif_sd',
+    'TOTAL_TARIF': 'total_tarif',
+    'TARIF_RS': 'tarif_rs',
+    'TARIF_POLI_EKS': 'tarif_poli_eks',
+    'LOS': 'los',
+    'ICU_INDIKATOR': 'icu_indikator',
+    'ICU_LOS': 'icu_los',
+    'VENT_HOUR': 'vent_hour',
+    'NAMA_PASIEN': 'nama_pasien',
+    'MRN': 'mrn',
+    'UMUR_TAHUN': 'umur_tahun',
+    'UMUR_HARI': 'umur_hari',
+    'DPJP': 'dpjp',
+    'SEP': 'sep',
+    'NOKARTU': 'nokartu',
+    'PAYOR_ID': 'payor_id',
+    'CODER_ID': 'coder_id',
+    'VERSI_INACBG': 'versi_inacbg',
+    'VERSI_GROUPER': 'versi_grouper',
+    'C1': 'c1',
+    'C2': 'c2',
+    'C3': 'c3',
+    'C4': 'c4',
+    'PROSEDUR_NON_BEDAH': 'prosedur_non_bedah',
+    'PROSEDUR_BEDAH': 'prosedur_bedah',
+    'KONSULTASI': 'konsultasi',
+    'TENAGA_AHLI': 'tenaga_ahli',
+    'KEPERAWATAN': 'keperawatan',
+    'PENUNJANG': 'penunjang',
+    'RADIOLOGI': 'radiologi',
+    'LABORATORIUM': 'laboratorium',
+    'PELAYANAN_DARAH': 'pelayanan_darah',
+    'REHABILITASI': 'rehabilitasi',
+    'KAMAR_AKOMODASI': 'kamar_akomodasi',
+    'RAWAT_INTENSIF': 'rawat_intensif',
+    'OBAT': 'obat',
+    'ALKES': 'alkes',
+    'BMHP': 'bmhp',
+    'SEWA_ALAT': 'sewa_alat',
+    'OBAT_KRONIS': 'obat_kronis',
+    'OBAT_KEMO': 'obat_kemo'
+}
+
+# Penanda NULL untuk COPY ... WITH (FORMAT csv)
+COPY_NULL_MARKER = '\\N'
+
+
+class BulkIngestService:
+    """Class untuk memasukkan DataFrame ke tabel data_analytics dalam batch"""
+
+    def __init__(self, batch_size: int = 10000, method: str = 'copy'):
+        """
+        Args:
+            batch_size: Jumlah baris per batch
+            method: Metode insert untuk PostgreSQL ('copy' atau 'execute_values')
+        """
+        self.batch_size = batch_size
+        self.method = method
+        self.table = DataAnalytics.__table__
+
+    def ingest(self, df: pd.DataFrame, user_id: Optional[int] = None, commit: bool = True,
+               row_mask: Optional[np.ndarray] = None) -> Dict[str, Any]:
+        """
+        Masukkan DataFrame ke data_analytics dalam satu transaksi
+
+        Args:
+            df: DataFrame dengan nama kolom file (uppercase)
+            user_id: ID user yang dicatat sebagai uploader_id
+            commit: Commit transaksi setelah insert. False jika pemanggil memasukkan
+                    beberapa chunk dalam satu transaksi dan commit sendiri
+            row_mask: Mask boolean baris yang dimasukkan (None = semua baris). Baris
+                      difilter per batch sehingga partisi tidak perlu disalin utuh
+
+        Returns:
+            Dict dengan hasil insert dan jumlah baris per batch
+        """
+        if df is None or df.empty:
+            return {
+                'success': True,
+                'inserted_rows': 0,
+                'batches': [],
+                'method': None,
+                'errors': []
+            }
+
+        try:
+            connection = db.session.connection()
+            method = self._select_method(connection)
+
+            batches = []
+            inserted_count = 0
+            for start in range(0, len(df), self.batch_size):
+                # Konversi tipe per batch: salinan bertipe database hanya sebesar satu batch
+                batch = df.iloc[start:start + self.batch_size]
+                if row_mask is not None:
+                    batch = batch[row_mask[start:start + self.batch_size]]
+                    if batch.empty:
+                        continue
+                batch = self.prepare_frame(batch, user_id, log_unknown=(start == 0))
+
+                if method == 'copy':
+                    rows = self._copy_batch(connection, batch)
+                elif method == 'execute_values':
+                    rows = self._execute_values_batch(connection, batch)
+                else:
+                    rows = self._executemany_batch(connection, batch)
+
+                inserted_count += rows
+                batches.append({'batch': len(batches) + 1, 'rows': rows})
+                logger.debug("Batch %s inserted via %s: %s rows", len(batches), method, rows)
+
+            if commit:
+                db.session.commit()
+                logger.info("Bulk ingest committed: %s rows in %s batches", inserted_count, len(batches))
+
+            return {
+                'success': True,
+                'inserted_rows': inserted_count,
+                'batches': batches,
+                'method': method,
+                'errors': []
+            }
+
+        except Exception as e:
+            db.session.rollback()
+            logger.error(f"Error during bulk ingest: {e}")
+            return {
+                'success': False,
+                'error': str(e),
+                'inserted_rows': 0,
+                'batches': [],
+                'errors': [str(e)]
+            }
+
+    def prepare_frame(self, df: pd.DataFrame, user_id: Optional[int] = None,
+                      log_unknown: bool = True) -> pd.DataFrame:
+        """
+        Map nama kolom ke kolom database dan konversi tipe data sesuai model
+
+        Args:
+            df: DataFrame dengan nama kolom file (uppercase)
+            user_id: ID user untuk kolom uploader_id
+            log_unknown: Log kolom yang tidak ada di data_analytics (sekali per ingest)
+
+        Returns:
+            DataFrame dengan kolom database dan tipe yang sudah sesuai
+        """
+        renamed = df.rename(columns=lambda col: DATA_ANALYTICS_COLUMN_MAPPING.get(col, str(col).lower()))
+
+        table_columns = [col.name for col in self.table.columns if not col.primary_key]
+        unknown_columns = [col for col in renamed.columns if col not in table_columns]
+        if unknown_columns and log_unknown:
+            logger.warning(f"Ignoring columns not in data_analytics: {unknown_columns}")
+
+        columns = [col for col in table_columns if col in renamed.columns and col != 'uploader_id']
+        frame = pd.DataFrame({col: self._coerce_column(renamed[col], col) for col in columns},
+                             index=renamed.index)
+
+        # Tandai user yang pertama kali mengupload row ini
+        frame['uploader_id'] = pd.array([user_id] * len(frame), dtype='Int64')
+
+        return frame.reset_index(drop=True)
+
+    def _coerce_column(self, series: pd.Series, column_name: str) -> pd.Series:
+        """Konversi satu kolom ke tipe yang sesuai dengan kolom database"""
+        column_type = self.table.columns[column_name].type
+
+        if isinstance(column_type, Integer):
+            numeric = pd.to_numeric(series, errors='coerce')
+            return numeric.round().astype('Int64')
+
+        if isinstance(column_type, Numeric):
+            return pd.to_numeric(series, errors='coerce').astype('float64')
+
+        if isinstance(column_type, (Date, DateTime)):
+            # Kolom tanggal dari convert_date_columns sudah datetime64, sisanya diparse
+            if not pd.api.types.is_datetime64_any_dtype(series):
+                series = pd.to_datetime(series, errors='coerce')
+            if isinstance(column_type, Date):
+                return series.dt.normalize()
+            return series
+
+        # Kolom teks: konversi ke string, pertahankan None untuk nilai kosong
+        return series.astype(str).astype(object).where(series.notna(), None)
+
+    def _select_method(self, connection) -> str:
+        """Pilih metode insert berdasarkan dialect dan driver database"""
+        if connection.dialect.name != 'postgresql' or connection.dialect.driver != 'psycopg2':
+            return 'executemany'
+
+        return self.method
+
+    def _copy_batch(self, connection, batch: pd.DataFrame) -> int:
+        """Kirim satu batch dengan COPY FROM STDIN dari buffer di memori"""
+        buffer = io.StringIO()
+        batch.to_csv(buffer, index=False, header=False, na_rep=COPY_NULL_MARKER)
+        buffer.seek(0)
+
+        column_list = ', '.join(batch.columns)
+        copy_sql = (
+            f"COPY {self.table.name} ({column_list}) FROM STDIN "
+            f"WITH (FORMAT csv, NULL '{COPY_NULL_MARKER}')"
+        )
+
+        with connection.connection.dbapi_connection.cursor() as cursor:
+            cursor.copy_expert(copy_sql, buffer)
+            return cursor.rowcount if cursor.rowcount >= 0 else len(batch)
+
+    def _execute_values_batch(self, connection, batch: pd.DataFrame) -> int:
+        """Kirim satu batch dengan psycopg2 execute_values"""
+        from psycopg2.extras import execute_values
+
+        column_list = ', '.join(batch.columns)
+        insert_sql = f"INSERT INTO {self.table.name} ({column_list}) VALUES %s"
+
+        with connection.connection.dbapi_connection.cursor() as cursor:
+            execute_values(cursor, insert_sql, self._to_records(batch), page_size=1000)
+        return len(batch)
+
+    def _executemany_batch(self, connection, batch: pd.DataFrame) -> int:
+        """Kirim satu batch dengan INSERT executemany (dialect selain PostgreSQL)"""
+        columns = list(batch.columns)
+        records = [dict(zip(columns, row)) for row in self._to_records(batch)]
+        connection.execute(self.table.insert(), records)
+        return len(batch)
+
+    def _to_records(self, batch: pd.DataFrame) -> List[tuple]:
+        """Konversi batch ke list tuple dengan None untuk nilai kosong"""
+        converted = batch.astype(object).where(batch.notna(), None)
+        return list(converted.itertuples(index=False, name=None))
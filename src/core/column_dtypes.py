@@ -0,0 +1,118 @@
+"""
+Registry dtype pandas untuk kolom DataAnalytics
+
+Kolom teks dengan nilai sedikit (kelas, kode tarif, INACBG, DPJP, payor, versi)
+disimpan sebagai category, kolom integer kecil sebagai Int16/Int32 dan nominal
+Rupiah sebagai Int64. Registry dipakai oleh extractor file dan
+DatabaseQueryService sehingga semua DataFrame memakai tipe yang sama: group-by,
+isin dan perbandingan bekerja pada kode integer, dan memori jauh lebih kecil
+dibanding string object/float64.
+
+Semua tipe integer memakai dtype nullable pandas (NULL tetap <NA>, bukan float).
+"""
+import logging
+from typing import Dict, Iterable, Optional
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Kolom teks dengan kardinalitas rendah
+CATEGORY_COLUMNS = [
+    'KODE_RS', 'KELAS_RS', 'KELAS_RAWAT', 'KODE_TARIF', 'INACBG', 'DESKRIPSI_INACBG',
+    'SUBACUTE', 'CHRONIC', 'SP', 'SR', 'SI', 'SD',
+    'DESKRIPSI_SP', 'DESKRIPSI_SR', 'DESKRIPSI_SI', 'DESKRIPSI_SD',
+    'DPJP', 'PAYOR_ID', 'VERSI_INACBG', 'VERSI_GROUPER'
+]
+
+# Kode dan umur dengan rentang kecil
+INT16_COLUMNS = ['PTD', 'SEX', 'DISCHARGE_STATUS', 'ICU_INDIKATOR', 'UMUR_TAHUN']
+
+# Kolom Integer di database (hari, jam, ID)
+INT32_COLUMNS = ['LOS', 'ICU_LOS', 'VENT_HOUR', 'UMUR_HARI', 'CODER_ID']
+
+# Nominal Rupiah (BigInteger di database)
+AMOUNT_COLUMNS = [
+    'TARIF_INACBG', 'TARIF_SUBACUTE', 'TARIF_CHRONIC', 'TARIF_SP', 'TARIF_SR', 'TARIF_SI',
+    'TARIF_SD', 'TOTAL_TARIF', 'TARIF_RS', 'TARIF_POLI_EKS', 'PROSEDUR_NON_BEDAH',
+    'PROSEDUR_BEDAH', 'KONSULTASI', 'TENAGA_AHLI', 'KEPERAWATAN', 'PENUNJANG', 'RADIOLOGI',
+    'LABORATORIUM', 'PELAYANAN_DARAH', 'REHABILITASI', 'KAMAR_AKOMODASI', 'RAWAT_INTENSIF',
+    'OBAT', 'ALKES', 'BMHP', 'SEWA_ALAT', 'OBAT_KRONIS', 'OBAT_KEMO'
+]
+
+# Nama kolom file/view (uppercase) -> dtype pandas
+COLUMN_DTYPES: Dict[str, str] = {
+    **{col: 'category' for col in CATEGORY_COLUMNS},
+    **{col: 'Int16' for col in INT16_COLUMNS},
+    **{col: 'Int32' for col in INT32_COLUMNS},
+    **{col: 'Int64' for col in AMOUNT_COLUMNS}
+}
+
+
+def dtype_for(column: str) -> Optional[str]:
+    """
+    Dtype terdaftar untuk satu kolom
+
+    Args:
+        column: Nama kolom file/view (uppercase) atau atribut DataAnalytics (lowercase)
+
+    Returns:
+        Nama dtype pandas, atau None jika kolom tidak terdaftar
+    """
+    return COLUMN_DTYPES.get(str(column).upper())
+
+
+def apply_column_dtypes(df: pd.DataFrame, columns: Optional[Iterable[str]] = None) -> pd.DataFrame:
+    """
+    Konversi kolom DataFrame ke dtype registry
+
+    Konversi integer hanya dilakukan jika tidak ada nilai yang hilang: kolom
+    dengan teks non-angka, pecahan atau nilai di luar rentang dtype dibiarkan
+    apa adanya. Kolom yang sudah bertipe benar tidak disalin.
+
+    Args:
+        df: DataFrame dengan nama kolom file/view atau atribut DataAnalytics
+        columns: Batasi konversi ke kolom ini (default: semua kolom terdaftar)
+
+    Returns:
+        DataFrame dengan kolom yang sudah dikonversi
+    """
+    if df is None or df.empty:
+        return df
+
+    candidates = df.columns if columns is None else [col for col in columns if col in df.columns]
+    converted = {}
+    for col in candidates:
+        dtype = dtype_for(col)
+        if dtype is None or df[col].dtype == dtype:
+            continue
+        try:
+            series = _to_dtype(df[col], dtype)
+        except (TypeError, ValueError) as e:
+            logger.debug(f"Column {col} kept as {df[col].dtype}: {e}")
+            continue
+        if series is not None:
+            converted[col] = series
+
+    return df.assign(**converted) if converted else df
+
+
+def _to_dtype(series: pd.Series, dtype: str) -> Optional[pd.Series]:
+    """Konversi satu kolom; None jika konversi integer akan mengubah nilai"""
+    if dtype == 'category':
+        return series.astype('category')
+
+    numeric = pd.to_numeric(series, errors='coerce')
+    present = numeric.notna()
+    if int(present.sum()) != int(series.notna().sum()):
+        return None
+
+    values = numeric[present].to_numpy(dtype='float64')
+    if len(values):
+        limits = np.iinfo(dtype.lower())
+        if (not np.all(np.mod(values, 1) == 0)
+                or values.min() < limits.min or values.max() > limits.max):
+            return None
+
+    return numeric.astype(dtype)
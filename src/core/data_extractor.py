@@ -3,12 +3,23 @@ Data Extractor untuk mengekstrak data dari file txt dan xlsx ke DataFrame
 """
 import pandas as pd
 import numpy as np
-from typing import Dict, Any, Optional, Tuple
+from typing import Dict, Any, Optional, Tuple, Iterator, List
 import logging
 import os
 
+from core.column_dtypes import apply_column_dtypes
+
 logger = logging.getLogger(__name__)
 
+# Separator yang dicoba untuk file text (urutan prioritas)
+TEXT_SEPARATORS = ['\t', ',', ';', '|']
+
+# Nilai yang dianggap kosong saat membaca file
+NA_VALUES = ['', ' ', '-', 'N/A', 'NULL', 'None']
+
+# Jumlah baris per chunk untuk mode streaming
+DEFAULT_CHUNK_SIZE = 20000
+
 class DataExtractor:
     """Class untuk mengekstrak data dari file ke DataFrame"""
     
@@ -67,7 +78,7 @@ class DataExtractor:
                 missing_cols = set(self.required_columns) - set(df.columns)
                 extraction_info['missing_columns'] = list(missing_cols)
                 
-                logger.info(f"Data extracted successfully: {len(df)} rows, {len(df.columns)} columns")
+                logger.info("Data extracted successfully: %s rows, %s columns", len(df), len(df.columns))
             else:
                 if df is None:
                     extraction_info['error'] = 'Gagal membaca file. Pastikan file memiliki format yang benar (.txt dengan tab separator atau .xlsx/.xls)'
@@ -100,7 +111,7 @@ class DataExtractor:
                     df = pd.read_excel(
                         file_path, 
                         header=0, 
-                        na_values=['', ' ', '-', 'N/A', 'NULL', 'None'],
+                        na_values=NA_VALUES,
                         engine=engine
                     )
                     break
@@ -131,39 +142,25 @@ class DataExtractor:
         try:
             encoding = file_info.get('encoding', 'utf-8')
             
-            # Try different separators
-            separators = ['\t', ',', ';', '|']
-            df = None
-            
-            for sep in separators:
-                try:
-                    df = pd.read_csv(
-                        file_path,
-                        sep=sep,
-                        header=0,
-                        encoding=encoding,
-                        na_values=['', ' ', '-', 'N/A', 'NULL', 'None']
-                    )
-                    
-                    # Check if we got reasonable number of columns
-                    if len(df.columns) > 10:  # Assuming our data has many columns
-                        break
-                    else:
-                        df = None
-                        
-                except Exception as e:
-                    logger.warning(f"Separator {sep} failed: {e}")
-                    continue
-            
-            if df is None:
+            # Deteksi separator sekali dari header
+            sep = self.detect_separator(file_path, encoding)
+            if sep is None:
                 raise Exception("Tidak dapat menentukan separator yang tepat")
             
+            df = pd.read_csv(
+                file_path,
+                sep=sep,
+                header=0,
+                encoding=encoding,
+                na_values=NA_VALUES
+            )
+            
             # Clean DataFrame
             df = self._clean_dataframe(df)
             
             return df, {
                 'extraction_method': 'text',
-                'separator_used': sep if 'sep' in locals() else 'unknown',
+                'separator_used': sep,
                 'encoding_used': encoding
             }
             
@@ -174,14 +171,128 @@ class DataExtractor:
                 'error': str(e)
             }
     
-    def _clean_dataframe(self, df: pd.DataFrame) -> pd.DataFrame:
+    def detect_separator(self, file_path: str, encoding: str = 'utf-8') -> Optional[str]:
+        """
+        Deteksi separator file text dari baris header
+        
+        Args:
+            file_path: Path ke file
+            encoding: Encoding file
+            
+        Returns:
+            Separator yang menghasilkan kolom terbanyak (lebih dari 10 kolom), atau None
+        """
+        with open(file_path, 'r', encoding=encoding or 'utf-8', errors='replace') as f:
+            header = f.readline()
+        
+        best_sep, best_columns = None, 10  # Data kita memiliki banyak kolom
+        for sep in TEXT_SEPARATORS:
+            columns = len(header.split(sep))
+            if columns > best_columns:
+                best_sep, best_columns = sep, columns
+        
+        logger.info("Detected separator %r (%s columns)", best_sep, best_columns)
+        return best_sep
+    
+    def iter_chunks(self, file_path: str, file_info: Dict[str, Any],
+                    chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[pd.DataFrame]:
+        """
+        Baca file per chunk supaya memori tetap terbatas untuk file berukuran berapa pun
+        
+        Args:
+            file_path: Path ke file
+            file_info: Informasi file dari FileAnalyzer
+            chunk_size: Jumlah baris per chunk
+            
+        Yields:
+            DataFrame per chunk yang sudah dibersihkan
+        """
+        if file_info['file_type'] == 'text':
+            chunks = self._iter_text_chunks(file_path, file_info, chunk_size)
+        elif file_info['file_type'] == 'excel':
+            chunks = self._iter_excel_chunks(file_path, chunk_size)
+        else:
+            raise ValueError(f"Tipe file tidak didukung: {file_info['file_type']}")
+        
+        for chunk in chunks:
+            # Kolom kosong tidak dibuang supaya semua chunk memiliki kolom yang sama
+            chunk = self._clean_dataframe(chunk, drop_empty_columns=False)
+            if not chunk.empty:
+                yield chunk
+    
+    def _iter_text_chunks(self, file_path: str, file_info: Dict[str, Any],
+                          chunk_size: int) -> Iterator[pd.DataFrame]:
+        """Baca file text dengan read_csv chunksize"""
+        encoding = file_info.get('encoding') or 'utf-8'
+        sep = self.detect_separator(file_path, encoding)
+        if sep is None:
+            raise Exception("Tidak dapat menentukan separator yang tepat")
+        
+        reader = pd.read_csv(
+            file_path,
+            sep=sep,
+            header=0,
+            encoding=encoding,
+            na_values=NA_VALUES,
+            chunksize=chunk_size
+        )
+        with reader:
+            yield from reader
+    
+    def _iter_excel_chunks(self, file_path: str, chunk_size: int) -> Iterator[pd.DataFrame]:
+        """Baca file Excel baris per baris dengan openpyxl read_only"""
+        if file_path.lower().endswith('.xls'):
+            # Format .xls lama tidak mendukung read_only, baca penuh lalu dipotong per chunk
+            df, info = self._extract_excel(file_path, {})
+            if df is None:
+                raise Exception(info.get('error', 'Gagal membaca file Excel'))
+            for start in range(0, len(df), chunk_size):
+                yield df.iloc[start:start + chunk_size]
+            return
+        
+        from openpyxl import load_workbook
+        
+        workbook = load_workbook(file_path, read_only=True, data_only=True)
+        try:
+            rows = workbook.active.iter_rows(values_only=True)
+            header = next(rows, None)
+            if header is None:
+                return
+            
+            # Kolom tanpa header (sel kosong di baris pertama) diabaikan
+            columns = [str(col).strip() if col is not None else None for col in header]
+            buffer: List[tuple] = []
+            for row in rows:
+                buffer.append(row)
+                if len(buffer) >= chunk_size:
+                    yield self._excel_rows_to_frame(buffer, columns)
+                    buffer = []
+            
+            if buffer:
+                yield self._excel_rows_to_frame(buffer, columns)
+        finally:
+            workbook.close()
+    
+    def _excel_rows_to_frame(self, rows: List[tuple], columns: List[Optional[str]]) -> pd.DataFrame:
+        """Bentuk DataFrame dari baris Excel, dengan nilai kosong seperti read_excel"""
+        width = len(columns)
+        df = pd.DataFrame([tuple(row[:width]) for row in rows], columns=range(width))
+        
+        named = [i for i, col in enumerate(columns) if col is not None]
+        df = df[named]
+        df.columns = [columns[i] for i in named]
+        
+        return df.replace(NA_VALUES, np.nan)
+    
+    def _clean_dataframe(self, df: pd.DataFrame, drop_empty_columns: bool = True) -> pd.DataFrame:
         """Bersihkan DataFrame"""
         try:
             # Remove completely empty rows
             df = df.dropna(how='all')
             
             # Remove completely empty columns
-            df = df.dropna(axis=1, how='all')
+            if drop_empty_columns:
+                df = df.dropna(axis=1, how='all')
             
             # Strip whitespace from string columns
             for col in df.select_dtypes(include=['object']).columns:
@@ -193,7 +304,8 @@ class DataExtractor:
             # Reset index
             df = df.reset_index(drop=True)
             
-            return df
+            # Tipe kolom sesuai registry dtype (category, Int16/Int32, Int64 Rupiah)
+            return apply_column_dtypes(df)
             
         except Exception as e:
             logger.error(f"Error cleaning DataFrame: {e}")
@@ -3,8 +3,10 @@ Main data handler that coordinates all data processing
 """
 import pandas as pd
 import os
+import uuid
 import logging
 from typing import Optional, Tuple
+from werkzeug.utils import secure_filename
 
 from core.data_processor import DataProcessor
 from handlers.financial_handler import FinancialHandler
@@ -129,11 +131,10 @@ class DataHandler:
     
     def has_data(self) -> bool:
         """Check if data is loaded"""
-        # Check if data exists in database
+        # Check if data exists in database (cached stats, no COUNT per request)
         try:
-            from core.database import DataAnalytics
-            count = DataAnalytics.query.count()
-            return count > 0
+            from core.database_query_service import DatabaseQueryService
+            return DatabaseQueryService().has_data()
         except Exception:
             # Fallback to checking current_df
             return self.current_df is not None
@@ -157,6 +158,10 @@ class DataHandler:
         """
         Save uploaded file to temporary location
         
+        The file is stored under a unique server-side name (random prefix plus
+        the sanitized client name), so uploads with the same filename never
+        overwrite each other while they wait in the upload queue.
+        
         Args:
             file: Uploaded file object
             upload_folder: Path to upload folder
@@ -165,7 +170,9 @@ class DataHandler:
             Tuple of (filepath, error_message)
         """
         try:
-            filepath = os.path.join(upload_folder, file.filename)
+            stem, extension = os.path.splitext(file.filename)
+            safe_stem = secure_filename(stem) or 'upload'
+            filepath = os.path.join(upload_folder, f"{uuid.uuid4().hex}_{safe_stem}{extension.lower()}")
             file.save(filepath)
             return filepath, None
         except Exception as e:
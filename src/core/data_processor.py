@@ -5,20 +5,23 @@ import pandas as pd
 import numpy as np
 from typing import Dict, Any
 
+from core.inacbg_pricing import INACBGPricingEngine
+
 
 class DataProcessor:
     """
     Data processor class that handles INACBG-based pricing adjustments.
     
-    Processing logic:
-    - For each row, check the 4th digit of INACBG value
-    - If digit 4 is '0': multiply TARIF_RS, PENUNJANG, RADIOLOGI, LABORATORIUM by 0.79 (79%)
-    - If digit 4 is 'I', 'II', or 'III': multiply TARIF_RS, PENUNJANG, RADIOLOGI, LABORATORIUM by 0.73 (73%)
+    Processing logic (see INACBGPricingEngine):
+    - Read the severity level of the INACBG value (last segment of "K-4-17-I")
+    - If severity is '0': multiply TARIF_RS, PENUNJANG, RADIOLOGI, LABORATORIUM by 0.79 (79%)
+    - If severity is 'I', 'II', or 'III': multiply TARIF_RS, PENUNJANG, RADIOLOGI, LABORATORIUM by 0.73 (73%)
     """
     
     def __init__(self):
         self.raw_data = None
         self.processed_data = None
+        self.pricing_engine = INACBGPricingEngine()
     
     def load_raw_data(self, dataframe: pd.DataFrame) -> bool:
         """
@@ -57,38 +60,10 @@ class DataProcessor:
                 # If column doesn't exist, create it with 0 values
                 self.processed_data[col] = 0
         
-        # Process each row based on INACBG 4th digit
-        for index, row in self.processed_data.iterrows():
-            inacbg_value = str(row.get('INACBG', ''))
-            
-            # For INACBG format like "K-4-17-I", we need to find the last part after the last dash
-            # which represents the severity level (0, I, II, III)
-            if '-' in inacbg_value:
-                parts = inacbg_value.split('-')
-                if len(parts) >= 4:
-                    severity_level = parts[-1]  # Last part after the last dash
-                    
-                    # Apply pricing adjustments based on severity level
-                    if severity_level == '0':
-                        # Multiply by 0.79 (79%)
-                        multiplier = 0.79
-                    elif severity_level.upper() in ['I', 'II', 'III']:
-                        # Multiply by 0.73 (73%)
-                        multiplier = 0.73
-                    else:
-                        # No adjustment for other values
-                        multiplier = 1.0
-                else:
-                    multiplier = 1.0
-            else:
-                multiplier = 1.0
-            
-            # Apply multiplier to pricing columns
-            for col in pricing_columns:
-                if col in self.processed_data.columns:
-                    original_value = self.processed_data.at[index, col]
-                    adjusted_value = original_value * multiplier
-                    self.processed_data.at[index, col] = round(adjusted_value, 2)
+        # Apply pricing adjustments based on INACBG severity level (shared engine)
+        self.processed_data, _ = self.pricing_engine.apply(
+            self.processed_data, pricing_columns, decimals=2
+        )
         
         return self.processed_data
     
@@ -152,26 +127,11 @@ class DataProcessor:
             "pricing_adjustments_applied": 0
         }
         
-        for index, row in self.processed_data.iterrows():
-            inacbg_value = str(row.get('INACBG', ''))
-            
-            # Parse INACBG format like "K-4-17-I"
-            if '-' in inacbg_value:
-                parts = inacbg_value.split('-')
-                if len(parts) >= 4:
-                    severity_level = parts[-1]  # Last part after the last dash
-                    
-                    if severity_level == '0':
-                        summary["inacbg_0_count"] += 1
-                        summary["pricing_adjustments_applied"] += 1
-                    elif severity_level.upper() in ['I', 'II', 'III']:
-                        summary["inacbg_i_ii_iii_count"] += 1
-                        summary["pricing_adjustments_applied"] += 1
-                    else:
-                        summary["inacbg_other_count"] += 1
-                else:
-                    summary["inacbg_other_count"] += 1
-            else:
-                summary["inacbg_other_count"] += 1
+        inacbg = self.processed_data.get('INACBG', pd.Series('', index=self.processed_data.index))
+        _, counts = self.pricing_engine.classify(inacbg)
+        summary["inacbg_0_count"] = counts['digit_0_count']
+        summary["inacbg_i_ii_iii_count"] = counts['digit_i_ii_iii_count']
+        summary["inacbg_other_count"] = counts['other_count']
+        summary["pricing_adjustments_applied"] = counts['digit_0_count'] + counts['digit_i_ii_iii_count']
         
         return summary
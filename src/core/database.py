@@ -22,18 +22,50 @@ def init_db(app):
     DB_USER = 'postgres'
     DB_PASSWORD = 'admin'
     
-    # PostgreSQL connection string
-    DATABASE_URL = f'postgresql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}'
+    # PostgreSQL connection string (DATABASE_URL env overrides the default for deployments)
+    DATABASE_URL = os.environ.get(
+        'DATABASE_URL',
+        f'postgresql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}'
+    )
     
     app.config['SQLALCHEMY_DATABASE_URI'] = DATABASE_URL
     app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
-    app.config['SECRET_KEY'] = 'dev-secret-key-change-in-production'
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = get_engine_options(DATABASE_URL)
+    app.config['SECRET_KEY'] = os.environ.get('SECRET_KEY', 'dev-secret-key-change-in-production')
     
     db.init_app(app)
     migrate.init_app(app, db)
     
     return db
 
+
+def get_engine_options(database_url):
+    """
+    Connection pool settings per process, read from environment
+    
+    Each server worker process has its own pool, so the number of PostgreSQL
+    connections is at most workers * (DB_POOL_SIZE + DB_MAX_OVERFLOW). Size the
+    pool to the worker's thread count; overflow covers upload jobs and bursts.
+    
+    - DB_POOL_SIZE: persistent connections per process (default 5)
+    - DB_MAX_OVERFLOW: extra connections above the pool size (default 10)
+    - DB_POOL_TIMEOUT: seconds to wait for a free connection (default 30)
+    - DB_POOL_RECYCLE: reconnect connections older than this many seconds (default 1800)
+    - DB_POOL_PRE_PING: test connections before use (default true)
+    """
+    options = {
+        'pool_pre_ping': os.environ.get('DB_POOL_PRE_PING', 'true').lower() in ('1', 'true', 'yes'),
+        'pool_recycle': int(os.environ.get('DB_POOL_RECYCLE', 1800))
+    }
+    
+    # SQLite (local tools/tests) does not use a sized QueuePool
+    if not database_url.startswith('sqlite'):
+        options['pool_size'] = int(os.environ.get('DB_POOL_SIZE', 5))
+        options['max_overflow'] = int(os.environ.get('DB_MAX_OVERFLOW', 10))
+        options['pool_timeout'] = int(os.environ.get('DB_POOL_TIMEOUT', 30))
+    
+    return options
+
 class User(db.Model):
     __tablename__ = 'users'
     
@@ -155,7 +187,7 @@ class UploadLog(db.Model):
     file_size = db.Column(db.BigInteger)
     file_type = db.Column(db.String(50))
     upload_time = db.Column(db.DateTime, default=jakarta_now)
-    status = db.Column(db.String(20), default='processing')  # processing, success, failed, cancelled
+    status = db.Column(db.String(20), default='processing')  # queued, processing, success, failed, cancelled
     rows_processed = db.Column(db.Integer, default=0)
     rows_success = db.Column(db.Integer, default=0)
     rows_failed = db.Column(db.Integer, default=0)
@@ -184,6 +216,39 @@ class UploadLog(db.Model):
             'processing_time_seconds': self.processing_time_seconds
         }
 
+class UploadStageMetric(db.Model):
+    """Waktu, jumlah baris dan kenaikan puncak RSS per langkah pipeline satu upload"""
+    __tablename__ = 'upload_stage_metrics'
+    
+    stage_metric_id = db.Column(db.Integer, primary_key=True)
+    upload_id = db.Column(db.Integer, db.ForeignKey('upload_logs.upload_id', ondelete='CASCADE'),
+                          nullable=False, index=True)
+    stage_order = db.Column(db.Integer, nullable=False)
+    stage = db.Column(db.String(50), nullable=False)  # analyze, extract, convert_dates, ..., insert, log
+    calls = db.Column(db.Integer, default=1)  # Jumlah eksekusi (per chunk pada upload streaming)
+    wall_time_seconds = db.Column(db.Float)
+    rows_in = db.Column(db.Integer)
+    rows_out = db.Column(db.Integer)
+    peak_rss_delta_bytes = db.Column(db.BigInteger)  # Kenaikan puncak RSS proses selama langkah
+    created_at = db.Column(db.DateTime, default=jakarta_now)
+    
+    # Relationship
+    upload = db.relationship('UploadLog', backref=db.backref(
+        'stage_metrics', lazy=True, cascade='all, delete-orphan', passive_deletes=True,
+        order_by='UploadStageMetric.stage_order'
+    ))
+    
+    def to_dict(self):
+        return {
+            'stage': self.stage,
+            'stage_order': self.stage_order,
+            'calls': self.calls,
+            'wall_time_seconds': self.wall_time_seconds,
+            'rows_in': self.rows_in,
+            'rows_out': self.rows_out,
+            'peak_rss_delta_bytes': self.peak_rss_delta_bytes
+        }
+
 class LoginLog(db.Model):
     __tablename__ = 'login_logs'
     
@@ -215,9 +280,9 @@ class DataAnalytics(db.Model):
     kelas_rawat = db.Column(db.Text)
     kode_tarif = db.Column(db.Text)
     ptd = db.Column(db.Integer)
-    admission_date = db.Column(db.Text)
-    discharge_date = db.Column(db.Text)
-    birth_date = db.Column(db.Text)
+    admission_date = db.Column(db.DateTime, index=True)
+    discharge_date = db.Column(db.DateTime, index=True)
+    birth_date = db.Column(db.Date)
     birth_weight = db.Column(db.Numeric)
     sex = db.Column(db.Integer)
     discharge_status = db.Column(db.Integer)
@@ -293,6 +358,30 @@ class DataAnalytics(db.Model):
     coder = db.relationship('User', foreign_keys=[coder_id])
 
 
+class InacbgMonthlySummary(db.Model):
+    """Ringkasan agregat data_analytics per kode INACBG dan bulan admission"""
+    __tablename__ = 'inacbg_monthly_summary'
+    __table_args__ = (
+        db.UniqueConstraint('inacbg', 'deskripsi_inacbg', 'admission_month',
+                            name='uq_inacbg_monthly_summary_key'),
+    )
+    
+    summary_id = db.Column(db.Integer, primary_key=True)
+    inacbg = db.Column(db.Text, nullable=False, default='')  # '' untuk INACBG kosong
+    deskripsi_inacbg = db.Column(db.Text, nullable=False, default='')
+    admission_month = db.Column(db.Date, nullable=False, index=True)  # Tanggal 1 bulan admission, 1900-01-01 jika tidak ada
+    jumlah_kunjungan = db.Column(db.BigInteger, nullable=False, default=0)  # COUNT(sep)
+    los_count = db.Column(db.BigInteger, nullable=False, default=0)
+    los_sum = db.Column(db.BigInteger)
+    los_min = db.Column(db.Integer)
+    los_max = db.Column(db.Integer)
+    total_tarif_count = db.Column(db.BigInteger, nullable=False, default=0)
+    total_tarif_sum = db.Column(db.BigInteger)
+    tarif_rs_count = db.Column(db.BigInteger, nullable=False, default=0)
+    tarif_rs_sum = db.Column(db.BigInteger)
+    updated_at = db.Column(db.DateTime, default=jakarta_now, onupdate=jakarta_now)
+
+
 class UserActivityLog(db.Model):
     __tablename__ = 'user_activity_logs'
     
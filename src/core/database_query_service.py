@@ -2,122 +2,338 @@
 Database Query Service for querying data from database
 Simplified version focusing only on DataAnalytics table
 """
+import json
 import pandas as pd
 import logging
 from typing import List, Dict, Any, Optional, Tuple
-from datetime import datetime, timedelta
-from sqlalchemy import func, and_, or_
+from datetime import date, datetime, timedelta
+from sqlalchemy import Numeric, func, and_, text
 
 from core.database import db, DataAnalytics
+from core.stats_cache import stats_cache
+from core.inacbg_summary import InacbgSummaryService
+from core.search_service import SearchService
+from core.snapshot_cache import SnapshotCache
+from core.derived_metrics import DerivedMetric, SELISIH_TARIF, compile_metrics
+from core.column_dtypes import apply_column_dtypes
 
 logger = logging.getLogger(__name__)
 
+# Key statistik data_analytics/upload_logs di stats_cache
+DATABASE_STATS_CACHE_KEY = 'database_stats'
+
+# Kolom tanggal (timestamp/date di database) yang selalu dikembalikan sebagai datetime64
+DATE_COLUMNS = {
+    'ADMISSION_DATE', 'DISCHARGE_DATE', 'BIRTH_DATE',
+    'admission_date', 'discharge_date', 'birth_date'
+}
+
+
+# Mapping kolom DataFrame ke atribut DataAnalytics untuk setiap view analisa
+VIEW_COLUMN_MAPPINGS = {
+    'financial': {
+        'SEP': 'sep',
+        'MRN': 'mrn',
+        'NAMA_PASIEN': 'nama_pasien',
+        'DPJP': 'dpjp',
+        'ADMISSION_DATE': 'admission_date',
+        'DISCHARGE_DATE': 'discharge_date',
+        'LOS': 'los',
+        'KELAS_RAWAT': 'kelas_rawat',
+        'INACBG': 'inacbg',
+        'TOTAL_TARIF': 'total_tarif',
+        'TARIF_RS': 'tarif_rs',
+        'PROSEDUR_NON_BEDAH': 'prosedur_non_bedah',
+        'PROSEDUR_BEDAH': 'prosedur_bedah',
+        'KONSULTASI': 'konsultasi',
+        'TENAGA_AHLI': 'tenaga_ahli',
+        'KEPERAWATAN': 'keperawatan',
+        'PENUNJANG': 'penunjang',
+        'RADIOLOGI': 'radiologi',
+        'LABORATORIUM': 'laboratorium',
+        'PELAYANAN_DARAH': 'pelayanan_darah',
+        'KAMAR_AKOMODASI': 'kamar_akomodasi',
+        'OBAT': 'obat'
+    },
+    'patient': {
+        'SEP': 'sep',
+        'MRN': 'mrn',
+        'NAMA_PASIEN': 'nama_pasien',
+        'ADMISSION_DATE': 'admission_date',
+        'DISCHARGE_DATE': 'discharge_date',
+        'LOS': 'los',
+        'KELAS_RAWAT': 'kelas_rawat',
+        'INACBG': 'inacbg',
+        'BIRTH_DATE': 'birth_date',
+        'BIRTH_WEIGHT': 'birth_weight',
+        'SEX': 'sex',
+        'DISCHARGE_STATUS': 'discharge_status',
+        'DIAGLIST': 'diaglist',
+        'PROCLIST': 'proclist',
+        'ADL1': 'adl1',
+        'ADL2': 'adl2',
+        'UMUR_TAHUN': 'umur_tahun',
+        'UMUR_HARI': 'umur_hari',
+        'DPJP': 'dpjp',
+        'NOKARTU': 'nokartu',
+        'PAYOR_ID': 'payor_id',
+        'CODER_ID': 'coder_id',
+        'VERSI_INACBG': 'versi_inacbg',
+        'VERSI_GROUPER': 'versi_grouper'
+    },
+    'los': {
+        'SEP': 'sep',
+        'MRN': 'mrn',
+        'NAMA_PASIEN': 'nama_pasien',
+        'INACBG': 'inacbg',
+        'DESKRIPSI_INACBG': 'deskripsi_inacbg',
+        'LOS': 'los',
+        'ADMISSION_DATE': 'admission_date',
+        'DISCHARGE_DATE': 'discharge_date',
+        'TOTAL_TARIF': 'total_tarif',
+        'TARIF_RS': 'tarif_rs'
+    },
+    'ventilator': {
+        'SEP': 'sep',
+        'MRN': 'mrn',
+        'NAMA_PASIEN': 'nama_pasien',
+        'ADMISSION_DATE': 'admission_date',
+        'DISCHARGE_DATE': 'discharge_date',
+        'LOS': 'los',
+        'VENT_HOUR': 'vent_hour',
+        'ICU_INDIKATOR': 'icu_indikator',
+        'ICU_LOS': 'icu_los',
+        'INACBG': 'inacbg',
+        'DESKRIPSI_INACBG': 'deskripsi_inacbg',
+        'TOTAL_TARIF': 'total_tarif',
+        'TARIF_RS': 'tarif_rs'
+    },
+    'selisih_tarif': {
+        'SEP': 'sep',
+        'MRN': 'mrn',
+        'NAMA_PASIEN': 'nama_pasien',
+        'INACBG': 'inacbg',
+        'TOTAL_TARIF': 'total_tarif',
+        'TARIF_RS': 'tarif_rs',
+        'LOS': 'los',
+        'DIAGLIST': 'diaglist',
+        'PROCLIST': 'proclist',
+        'ADMISSION_DATE': 'admission_date',
+        'DISCHARGE_DATE': 'discharge_date'
+    }
+}
+
+# Kolom data_analytics yang disimpan di snapshot Parquet (gabungan kolom semua view)
+SNAPSHOT_COLUMNS = list(dict.fromkeys(
+    attr for mapping in VIEW_COLUMN_MAPPINGS.values() for attr in mapping.values()
+))
+
+# Filter yang bisa dilayani snapshot; filter lain selalu di-query ke database
+SNAPSHOT_FILTER_KEYS = {'start_date', 'end_date'}
+
+# Di atas jumlah ini (perkiraan planner), total halaman memakai estimasi, bukan COUNT(*)
+EXACT_COUNT_THRESHOLD = 10000
+
+# Batas jumlah baris per halaman untuk endpoint paginasi
+MAX_PAGE_SIZE = 500
+
+# Jumlah baris per fetchmany saat membaca hasil query ke DataFrame
+QUERY_FETCH_BATCH_SIZE = 10000
+
 
 class DatabaseQueryService:
     """Service for querying data from database - simplified for DataAnalytics only"""
     
     def __init__(self):
-        pass
+        self.search_service = SearchService()
+        self.snapshot_cache = SnapshotCache()
     
     def _query_to_dataframe(self, query, column_mapping: Dict[str, str] = None) -> pd.DataFrame:
         """
         Helper method to convert SQLAlchemy query results to DataFrame
         
+        The query is executed as a core select of only the needed columns (no ORM
+        instances), rows are fetched in fetchmany batches (server-side cursor on
+        PostgreSQL) and the frame is built once with DataFrame.from_records.
+        
         Args:
             query: SQLAlchemy query object
-            column_mapping: Optional mapping from model attributes to DataFrame column names
-                           If None, uses direct attribute access
+            column_mapping: Optional mapping from DataFrame column names to model attributes
+                           If None, the query's column labels are used
             
         Returns:
             DataFrame with query results
         """
         try:
-            results = query.all()
-            
-            if not results:
-                return pd.DataFrame()
-            
-            # If column mapping provided, use it
             if column_mapping:
-                df = pd.DataFrame([{
-                    df_col: getattr(row, model_attr, None) 
+                query = query.with_entities(*[
+                    getattr(DataAnalytics, model_attr).label(df_col)
                     for df_col, model_attr in column_mapping.items()
-                } for row in results])
-            else:
-                # Try to infer columns from first result
-                first_row = results[0]
-                if hasattr(first_row, '__table__'):
-                    # SQLAlchemy model instance
-                    columns = {col.name: col.name for col in first_row.__table__.columns}
-                    df = pd.DataFrame([{
-                        col: getattr(row, col, None) for col in columns.keys()
-                    } for row in results])
-                else:
-                    # Raw query result (e.g., from func.aggregate())
-                    # Get column names from first row's keys
-                    if hasattr(first_row, '_fields'):
-                        # Named tuple from query
-                        columns = first_row._fields
-                        df = pd.DataFrame([dict(row._asdict()) for row in results])
-                    else:
-                        # Try to convert directly
-                        df = pd.DataFrame([dict(row) for row in results])
-            
-            return df
+                ])
+            elif any(desc.get('entity') is DataAnalytics and desc.get('expr') is DataAnalytics
+                     for desc in query.column_descriptions):
+                # Whole-entity query: select the table columns instead of ORM instances
+                query = query.with_entities(*DataAnalytics.__table__.columns)
+            
+            statement = query.statement
+            selected = list(statement.selected_columns)
+            
+            rows = []
+            result = db.session.connection().execute(statement, execution_options={'stream_results': True})
+            try:
+                while True:
+                    batch = result.fetchmany(QUERY_FETCH_BATCH_SIZE)
+                    if not batch:
+                        break
+                    rows.extend(batch)
+            finally:
+                result.close()
+            
+            if not rows:
+                return pd.DataFrame()
+            
+            return self._rows_to_dataframe(rows, selected)
             
         except Exception as e:
             logger.error(f"Error converting query to DataFrame: {e}", exc_info=True)
             return pd.DataFrame()
     
-    def get_financial_data(self, filters: Dict[str, Any] = None, limit: int = 1000) -> pd.DataFrame:
+    def _rows_to_dataframe(self, rows, selected) -> pd.DataFrame:
+        """Build a DataFrame column-wise from fetched rows of a select"""
+        df = pd.DataFrame.from_records(rows, columns=[column.name for column in selected])
+        return self._coerce_result_types(df, selected)
+    
+    def _coerce_result_types(self, df: pd.DataFrame, selected) -> pd.DataFrame:
+        """
+        Convert columns whose DBAPI values arrive as Python objects
+        
+        Numeric columns (DECIMAL values) become float64; date columns become datetime64;
+        DataAnalytics columns get their registry dtype (core.column_dtypes).
+        """
+        for column in selected:
+            if isinstance(column.type, Numeric) and df[column.name].dtype == object:
+                df[column.name] = pd.to_numeric(df[column.name], errors='coerce')
+        return apply_column_dtypes(self._ensure_datetime_columns(df))
+    
+    def get_view_template(self, view: str, derived_metrics: Optional[List[DerivedMetric]] = None) -> pd.DataFrame:
+        """
+        One-row DataFrame with the columns and types of a view, without touching the database
+        
+        Built from the SQL types of the view query (same dtype coercion as real
+        query results), so handlers can derive their output schema by processing
+        it instead of loading the whole view.
+        
+        Args:
+            view: View name ('financial', 'patient', 'selisih_tarif', 'los', 'inacbg', 'ventilator')
+            derived_metrics: Derived metric columns, typed like get_paginated_data selects them
+            
+        Returns:
+            DataFrame with one placeholder row
+        """
+        if view == 'inacbg':
+            # Raw aggregation has the same columns as the summary query and needs no readiness check
+            query, _ = InacbgSummaryService().build_query(use_summary=False)
+        else:
+            query, _, _ = self._build_filtered_view_query(view, derived_metrics=derived_metrics)
+        
+        selected = list(query.statement.selected_columns)
+        row = tuple(_template_value(column.type) for column in selected)
+        return self._rows_to_dataframe([row], selected)
+    
+    def _ensure_datetime_columns(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Make sure date columns are datetime64
+        
+        Timestamp columns already arrive as datetime64; date columns (birth_date) and
+        all-NULL columns arrive as object and are converted once here.
+        """
+        for col in DATE_COLUMNS.intersection(df.columns):
+            if not pd.api.types.is_datetime64_any_dtype(df[col]):
+                df[col] = pd.to_datetime(df[col], errors='coerce')
+        return df
+    
+    def _read_snapshot(self, view: str, filters: Dict[str, Any] = None) -> Optional[pd.DataFrame]:
+        """
+        Read a view's columns from the Parquet snapshot
+        
+        Args:
+            view: Key of VIEW_COLUMN_MAPPINGS
+            filters: Dictionary of filters; only date ranges are served from the snapshot
+            
+        Returns:
+            DataFrame with view column names, or None when the caller must query the database
+            (pyarrow missing, snapshot absent or stale, unsupported filters, read error)
+        """
+        filters = filters or {}
+        if not self.snapshot_cache.available:
+            return None
+        if any(value for key, value in filters.items() if key not in SNAPSHOT_FILTER_KEYS):
+            return None
+        
+        column_mapping = VIEW_COLUMN_MAPPINGS[view]
+        last_upload_id = self.get_database_stats().get('last_upload_id')
+        if not self.snapshot_cache.is_fresh(last_upload_id, column_mapping.values()):
+            return None
+        
+        try:
+            start_dt, end_dt = self._date_range(filters)
+            df = self.snapshot_cache.read(list(column_mapping.values()), start_dt, end_dt)
+            df = df.rename(columns={attr: df_col for df_col, attr in column_mapping.items()})
+            if df.empty:
+                return pd.DataFrame()
+            return apply_column_dtypes(self._ensure_datetime_columns(df))
+            
+        except Exception as e:
+            logger.warning(f"Snapshot read failed for {view}, querying database: {e}")
+            return None
+    
+    def refresh_snapshot(self) -> Dict[str, Any]:
+        """
+        Rebuild the Parquet snapshot after a successful upload
+        
+        The last successful upload_id is read before the data, so an upload that
+        commits while the snapshot is being written leaves it stale instead of
+        marking incomplete data as fresh.
+        """
+        if not self.snapshot_cache.available:
+            return {'success': False, 'error': 'pyarrow is not installed'}
+        
+        from core.database import UploadLog
+        last_upload_id = db.session.query(func.max(UploadLog.upload_id)).filter(
+            UploadLog.status == 'success'
+        ).scalar()
+        if last_upload_id is None:
+            return {'success': False, 'error': 'No successful upload'}
+        
+        return self.snapshot_cache.build(SNAPSHOT_COLUMNS, last_upload_id)
+    
+    def get_financial_data(self, filters: Dict[str, Any] = None, limit: Optional[int] = None) -> pd.DataFrame:
         """
         Get financial data from DataAnalytics table with performance optimization
         
         Args:
             filters: Dictionary of filters to apply
-            limit: Maximum number of records to return (default: 1000)
+            limit: Maximum number of records to return (default: all; pages use get_paginated_data)
             
         Returns:
             DataFrame with financial data
         """
         try:
-            # Base query using DataAnalytics table
-            query = db.session.query(DataAnalytics)
+            snapshot = self._read_snapshot('financial', filters)
+            if snapshot is not None:
+                return snapshot if limit is None else snapshot.head(limit)
+            
+            # Only the mapped columns, not full DataAnalytics rows
+            query, _ = self._build_view_query('financial')
             
             # Apply filters
             if filters:
                 query = self._apply_filters(query, filters)
             
-            # Apply limit for performance
-            query = query.limit(limit)
-            
-            # Column mapping for financial data
-            column_mapping = {
-                'SEP': 'sep',
-                'MRN': 'mrn',
-                'NAMA_PASIEN': 'nama_pasien',
-                'DPJP': 'dpjp',
-                'ADMISSION_DATE': 'admission_date',
-                'DISCHARGE_DATE': 'discharge_date',
-                'LOS': 'los',
-                'KELAS_RAWAT': 'kelas_rawat',
-                'INACBG': 'inacbg',
-                'TOTAL_TARIF': 'total_tarif',
-                'TARIF_RS': 'tarif_rs',
-                'PROSEDUR_NON_BEDAH': 'prosedur_non_bedah',
-                'PROSEDUR_BEDAH': 'prosedur_bedah',
-                'KONSULTASI': 'konsultasi',
-                'TENAGA_AHLI': 'tenaga_ahli',
-                'KEPERAWATAN': 'keperawatan',
-                'PENUNJANG': 'penunjang',
-                'RADIOLOGI': 'radiologi',
-                'LABORATORIUM': 'laboratorium',
-                'PELAYANAN_DARAH': 'pelayanan_darah',
-                'KAMAR_AKOMODASI': 'kamar_akomodasi',
-                'OBAT': 'obat'
-            }
+            if limit is not None:
+                query = query.limit(limit)
             
-            return self._query_to_dataframe(query, column_mapping)
+            return self._query_to_dataframe(query)
             
         except Exception as e:
             logger.error(f"Error getting financial data: {e}", exc_info=True)
@@ -136,65 +352,62 @@ class DatabaseQueryService:
         Returns:
             Dictionary with data, pagination info, and metadata
         """
-        try:
-            # Base query using DataAnalytics table
-            query = db.session.query(DataAnalytics)
+        return self.get_paginated_data('financial', filters, page, per_page)
+    
+    def get_paginated_data(self, view: str, filters: Dict[str, Any] = None,
+                           page: int = 1, per_page: int = 100,
+                           sort_column: Optional[str] = None, sort_order: str = 'ASC',
+                           derived_metrics: Optional[List[DerivedMetric]] = None) -> Dict[str, Any]:
+        """
+        Get one page of an analysis view with filtering and sorting done in SQL
+        
+        Args:
+            view: View name ('financial', 'patient', 'selisih_tarif', 'los', 'inacbg', 'ventilator')
+            filters: Dictionary of filters (start_date, end_date, filter_column, filter_value)
+            page: Page number (1-based)
+            per_page: Number of records per page (capped at MAX_PAGE_SIZE)
+            sort_column: Query column to sort by (see _build_view_query)
+            sort_order: Sort order ('ASC' or 'DESC')
+            derived_metrics: Derived metric columns of the view, selected as SQL
+                             expressions so they can be sorted and filtered on
             
-            # Apply filters
-            if filters:
-                query = self._apply_filters(query, filters)
+        Returns:
+            Dictionary with data, pagination info, and metadata
+        """
+        page = max(int(page or 1), 1)
+        per_page = min(max(int(per_page or 1), 1), MAX_PAGE_SIZE)
+        
+        try:
+            query, columns, is_aggregate = self._build_filtered_view_query(view, filters, derived_metrics)
+            total, total_is_estimate = self._estimate_total(query)
             
-            # Get total count
-            total = query.count()
-            
-            # Apply pagination
-            offset = (page - 1) * per_page
-            paginated_query = query.offset(offset).limit(per_page)
-            
-            # Column mapping for financial data
-            column_mapping = {
-                'SEP': 'sep',
-                'MRN': 'mrn',
-                'NAMA_PASIEN': 'nama_pasien',
-                'DPJP': 'dpjp',
-                'ADMISSION_DATE': 'admission_date',
-                'DISCHARGE_DATE': 'discharge_date',
-                'LOS': 'los',
-                'KELAS_RAWAT': 'kelas_rawat',
-                'INACBG': 'inacbg',
-                'TOTAL_TARIF': 'total_tarif',
-                'TARIF_RS': 'tarif_rs',
-                'PROSEDUR_NON_BEDAH': 'prosedur_non_bedah',
-                'PROSEDUR_BEDAH': 'prosedur_bedah',
-                'KONSULTASI': 'konsultasi',
-                'TENAGA_AHLI': 'tenaga_ahli',
-                'KEPERAWATAN': 'keperawatan',
-                'PENUNJANG': 'penunjang',
-                'RADIOLOGI': 'radiologi',
-                'LABORATORIUM': 'laboratorium',
-                'PELAYANAN_DARAH': 'pelayanan_darah',
-                'KAMAR_AKOMODASI': 'kamar_akomodasi',
-                'OBAT': 'obat'
-            }
+            # Sorting with a unique tie-breaker so pages are stable
+            order_by, sort_column = self._view_order_by(columns, sort_column, sort_order, is_aggregate)
             
-            df = self._query_to_dataframe(paginated_query, column_mapping)
+            page_query = query.order_by(*order_by).offset((page - 1) * per_page).limit(per_page)
+            df = self._query_to_dataframe(page_query)
             
+            pages = (total + per_page - 1) // per_page
             return {
                 'data': df,
                 'total': total,
+                'total_is_estimate': total_is_estimate,
                 'page': page,
                 'per_page': per_page,
-                'pages': (total + per_page - 1) // per_page,
-                'has_next': page < (total + per_page - 1) // per_page,
-                'has_prev': page > 1
+                'pages': pages,
+                'has_next': page < pages,
+                'has_prev': page > 1,
+                'sort_column': sort_column,
+                'sort_order': 'DESC' if str(sort_order).upper() == 'DESC' else 'ASC'
             }
             
         except Exception as e:
-            logger.error(f"Error getting paginated financial data: {e}", exc_info=True)
+            logger.error(f"Error getting paginated {view} data: {e}", exc_info=True)
             return {
                 'data': pd.DataFrame(),
                 'total': 0,
-                'page': 1,
+                'total_is_estimate': False,
+                'page': page,
                 'per_page': per_page,
                 'pages': 0,
                 'has_next': False,
@@ -202,6 +415,162 @@ class DatabaseQueryService:
                 'error': str(e)
             }
     
+    def iter_view_batches(self, view: str, filters: Dict[str, Any] = None,
+                          sort_column: Optional[str] = None, sort_order: str = 'ASC',
+                          derived_metrics: Optional[List[DerivedMetric]] = None,
+                          batch_size: int = QUERY_FETCH_BATCH_SIZE):
+        """
+        Stream a whole analysis view in DataFrame batches
+        
+        Uses the same filtering and sorting as get_paginated_data, but reads the
+        result from a server-side cursor so memory stays bounded by batch_size.
+        Must be consumed inside an app context (e.g. flask.stream_with_context).
+        
+        Args:
+            view: View name
+            filters: Dictionary of filters (start_date, end_date, filter_column, filter_value)
+            sort_column: Query column to sort by
+            sort_order: Sort order ('ASC' or 'DESC')
+            derived_metrics: Derived metric columns selected as SQL expressions
+            batch_size: Rows per batch
+            
+        Yields:
+            DataFrame batches with view column names
+        """
+        query, columns, is_aggregate = self._build_filtered_view_query(view, filters, derived_metrics)
+        order_by, _ = self._view_order_by(columns, sort_column, sort_order, is_aggregate)
+        statement = query.order_by(*order_by).statement
+        selected = list(statement.selected_columns)
+        
+        result = db.session.connection().execute(statement, execution_options={'stream_results': True})
+        try:
+            while True:
+                rows = result.fetchmany(batch_size)
+                if not rows:
+                    break
+                yield self._rows_to_dataframe(rows, selected)
+        finally:
+            result.close()
+    
+    def _build_filtered_view_query(self, view: str, filters: Dict[str, Any] = None,
+                                   derived_metrics: Optional[List[DerivedMetric]] = None):
+        """
+        Build a view query with derived metric columns, date range and column filter applied
+        
+        Returns:
+            Tuple of (query, dict of column name -> SQL expression, is_aggregate)
+        """
+        is_aggregate = view == 'inacbg'
+        filters = filters or {}
+        date_filters = {key: filters[key] for key in ('start_date', 'end_date') if filters.get(key)}
+        query, columns = self._build_view_query(view, date_filters)
+        if derived_metrics and not is_aggregate:
+            metric_columns = compile_metrics(derived_metrics, columns)
+            query = query.add_columns(*[expression.label(name) for name, expression in metric_columns.items()])
+            columns.update(metric_columns)
+        
+        # Date range filter on admission_date (index range scan); the aggregate
+        # view applies the date range while building its query
+        if not is_aggregate:
+            query = self._apply_filters(query, date_filters)
+        
+        # Column filter on the selected (or aggregated) expression
+        filter_column = filters.get('filter_column')
+        filter_value = filters.get('filter_value')
+        if filter_column in columns and filter_value:
+            query = self._apply_column_filter(query, columns[filter_column], filter_value, having=is_aggregate)
+        
+        return query, columns, is_aggregate
+    
+    def _view_order_by(self, columns: Dict[str, Any], sort_column: Optional[str],
+                       sort_order: str, is_aggregate: bool) -> Tuple[List[Any], Optional[str]]:
+        """
+        ORDER BY clauses for a view query, with a unique tie-breaker
+        
+        Returns:
+            Tuple of (order_by expressions, sort column actually used or None)
+        """
+        if sort_column not in columns:
+            sort_column = None
+        order_by = []
+        if sort_column:
+            expression = columns[sort_column]
+            order_by.append(expression.desc() if str(sort_order).upper() == 'DESC' else expression.asc())
+        order_by.append(columns['INACBG'] if is_aggregate else DataAnalytics.data_id)
+        return order_by, sort_column
+    
+    def _build_view_query(self, view: str, filters: Dict[str, Any] = None):
+        """
+        Build the base query for an analysis view
+        
+        Args:
+            view: View name
+            filters: Date filters (start_date, end_date); only used by the aggregate
+                     'inacbg' view, other views are filtered with _apply_filters
+        
+        Returns:
+            Tuple of (query, dict of column name -> labeled SQL expression)
+        """
+        if view == 'inacbg':
+            # Full months are read from inacbg_monthly_summary; raw data_analytics
+            # is only aggregated for partial months or when the summary is stale
+            summary_service = InacbgSummaryService()
+            start_dt, end_dt = self._date_range(filters or {})
+            return summary_service.build_query(start_dt, end_dt, use_summary=summary_service.is_ready())
+        else:
+            if view not in VIEW_COLUMN_MAPPINGS:
+                raise ValueError(f"Unknown view: {view}")
+            
+            columns = [
+                getattr(DataAnalytics, model_attr).label(df_col)
+                for df_col, model_attr in VIEW_COLUMN_MAPPINGS[view].items()
+            ]
+            if view == 'selisih_tarif':
+                view_columns = {column.name: column.element for column in columns}
+                columns.append(SELISIH_TARIF.to_sql(view_columns).label('SELISIH_TARIF'))
+            query = db.session.query(*columns)
+        
+        return query, {column.name: column.element for column in columns}
+    
+    def _apply_column_filter(self, query, expression, filter_value: str, having: bool = False):
+        """
+        Filter on a view column; data_analytics columns use the operator for their type
+        (trigram, prefix or equality, see SearchService), other expressions use 'contains'
+        """
+        condition = self.search_service.expression_condition(expression, filter_value)
+        if condition is None:
+            return query
+        return query.having(condition) if having else query.filter(condition)
+    
+    def _estimate_total(self, query) -> Tuple[int, bool]:
+        """
+        Count rows for a paginated query
+        
+        On PostgreSQL the planner estimate is used when it is above EXACT_COUNT_THRESHOLD,
+        so the total does not require scanning millions of rows on every page request.
+        
+        Returns:
+            Tuple of (total, is_estimate)
+        """
+        count_query = query.order_by(None)
+        
+        if db.session.get_bind().dialect.name == 'postgresql':
+            try:
+                compiled = count_query.statement.compile(dialect=db.session.get_bind().dialect)
+                plan = db.session.connection().exec_driver_sql(
+                    f"EXPLAIN (FORMAT JSON) {compiled}", compiled.params
+                ).scalar()
+                if isinstance(plan, str):
+                    plan = json.loads(plan)
+                estimate = int(plan[0]['Plan']['Plan Rows'])
+                if estimate > EXACT_COUNT_THRESHOLD:
+                    return estimate, True
+            except Exception as e:
+                db.session.rollback()
+                logger.warning(f"Could not estimate row count, falling back to COUNT: {e}")
+        
+        return count_query.count(), False
+    
     def get_inacbg_data(self, filters: Dict[str, Any] = None) -> pd.DataFrame:
         """
         Get INACBG analysis data
@@ -213,46 +582,9 @@ class DatabaseQueryService:
             DataFrame with INACBG data
         """
         try:
-            # Base query with aggregations
-            query = db.session.query(
-                DataAnalytics.inacbg,
-                DataAnalytics.deskripsi_inacbg,
-                func.count(DataAnalytics.sep).label('jumlah_kunjungan'),
-                func.avg(DataAnalytics.los).label('rata_los'),
-                func.min(DataAnalytics.los).label('min_los'),
-                func.max(DataAnalytics.los).label('max_los'),
-                func.avg(DataAnalytics.total_tarif).label('rata_tarif'),
-                func.sum(DataAnalytics.total_tarif).label('total_tarif'),
-                func.avg(DataAnalytics.tarif_rs).label('rata_tarif_rs'),
-                func.sum(DataAnalytics.tarif_rs).label('total_tarif_rs')
-            ).group_by(DataAnalytics.inacbg, DataAnalytics.deskripsi_inacbg)
-            
-            # Apply filters
-            if filters:
-                query = self._apply_filters(query, filters)
-            
-            # Convert to DataFrame (use named tuple conversion)
-            results = query.all()
-            df = pd.DataFrame([dict(row._asdict()) for row in results])
-            
-            # Rename columns to match expected format
-            if not df.empty:
-                df.columns = [col.upper() if col not in ['inacbg', 'deskripsi_inacbg'] else col.upper()
-                             for col in df.columns]
-                df.rename(columns={
-                    'INACBG': 'INACBG',
-                    'DESKRIPSI_INACBG': 'DESKRIPSI_INACBG',
-                    'JUMLAH_KUNJUNGAN': 'jumlah_kunjungan',
-                    'RATA_LOS': 'rata_los',
-                    'MIN_LOS': 'min_los',
-                    'MAX_LOS': 'max_los',
-                    'RATA_TARIF': 'rata_tarif',
-                    'TOTAL_TARIF': 'total_tarif',
-                    'RATA_TARIF_RS': 'rata_tarif_rs',
-                    'TOTAL_TARIF_RS': 'total_tarif_rs'
-                }, inplace=True)
-            
-            return df
+            # Aggregates come from inacbg_monthly_summary (raw data only for partial months)
+            query, _ = self._build_view_query('inacbg', filters)
+            return self._query_to_dataframe(query)
             
         except Exception as e:
             logger.error(f"Error getting INACBG data: {e}", exc_info=True)
@@ -269,39 +601,18 @@ class DatabaseQueryService:
             ADMINFrame with LOS data
         """
         try:
-            # Base query
-            query = db.session.query(
-                DataAnalytics.sep,
-                DataAnalytics.mrn,
-                DataAnalytics.nama_pasien,
-                DataAnalytics.inacbg,
-                DataAnalytics.deskripsi_inacbg,
-                DataAnalytics.los,
-                DataAnalytics.admission_date,
-                DataAnalytics.discharge_date,
-                DataAnalytics.total_tarif,
-                DataAnalytics.tarif_rs
-            )
+            snapshot = self._read_snapshot('los', filters)
+            if snapshot is not None:
+                return snapshot
+            
+            # Only the view's columns, labeled with the DataFrame column names
+            query, _ = self._build_view_query('los')
             
             # Apply filters
             if filters:
                 query = self._apply_filters(query, filters)
             
-            # Column mapping
-            column_mapping = {
-                'SEP': 'sep',
-                'MRN': 'mrn',
-                'NAMA_PASIEN': 'nama_pasien',
-                'INACBG': 'inacbg',
-                'DESKRIPSI_INACBG': 'deskripsi_inacbg',
-                'LOS': 'los',
-                'ADMISSION_DATE': 'admission_date',
-                'DISCHARGE_DATE': 'discharge_date',
-                'TOTAL_TARIF': 'total_tarif',
-                'TARIF_RS': 'tarif_rs'
-            }
-            
-            return self._query_to_dataframe(query, column_mapping)
+            return self._query_to_dataframe(query)
             
         except Exception as e:
             logger.error(f"Error getting LOS data: {e}", exc_info=True)
@@ -318,45 +629,18 @@ class DatabaseQueryService:
             DataFrame with ventilator data
         """
         try:
-            # Base query - ambil semua data ventilator (termasuk yang tidak menggunakan ventilator)
-            query = db.session.query(
-                DataAnalytics.sep,
-                DataAnalytics.mrn,
-                DataAnalytics.nama_pasien,
-                DataAnalytics.admission_date,
-                DataAnalytics.discharge_date,
-                DataAnalytics.los,
-                DataAnalytics.vent_hour,
-                DataAnalytics.icu_indikator,
-                DataAnalytics.icu_los,
-                DataAnalytics.inacbg,
-                DataAnalytics.deskripsi_inacbg,
-                DataAnalytics.total_tarif,
-                DataAnalytics.tarif_rs
-            )
+            snapshot = self._read_snapshot('ventilator', filters)
+            if snapshot is not None:
+                return snapshot
+            
+            # Only the view's columns, labeled with the DataFrame column names
+            query, _ = self._build_view_query('ventilator')
             
             # Apply filters
             if filters:
                 query = self._apply_filters(query, filters)
             
-            # Column mapping
-            column_mapping = {
-                'SEP': 'sep',
-                'MRN': 'mrn',
-                'NAMA_PASIEN': 'nama_pasien',
-                'ADMISSION_DATE': 'admission_date',
-                'DISCHARGE_DATE': 'discharge_date',
-                'LOS': 'los',
-                'VENT_HOUR': 'vent_hour',
-                'ICU_INDIKATOR': 'icu_indikator',
-                'ICU_LOS': 'icu_los',
-                'INACBG': 'inacbg',
-                'DESKRIPSI_INACBG': 'deskripsi_inacbg',
-                'TOTAL_TARIF': 'total_tarif',
-                'TARIF_RS': 'tarif_rs'
-            }
-            
-            return self._query_to_dataframe(query, column_mapping)
+            return self._query_to_dataframe(query)
             
         except Exception as e:
             logger.error(f"Error getting ventilator data: {e}", exc_info=True)
@@ -373,67 +657,18 @@ class DatabaseQueryService:
             DataFrame with patient data
         """
         try:
-            # Base query
-            query = db.session.query(
-                DataAnalytics.sep,
-                DataAnalytics.mrn,
-                DataAnalytics.nama_pasien,
-                DataAnalytics.admission_date,
-                DataAnalytics.discharge_date,
-                DataAnalytics.los,
-                DataAnalytics.kelas_rawat,
-                DataAnalytics.inacbg,
-                DataAnalytics.birth_date,
-                DataAnalytics.birth_weight,
-                DataAnalytics.sex,
-                DataAnalytics.discharge_status,
-                DataAnalytics.diaglist,
-                DataAnalytics.proclist,
-                DataAnalytics.adl1,
-                DataAnalytics.adl2,
-                DataAnalytics.umur_tahun,
-                DataAnalytics.umur_hari,
-                DataAnalytics.dpjp,
-                DataAnalytics.nokartu,
-                DataAnalytics.payor_id,
-                DataAnalytics.coder_id,
-                DataAnalytics.versi_inacbg,
-                DataAnalytics.versi_grouper
-            )
+            snapshot = self._read_snapshot('patient', filters)
+            if snapshot is not None:
+                return snapshot
+            
+            # Only the view's columns, labeled with the DataFrame column names
+            query, _ = self._build_view_query('patient')
             
             # Apply filters
             if filters:
                 query = self._apply_filters(query, filters)
             
-            # Column mapping
-            column_mapping = {
-                'SEP': 'sep',
-                'MRN': 'mrn',
-                'NAMA_PASIEN': 'nama_pasien',
-                'ADMISSION_DATE': 'admission_date',
-                'DISCHARGE_DATE': 'discharge_date',
-                'LOS': 'los',
-                'KELAS_RAWAT': 'kelas_rawat',
-                'INACBG': 'inacbg',
-                'BIRTH_DATE': 'birth_date',
-                'BIRTH_WEIGHT': 'birth_weight',
-                'SEX': 'sex',
-                'DISCHARGE_STATUS': 'discharge_status',
-                'DIAGLIST': 'diaglist',
-                'PROCLIST': 'proclist',
-                'ADL1': 'adl1',
-                'ADL2': 'adl2',
-                'UMUR_TAHUN': 'umur_tahun',
-                'UMUR_HARI': 'umur_hari',
-                'DPJP': 'dpjp',
-                'NOKARTU': 'nokartu',
-                'PAYOR_ID': 'payor_id',
-                'CODER_ID': 'coder_id',
-                'VERSI_INACBG': 'versi_inacbg',
-                'VERSI_GROUPER': 'versi_grouper'
-            }
-            
-            return self._query_to_dataframe(query, column_mapping)
+            return self._query_to_dataframe(query)
             
         except Exception as e:
             logger.error(f"Error getting patient data: {e}", exc_info=True)
@@ -450,97 +685,82 @@ class DatabaseQueryService:
             DataFrame with tariff difference data
         """
         try:
-            # Base query
-            query = db.session.query(
-                DataAnalytics.sep,
-                DataAnalytics.mrn,
-                DataAnalytics.nama_pasien,
-                DataAnalytics.inacbg,
-                DataAnalytics.total_tarif,
-                DataAnalytics.tarif_rs,
-                DataAnalytics.los,
-                DataAnalytics.diaglist,
-                DataAnalytics.proclist,
-                DataAnalytics.admission_date,
-                DataAnalytics.discharge_date,
-                (DataAnalytics.total_tarif - DataAnalytics.tarif_rs).label('SELISIH_TARIF')
-            )
+            snapshot = self._read_snapshot('selisih_tarif', filters)
+            if snapshot is not None:
+                if not snapshot.empty:
+                    snapshot['SELISIH_TARIF'] = SELISIH_TARIF.compute(snapshot)
+                return snapshot
+            
+            # View columns plus the calculated SELISIH_TARIF column
+            query, _ = self._build_view_query('selisih_tarif')
             
             # Apply filters
             if filters:
                 query = self._apply_filters(query, filters)
             
-            # For queries with calculated fields, use direct conversion
-            results = query.all()
-            df = pd.DataFrame([dict(row._asdict()) for row in results])
-            
-            # Rename to uppercase for consistency
-            if not df.empty:
-                df.columns = [col.upper() if col != 'SELISIH_TARIF' else col for col in df.columns]
-            
-            return df
+            return self._query_to_dataframe(query)
             
         except Exception as e:
             logger.error(f"Error getting tariff difference data: {e}", exc_info=True)
             return pd.DataFrame()
     
+    @staticmethod
+    def _parse_date_str(s: str) -> Optional[datetime]:
+        """Parse a date filter string to a datetime object"""
+        if not s:
+            return None
+        s = str(s).strip()
+        # Try common formats
+        date_formats = [
+            '%Y-%m-%d',           # YYYY-MM-DD
+            '%d/%m/%Y',           # DD/MM/YYYY
+            '%Y/%m/%d',           # YYYY/MM/DD
+            '%d-%m-%Y',           # DD-MM-YYYY
+            '%Y-%m-%d %H:%M:%S'   # YYYY-MM-DD HH:MM:SS
+        ]
+        
+        for fmt in date_formats:
+            try:
+                return datetime.strptime(s, fmt)
+            except Exception:
+                continue
+        
+        # Try pandas as a last resort (handles ISO and other variants)
+        try:
+            dt = pd.to_datetime(s, errors='coerce')
+            if pd.isna(dt):
+                return None
+            return dt.to_pydatetime()
+        except Exception:
+            return None
+    
+    def _date_range(self, filters: Dict[str, Any]) -> Tuple[Optional[datetime], Optional[datetime]]:
+        """
+        Convert start_date/end_date filters to a half-open admission_date range
+        
+        Returns:
+            Tuple of (start of start_date, start of the day after end_date); None when not set
+        """
+        start_dt = self._parse_date_str(filters.get('start_date'))
+        if start_dt:
+            start_dt = start_dt.replace(hour=0, minute=0, second=0, microsecond=0)
+        
+        end_dt = self._parse_date_str(filters.get('end_date'))
+        if end_dt:
+            end_dt = end_dt.replace(hour=0, minute=0, second=0, microsecond=0) + timedelta(days=1)
+        
+        return start_dt, end_dt
+    
     def _apply_filters(self, query, filters: Dict[str, Any]):
         """Apply filters to query with flexible filtering"""
         try:
-            # Helper: parse a date string to format yang sesuai dengan database (YYYY-MM-DD HH:MM:SS)
-            def _parse_date_str(s: str):
-                if not s:
-                    return None
-                s = str(s).strip()
-                # Try common formats dan return string dalam format database
-                date_formats = [
-                    '%Y-%m-%d',           # YYYY-MM-DD
-                    '%d/%m/%Y',           # DD/MM/YYYY
-                    '%Y/%m/%d',           # YYYY/MM/DD
-                    '%d-%m-%Y',           # DD-MM-YYYY
-                    '%Y-%m-%d %H:%M:%S'   # YYYY-MM-DD HH:MM:SS
-                ]
-                
-                for fmt in date_formats:
-                    try:
-                        # Parse ke datetime object
-                        dt = datetime.strptime(s, fmt)
-                        # Return string dengan format yang sesuai database (YYYY-MM-DD HH:MM:SS)
-                        return dt.strftime('%Y-%m-%d %H:%M:%S')
-                    except Exception:
-                        continue
-                
-                # Try pandas as a last resort (handles ISO and other variants)
-                try:
-                    dt = pd.to_datetime(s, errors='coerce')
-                    if pd.isna(dt):
-                        return None
-                    # Return string dengan format yang sesuai database
-                    return dt.strftime('%Y-%m-%d %H:%M:%S')
-                except Exception:
-                    return None
-
-            # Date range filter - menggunakan string comparison karena admission_date adalah TEXT
-            if 'start_date' in filters and filters['start_date']:
-                # Parse start date ke format database (YYYY-MM-DD 00:00:00)
-                start_date_str = _parse_date_str(filters['start_date'])
-                if start_date_str:
-                    # Set jam ke 00:00:00 untuk awal hari
-                    if len(start_date_str) == 10:  # Hanya tanggal tanpa waktu
-                        start_date_str = start_date_str + ' 00:00:00'
-                    query = query.filter(DataAnalytics.admission_date >= start_date_str)
-
-            if 'end_date' in filters and filters['end_date']:
-                # Parse end date ke format database dan set ke akhir hari (23:59:59)
-                end_date_str = _parse_date_str(filters['end_date'])
-                if end_date_str:
-                    # Set jam ke 23:59:59 untuk akhir hari
-                    if len(end_date_str) == 10:  # Hanya tanggal tanpa waktu
-                        end_date_str = end_date_str + ' 23:59:59'
-                    else:
-                        # Jika sudah ada waktu, ganti dengan 23:59:59
-                        end_date_str = end_date_str.split()[0] + ' 23:59:59'
-                    query = query.filter(DataAnalytics.admission_date <= end_date_str)
+            # Date range filter - admission_date adalah timestamp ber-index, jadi
+            # filter half-open [awal hari start_date, awal hari setelah end_date) memakai index range scan
+            start_dt, end_dt = self._date_range(filters)
+            if start_dt:
+                query = query.filter(DataAnalytics.admission_date >= start_dt)
+            if end_dt:
+                query = query.filter(DataAnalytics.admission_date < end_dt)
             
             # Specific column filter (flexible)
             if 'filter_column' in filters and 'filter_value' in filters:
@@ -548,28 +768,19 @@ class DatabaseQueryService:
                 filter_value = filters['filter_value']
                 
                 if filter_column and filter_value:
-                    # Get the column attribute dynamically
+                    # Get the column attribute dynamically; the operator depends on the
+                    # column type so the search indexes can be used
                     if hasattr(DataAnalytics, filter_column):
-                        column_attr = getattr(DataAnalytics, filter_column)
-                        # Use case-insensitive search for text columns
-                        if column_attr.type.python_type == str:
-                            query = query.filter(column_attr.ilike(f'%{filter_value}%'))
-                        else:
-                            # For non-string columns, try exact match first, then convert to string for partial match
-                            try:
-                                query = query.filter(column_attr == filter_value)
-                            except:
-                                query = query.filter(column_attr.cast(db.String).ilike(f'%{filter_value}%'))
+                        condition = self.search_service.condition(getattr(DataAnalytics, filter_column), filter_value)
+                        if condition is not None:
+                            query = query.filter(condition)
             
             # Legacy filters for backward compatibility
-            if 'mrn' in filters and filters['mrn']:
-                query = query.filter(DataAnalytics.mrn.ilike(f'%{filters["mrn"]}%'))
-            
-            if 'kode_inacbg' in filters and filters['kode_inacbg']:
-                query = query.filter(DataAnalytics.inacbg.ilike(f'%{filters["kode_inacbg"]}%'))
-            
-            if 'kelas_rawat' in filters and filters['kelas_rawat']:
-                query = query.filter(DataAnalytics.kelas_rawat.ilike(f'%{filters["kelas_rawat"]}%'))
+            for filter_key, column_attr in (('mrn', DataAnalytics.mrn),
+                                            ('kode_inacbg', DataAnalytics.inacbg),
+                                            ('kelas_rawat', DataAnalytics.kelas_rawat)):
+                if filters.get(filter_key):
+                    query = query.filter(self.search_service.condition(column_attr, filters[filter_key]))
             
             return query
             
@@ -577,40 +788,87 @@ class DatabaseQueryService:
             logger.error(f"Error applying filters: {e}", exc_info=True)
             return query
     
+    @staticmethod
+    def _format_datetime(value) -> Optional[str]:
+        """Format a timestamp column value as YYYY-MM-DD HH:MM:SS for JSON responses"""
+        return value.strftime('%Y-%m-%d %H:%M:%S') if value else None
+    
     def get_database_stats(self) -> Dict[str, Any]:
-        """Get database statistics"""
+        """
+        Get database statistics
+        
+        Served from the shared stats cache; the cache is invalidated when an upload
+        or clear-all-data commits and otherwise refreshed after its TTL.
+        """
         try:
-            from core.database import DataAnalytics
-            
-            stats = {
-                'total_data_analytics': DataAnalytics.query.count()
-            }
-            
-            # Calculate total rows (mainly from data_analytics as it's the main table)
-            stats['total_rows'] = stats['total_data_analytics']
-            
-            return stats
+            return dict(stats_cache.get(DATABASE_STATS_CACHE_KEY, self._load_database_stats))
             
         except Exception as e:
             logger.error(f"Error getting database stats: {e}", exc_info=True)
             return {}
     
-    def search_pasien(self, search_term: str) -> List[Dict[str, Any]]:
-        """Search for patients by name or MRN"""
+    def has_data(self) -> bool:
+        """Check whether data_analytics contains any rows (cached)"""
+        return bool(self.get_database_stats().get('has_data', False))
+    
+    def _load_database_stats(self) -> Dict[str, Any]:
+        """Compute database statistics (row counts and last successful upload)"""
+        from core.database import UploadLog
+        
+        total_rows, is_estimate = self._count_data_analytics()
+        
+        upload_count = db.session.query(func.count(UploadLog.upload_id)).filter(
+            UploadLog.status == 'success'
+        ).scalar() or 0
+        last_upload = UploadLog.query.filter_by(status='success').order_by(
+            UploadLog.upload_time.desc()
+        ).first()
+        
+        last_upload_id = db.session.query(func.max(UploadLog.upload_id)).filter(
+            UploadLog.status == 'success'
+        ).scalar()
+        
+        return {
+            'total_data_analytics': total_rows,
+            # Calculate total rows (mainly from data_analytics as it's the main table)
+            'total_rows': total_rows,
+            'total_is_estimate': is_estimate,
+            'has_data': total_rows > 0,
+            'upload_count': upload_count,
+            'last_upload_rows_success': (last_upload.rows_success or 0) if last_upload else 0,
+            'last_upload_rows_failed': (last_upload.rows_failed or 0) if last_upload else 0,
+            # Used to detect a stale Parquet snapshot
+            'last_upload_id': last_upload_id
+        }
+    
+    def _count_data_analytics(self) -> Tuple[int, bool]:
+        """
+        Count data_analytics rows
+        
+        On PostgreSQL the statistics in pg_class.reltuples are used when they are above
+        EXACT_COUNT_THRESHOLD, so large tables are not scanned. Small or never-analyzed
+        tables are counted exactly.
+        
+        Returns:
+            Tuple of (row_count, is_estimate)
+        """
+        if db.session.get_bind().dialect.name == 'postgresql':
+            try:
+                estimate = db.session.execute(
+                    text("SELECT reltuples::bigint FROM pg_class WHERE oid = 'data_analytics'::regclass")
+                ).scalar()
+                if estimate is not None and estimate > EXACT_COUNT_THRESHOLD:
+                    return int(estimate), True
+            except Exception as e:
+                db.session.rollback()
+                logger.warning(f"Could not read row estimate, falling back to COUNT: {e}")
+        
+        return db.session.query(func.count(DataAnalytics.data_id)).scalar() or 0, False
+    
+    def search_pasien(self, search_term: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """Search for patients by name or MRN, ranked by relevance"""
         try:
-            results = db.session.query(DataAnalytics).filter(
-                or_(
-                    DataAnalytics.nama_pasien.ilike(f'%{search_term}%'),
-                    DataAnalytics.mrn.ilike(f'%{search_term}%')
-                )
-            ).limit(10).all()
-            
-            return [{
-                'mrn': row.mrn,
-                'nama_pasien': row.nama_pasien,
-                'sep': row.sep,
-                'admission_date': row.admission_date
-            } for row in results]
+            return self.search_service.search_pasien(search_term, limit)
             
         except Exception as e:
             logger.error(f"Error searching patients: {e}", exc_info=True)
@@ -627,8 +885,8 @@ class DatabaseQueryService:
                 'sep': row.sep,
                 'mrn': row.mrn,
                 'nama_pasien': row.nama_pasien,
-                'admission_date': row.admission_date,
-                'discharge_date': row.discharge_date,
+                'admission_date': self._format_datetime(row.admission_date),
+                'discharge_date': self._format_datetime(row.discharge_date),
                 'los': row.los,
                 'inacbg': row.inacbg,
                 'total_tarif': row.total_tarif
@@ -637,3 +895,23 @@ class DatabaseQueryService:
         except Exception as e:
             logger.error(f"Error getting kunjungan by patient: {e}", exc_info=True)
             return []
+
+
+def _template_value(sql_type) -> Any:
+    """Placeholder value of a SQL column type for get_view_template"""
+    try:
+        python_type = sql_type.python_type
+    except NotImplementedError:
+        return None
+    
+    if issubclass(python_type, bool):
+        return False
+    if issubclass(python_type, datetime):
+        return datetime(2000, 1, 1)
+    if issubclass(python_type, date):
+        return date(2000, 1, 1)
+    if issubclass(python_type, str):
+        return ''
+    if issubclass(python_type, int):
+        return 0
+    return 0.0
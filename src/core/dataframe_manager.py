@@ -3,46 +3,78 @@ DataFrame Manager untuk mengelola DataFrame pandas
 """
 import pandas as pd
 import numpy as np
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Iterable, Optional, List, Tuple
 import logging
+from utils.log_utils import LazySummary
 
 logger = logging.getLogger(__name__)
 
+# DataFrameManager menyimpan DataFrame tanpa menyalinnya. Dengan Copy-on-Write,
+# perubahan oleh pemanggil (atau oleh pipeline) tidak pernah mengubah frame lain
+# yang berbagi data. pandas >= 3 selalu memakai Copy-on-Write.
+if int(pd.__version__.split('.')[0]) < 3:
+    pd.set_option('mode.copy_on_write', True)
+
 class DataFrameManager:
-    """Class untuk mengelola DataFrame pandas"""
+    """
+    Class untuk mengelola DataFrame pandas
+    
+    Hanya satu frame dasar yang disimpan; partisi data valid dan duplikat disimpan
+    sebagai mask boolean dan baru dibentuk saat diminta. Pipeline upload memakai
+    get_valid_frame() (frame dasar + mask, difilter per batch saat insert) dan
+    get_valid_columns()/set_valid_columns() untuk langkah yang hanya mengubah
+    beberapa kolom, sehingga partisi data valid tidak pernah disalin utuh.
+    """
     
     def __init__(self):
         self.current_dataframe: Optional[pd.DataFrame] = None
-        self.original_dataframe: Optional[pd.DataFrame] = None
-        self.valid_data: Optional[pd.DataFrame] = None
-        self.duplicate_data: Optional[pd.DataFrame] = None
-        
-    def set_dataframe(self, df: pd.DataFrame) -> Dict[str, Any]:
+        self.valid_mask: Optional[np.ndarray] = None
+        self._valid_data: Optional[pd.DataFrame] = None
+    
+    @property
+    def original_dataframe(self) -> Optional[pd.DataFrame]:
+        """DataFrame seperti saat di-set (Copy-on-Write, jadi sama dengan frame dasar)"""
+        return self.current_dataframe
+    
+    @property
+    def valid_data(self) -> Optional[pd.DataFrame]:
+        """Data valid (lihat get_valid_data)"""
+        return self.get_valid_data()
+    
+    @property
+    def duplicate_data(self) -> Optional[pd.DataFrame]:
+        """Data duplikat (lihat get_duplicate_data)"""
+        return self.get_duplicate_data()
+    
+    def set_dataframe(self, df: pd.DataFrame, deep_memory: bool = False) -> Dict[str, Any]:
         """
         Set DataFrame yang akan diproses
         
         Args:
-            df: DataFrame yang akan diset
-            
+            df: DataFrame yang akan diset (tidak disalin)
+            deep_memory: Hitung memory_usage termasuk isi string (lambat untuk
+                         kolom object karena setiap string dibaca)
+                         
         Returns:
             Dict dengan informasi DataFrame
         """
         try:
-            self.current_dataframe = df.copy()
-            self.original_dataframe = df.copy()
+            self.current_dataframe = df
+            self.valid_mask = None
+            self._valid_data = None
             
             info = {
                 'success': True,
                 'total_rows': len(df),
                 'total_columns': len(df.columns),
                 'columns': list(df.columns),
-                'memory_usage': df.memory_usage(deep=True).sum(),
+                'memory_usage': int(df.memory_usage(deep=deep_memory).sum()),
                 'error': None
             }
             
-            logger.info(f"DataFrame set: {info['total_rows']} rows, {info['total_columns']} columns")
+            logger.info("DataFrame set: %s rows, %s columns", info['total_rows'], info['total_columns'])
             return info
-            
+        
         except Exception as e:
             logger.error(f"Error setting DataFrame: {e}")
             return {
@@ -52,8 +84,13 @@ class DataFrameManager:
                 'total_columns': 0
             }
     
-    def get_dataframe_info(self) -> Dict[str, Any]:
-        """Get informasi DataFrame saat ini"""
+    def get_dataframe_info(self, deep_memory: bool = False) -> Dict[str, Any]:
+        """
+        Get informasi DataFrame saat ini
+        
+        Args:
+            deep_memory: Hitung memory_usage termasuk isi string
+        """
         if self.current_dataframe is None:
             return {
                 'has_data': False,
@@ -66,7 +103,7 @@ class DataFrameManager:
             'total_rows': len(self.current_dataframe),
             'total_columns': len(self.current_dataframe.columns),
             'columns': list(self.current_dataframe.columns),
-            'memory_usage': self.current_dataframe.memory_usage(deep=True).sum()
+            'memory_usage': int(self.current_dataframe.memory_usage(deep=deep_memory).sum())
         }
     
     def validate_dataframe(self) -> Dict[str, Any]:
@@ -120,9 +157,9 @@ class DataFrameManager:
             if validation_result['errors']:
                 validation_result['is_valid'] = False
             
-            logger.info(f"DataFrame validation: {validation_result}")
+            logger.info("DataFrame validation: %s", LazySummary(validation_result))
             return validation_result
-            
+        
         except Exception as e:
             logger.error(f"Error validating DataFrame: {e}")
             return {
@@ -134,11 +171,14 @@ class DataFrameManager:
         """
         Pisahkan data valid dan duplikat berdasarkan SEP
         
+        Hanya mask yang disimpan; frame data valid/duplikat dibentuk saat
+        get_valid_data()/get_duplicate_data() dipanggil.
+        
         Args:
             existing_seps: List SEP yang sudah ada di database
             
         Returns:
-            Dict dengan hasil pemisahan
+            Dict dengan jumlah baris per partisi
         """
         if self.current_dataframe is None:
             return {
@@ -147,43 +187,28 @@ class DataFrameManager:
             }
         
         try:
-            # Convert existing_seps to set for faster lookup
-            existing_seps_set = set(existing_seps)
-            
-            # Separate data based on SEP
-            if 'SEP' in self.current_dataframe.columns:
-                # Valid data: SEP not in existing_seps and not null
-                valid_mask = (
-                    self.current_dataframe['SEP'].notna() & 
-                    (~self.current_dataframe['SEP'].isin(existing_seps_set))
-                )
-                
-                # Duplicate data: SEP in existing_seps or null
-                duplicate_mask = (
-                    self.current_dataframe['SEP'].isna() | 
-                    (self.current_dataframe['SEP'].isin(existing_seps_set))
-                )
-                
-                self.valid_data = self.current_dataframe[valid_mask].copy()
-                self.duplicate_data = self.current_dataframe[duplicate_mask].copy()
-                
-                result = {
-                    'success': True,
-                    'total_rows': len(self.current_dataframe),
-                    'valid_rows': len(self.valid_data),
-                    'duplicate_rows': len(self.duplicate_data),
-                    'valid_data': self.valid_data,
-                    'duplicate_data': self.duplicate_data
-                }
-                
-                logger.info(f"Data separated: {result['valid_rows']} valid, {result['duplicate_rows']} duplicates")
-                return result
-            else:
+            if 'SEP' not in self.current_dataframe.columns:
                 return {
                     'success': False,
                     'error': 'Column SEP tidak ditemukan'
                 }
-                
+            
+            # Valid data: SEP not null and not in existing_seps, selebihnya duplikat
+            sep = self.current_dataframe['SEP']
+            self.valid_mask = (sep.notna() & ~sep.isin(set(existing_seps))).to_numpy(dtype=bool)
+            self._valid_data = None
+            
+            valid_rows = int(self.valid_mask.sum())
+            result = {
+                'success': True,
+                'total_rows': len(self.valid_mask),
+                'valid_rows': valid_rows,
+                'duplicate_rows': len(self.valid_mask) - valid_rows
+            }
+            
+            logger.info("Data separated: %s valid, %s duplicates", result['valid_rows'], result['duplicate_rows'])
+            return result
+        
         except Exception as e:
             logger.error(f"Error separating data: {e}")
             return {
@@ -191,17 +216,81 @@ class DataFrameManager:
                 'error': str(e)
             }
     
+    @property
+    def valid_rows(self) -> int:
+        """Jumlah baris valid (0 sebelum pemisahan)"""
+        if self._valid_data is not None:
+            return len(self._valid_data)
+        return int(self.valid_mask.sum()) if self.valid_mask is not None else 0
+    
+    def get_valid_frame(self) -> Tuple[Optional[pd.DataFrame], Optional[np.ndarray]]:
+        """
+        Frame dan mask baris valid tanpa membentuk salinan
+        
+        Returns:
+            Tuple (frame, mask). mask None berarti semua baris frame valid
+        """
+        if self._valid_data is not None:
+            return self._valid_data, None
+        if self.valid_mask is None:
+            return None, None
+        return self.current_dataframe, (None if self.valid_mask.all() else self.valid_mask)
+    
     def get_valid_data(self) -> Optional[pd.DataFrame]:
-        """Get data yang valid untuk diupload"""
-        return self.valid_data
+        """Get data yang valid untuk diupload (disalin dari frame dasar jika ada duplikat)"""
+        frame, mask = self.get_valid_frame()
+        if frame is None or mask is None:
+            return frame
+        return frame[mask]
     
     def set_valid_data(self, df: pd.DataFrame) -> None:
-        """Set data yang valid"""
-        self.valid_data = df.copy() if df is not None else None
+        """Ganti seluruh data valid (tidak disalin)"""
+        self._valid_data = df
+    
+    def get_valid_columns(self, columns: Iterable[str]) -> Optional[pd.DataFrame]:
+        """
+        Ambil sebagian kolom dari baris valid (salinan hanya sebesar kolom tersebut)
+        
+        Args:
+            columns: Nama kolom; kolom yang tidak ada di DataFrame dilewati
+            
+        Returns:
+            DataFrame baris valid dengan index frame dasar
+        """
+        frame, mask = self.get_valid_frame()
+        if frame is None:
+            return None
+        subset = frame[[col for col in columns if col in frame.columns]]
+        return subset if mask is None else subset[mask]
+    
+    def set_valid_columns(self, values: pd.DataFrame) -> None:
+        """
+        Tulis kolom baris valid (hasil get_valid_columns yang sudah diolah) kembali
+        ke frame; hanya kolom tersebut yang dialokasikan ulang, baris duplikat tetap
+        
+        Args:
+            values: DataFrame baris valid dengan index frame dasar
+        """
+        frame, mask = self.get_valid_frame()
+        if frame is None:
+            return
+        
+        if mask is None:
+            updated = {col: values[col] for col in values.columns}
+        else:
+            updated = {col: values[col].reindex(frame.index).where(mask, frame[col])
+                       for col in values.columns}
+        
+        if self._valid_data is not None:
+            self._valid_data = frame.assign(**updated)
+        else:
+            self.current_dataframe = frame.assign(**updated)
     
     def get_duplicate_data(self) -> Optional[pd.DataFrame]:
-        """Get data yang duplikat"""
-        return self.duplicate_data
+        """Get data yang duplikat (dibentuk dari mask setiap kali dipanggil)"""
+        if self.valid_mask is None:
+            return None
+        return self.current_dataframe[~self.valid_mask]
     
     def clear_dataframe(self) -> Dict[str, Any]:
         """
@@ -212,16 +301,15 @@ class DataFrameManager:
         """
         try:
             self.current_dataframe = None
-            self.original_dataframe = None
-            self.valid_data = None
-            self.duplicate_data = None
+            self.valid_mask = None
+            self._valid_data = None
             
             logger.info("DataFrame cleared successfully")
             return {
                 'success': True,
                 'message': 'DataFrame berhasil dibersihkan'
             }
-            
+        
         except Exception as e:
             logger.error(f"Error clearing DataFrame: {e}")
             return {
@@ -231,7 +319,7 @@ class DataFrameManager:
     
     def get_upload_summary(self) -> Dict[str, Any]:
         """Get summary untuk upload"""
-        if self.valid_data is None and self.duplicate_data is None:
+        if self.valid_mask is None:
             return {
                 'total_rows': 0,
                 'valid_rows': 0,
@@ -240,8 +328,8 @@ class DataFrameManager:
                 'rows_failed': 0
             }
         
-        valid_count = len(self.valid_data) if self.valid_data is not None else 0
-        duplicate_count = len(self.duplicate_data) if self.duplicate_data is not None else 0
+        valid_count = int(self.valid_mask.sum())
+        duplicate_count = len(self.valid_mask) - valid_count
         
         return {
             'total_rows': valid_count + duplicate_count,
@@ -250,4 +338,3 @@ class DataFrameManager:
             'rows_success': valid_count,
             'rows_failed': duplicate_count
         }
-
@@ -0,0 +1,305 @@
+"""
+Derived Metrics untuk kolom turunan view analisa (selisih, persentase, tarif per hari)
+
+Setiap metrik dideklarasikan sekali sebagai ekspresi, lalu dikompilasi ke SQL
+(query paginasi, sehingga sort dan filter kolom turunan berjalan di database)
+atau dihitung vectorized dengan NumPy pada DataFrame hasil query.
+
+Semantik sama di kedua sisi:
+- Kolom sumber yang kosong/bukan angka dianggap 0 (seperti safe_numeric_conversion)
+- Pembagian dengan 0 menghasilkan NULL/NaN (NULLIF), bukan inf
+"""
+from typing import Any, Dict, Iterable, Optional, Set
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import Float, Numeric, case, cast, func, literal
+
+
+class Expression:
+    """Node ekspresi metrik turunan"""
+
+    def to_sql(self, columns: Dict[str, Any]):
+        """
+        Kompilasi ekspresi ke SQL
+
+        Args:
+            columns: Mapping nama kolom view -> ekspresi SQL
+
+        Returns:
+            Ekspresi SQLAlchemy
+        """
+        raise NotImplementedError
+
+    def to_numpy(self, df: pd.DataFrame):
+        """
+        Hitung ekspresi secara vectorized
+
+        Args:
+            df: DataFrame dengan kolom view
+
+        Returns:
+            Array NumPy (atau skalar untuk literal)
+        """
+        raise NotImplementedError
+
+    def columns(self) -> Set[str]:
+        """Nama kolom yang dipakai ekspresi"""
+        return set()
+
+    def __add__(self, other):
+        return BinaryOp('+', self, _wrap(other))
+
+    def __sub__(self, other):
+        return BinaryOp('-', self, _wrap(other))
+
+    def __mul__(self, other):
+        return BinaryOp('*', self, _wrap(other))
+
+    def __truediv__(self, other):
+        return Divide(self, _wrap(other))
+
+    def __gt__(self, other):
+        return Compare('>', self, _wrap(other))
+
+
+class Column(Expression):
+    """Kolom numerik view atau metrik turunan lain"""
+
+    def __init__(self, name: str, fill_value: Optional[float] = 0):
+        """
+        Args:
+            name: Nama kolom
+            fill_value: Pengganti NULL/NaN, None agar NULL diteruskan
+        """
+        self.name = name
+        self.fill_value = fill_value
+
+    def to_sql(self, columns):
+        if self.fill_value is None:
+            return columns[self.name]
+        return func.coalesce(columns[self.name], self.fill_value)
+
+    def to_numpy(self, df):
+        values = pd.to_numeric(df[self.name], errors='coerce')
+        if self.fill_value is not None:
+            values = values.fillna(self.fill_value)
+        return values.to_numpy(dtype='float64', na_value=np.nan)
+
+    def columns(self):
+        return {self.name}
+
+
+class Literal(Expression):
+    """Nilai konstan (angka atau teks)"""
+
+    def __init__(self, value: Any):
+        self.value = value
+
+    def to_sql(self, columns):
+        return literal(self.value)
+
+    def to_numpy(self, df):
+        return self.value
+
+
+class BinaryOp(Expression):
+    """Operasi aritmatika +, -, *"""
+
+    OPERATORS = {
+        '+': lambda a, b: a + b,
+        '-': lambda a, b: a - b,
+        '*': lambda a, b: a * b
+    }
+
+    def __init__(self, op: str, left: Expression, right: Expression):
+        self.op = op
+        self.left = left
+        self.right = right
+
+    def to_sql(self, columns):
+        return self.OPERATORS[self.op](self.left.to_sql(columns), self.right.to_sql(columns))
+
+    def to_numpy(self, df):
+        return self.OPERATORS[self.op](self.left.to_numpy(df), self.right.to_numpy(df))
+
+    def columns(self):
+        return self.left.columns() | self.right.columns()
+
+
+class Divide(Expression):
+    """Pembagian float, NULL/NaN jika pembagi 0"""
+
+    def __init__(self, left: Expression, right: Expression):
+        self.left = left
+        self.right = right
+
+    def to_sql(self, columns):
+        return cast(self.left.to_sql(columns), Float) / func.nullif(self.right.to_sql(columns), 0)
+
+    def to_numpy(self, df):
+        left = np.asarray(self.left.to_numpy(df), dtype='float64')
+        right = np.asarray(self.right.to_numpy(df), dtype='float64')
+        left, right = np.broadcast_arrays(left, right)
+        return np.divide(left, right, out=np.full(left.shape, np.nan), where=right != 0)
+
+    def columns(self):
+        return self.left.columns() | self.right.columns()
+
+
+class Compare(Expression):
+    """Perbandingan untuk kondisi CASE"""
+
+    OPERATORS = {
+        '>': lambda a, b: a > b
+    }
+
+    def __init__(self, op: str, left: Expression, right: Expression):
+        self.op = op
+        self.left = left
+        self.right = right
+
+    def to_sql(self, columns):
+        return self.OPERATORS[self.op](self.left.to_sql(columns), self.right.to_sql(columns))
+
+    def to_numpy(self, df):
+        return self.OPERATORS[self.op](np.asarray(self.left.to_numpy(df)), np.asarray(self.right.to_numpy(df)))
+
+    def columns(self):
+        return self.left.columns() | self.right.columns()
+
+
+class Case(Expression):
+    """CASE WHEN kondisi THEN nilai ELSE nilai lain END"""
+
+    def __init__(self, condition: Expression, then: Expression, otherwise: Expression):
+        self.condition = condition
+        self.then = then
+        self.otherwise = otherwise
+
+    def to_sql(self, columns):
+        return case((self.condition.to_sql(columns), self.then.to_sql(columns)),
+                    else_=self.otherwise.to_sql(columns))
+
+    def to_numpy(self, df):
+        return np.where(self.condition.to_numpy(df), self.then.to_numpy(df), self.otherwise.to_numpy(df))
+
+    def columns(self):
+        return self.condition.columns() | self.then.columns() | self.otherwise.columns()
+
+
+class Round(Expression):
+    """Pembulatan ke sejumlah digit desimal"""
+
+    def __init__(self, expression: Expression, digits: int = 2):
+        self.expression = expression
+        self.digits = digits
+
+    def to_sql(self, columns):
+        # round(double precision, int) tidak ada di PostgreSQL, jadi dibulatkan sebagai numeric
+        return func.round(cast(self.expression.to_sql(columns), Numeric), self.digits)
+
+    def to_numpy(self, df):
+        return np.round(np.asarray(self.expression.to_numpy(df), dtype='float64'), self.digits)
+
+    def columns(self):
+        return self.expression.columns()
+
+
+def _wrap(value) -> Expression:
+    """Bungkus angka/teks sebagai Literal"""
+    return value if isinstance(value, Expression) else Literal(value)
+
+
+def col(name: str) -> Column:
+    """Referensi kolom sumber view, NULL dianggap 0 (seperti safe_numeric_conversion)"""
+    return Column(name)
+
+
+def metric(name: str) -> Column:
+    """Referensi metrik turunan yang dideklarasikan sebelumnya, NULL diteruskan"""
+    return Column(name, fill_value=None)
+
+
+def when(condition: Expression, then, otherwise) -> Case:
+    """Ekspresi CASE"""
+    return Case(condition, _wrap(then), _wrap(otherwise))
+
+
+def rounded(expression: Expression, digits: int = 2) -> Round:
+    """Bulatkan ekspresi (default 2 digit seperti tampilan tarif)"""
+    return Round(expression, digits)
+
+
+class DerivedMetric:
+    """Kolom turunan view dengan nama dan ekspresinya"""
+
+    def __init__(self, name: str, expression: Expression):
+        """
+        Args:
+            name: Nama kolom hasil
+            expression: Ekspresi metrik
+        """
+        self.name = name
+        self.expression = expression
+
+    def to_sql(self, columns: Dict[str, Any]):
+        """Ekspresi SQL metrik (tanpa label)"""
+        return self.expression.to_sql(columns)
+
+    def compute(self, df: pd.DataFrame) -> np.ndarray:
+        """Hitung metrik untuk semua baris DataFrame"""
+        values = self.expression.to_numpy(df)
+        if np.ndim(values) == 0:
+            values = np.full(len(df), values)
+        return values
+
+
+def compile_metrics(metrics: Iterable[DerivedMetric], columns: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Kompilasi metrik turunan ke ekspresi SQL
+
+    Metrik boleh memakai metrik yang dideklarasikan sebelumnya; metrik yang sudah
+    ada di columns atau kolom sumbernya tidak ada di view dilewati.
+
+    Args:
+        metrics: Daftar metrik
+        columns: Mapping nama kolom view -> ekspresi SQL
+
+    Returns:
+        Mapping nama metrik -> ekspresi SQL (tanpa label)
+    """
+    available = dict(columns)
+    compiled = {}
+    for metric in metrics:
+        if metric.name in available or not metric.expression.columns().issubset(available):
+            continue
+        compiled[metric.name] = available[metric.name] = metric.to_sql(available)
+    return compiled
+
+
+def apply_metrics(df: pd.DataFrame, metrics: Iterable[DerivedMetric]) -> pd.DataFrame:
+    """
+    Tambahkan metrik turunan ke DataFrame secara vectorized
+
+    Metrik yang sudah ada (misal sudah dihitung di SQL) atau kolom sumbernya
+    tidak ada di DataFrame dilewati.
+
+    Args:
+        df: DataFrame hasil query
+        metrics: Daftar metrik
+
+    Returns:
+        DataFrame dengan kolom metrik
+    """
+    for metric in metrics:
+        if metric.name in df.columns or not metric.expression.columns().issubset(df.columns):
+            continue
+        df[metric.name] = metric.compute(df)
+    return df
+
+
+# Metrik yang dipakai lebih dari satu view
+SELISIH_TARIF = DerivedMetric('SELISIH_TARIF', col('TOTAL_TARIF') - col('TARIF_RS'))
+PERSENTASE_SELISIH = DerivedMetric('PERSENTASE_SELISIH', rounded(metric('SELISIH_TARIF') / col('TARIF_RS') * 100))
+TARIF_PER_HARI = DerivedMetric('TARIF_PER_HARI', rounded(col('TOTAL_TARIF') / col('LOS')))
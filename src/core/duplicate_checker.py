@@ -2,41 +2,70 @@
 Duplicate Checker untuk memverifikasi duplikasi data berdasarkan SEP
 """
 import pandas as pd
-from typing import Dict, Any, List, Set
+from typing import Dict, Any, List, Set, Iterable, Optional
 import logging
+from sqlalchemy import select, text
 from core.database import db, DataAnalytics
+from utils.log_utils import LazySummary
 
 logger = logging.getLogger(__name__)
 
 class DuplicateChecker:
     """Class untuk mengecek duplikasi data berdasarkan SEP"""
     
-    def __init__(self):
-        pass
+    def __init__(self, chunk_size: int = 5000):
+        self.chunk_size = chunk_size
     
-    def get_existing_seps(self) -> Set[str]:
+    def get_existing_seps(self, seps: Optional[Iterable[Any]] = None) -> Set[str]:
         """
-        Ambil semua SEP yang sudah ada di database
+        Ambil SEP yang sudah ada di database
+        
+        Args:
+            seps: SEP dari file yang akan dicek. Jika diberikan, hanya SEP ini yang
+                  ditanyakan ke database (per chunk, memakai unique index sep).
+                  Jika None, seluruh SEP di tabel diambil.
         
         Returns:
             Set SEP yang sudah ada
         """
         try:
-            # Query semua SEP dari database
-            existing_seps = db.session.query(DataAnalytics.sep).filter(
-                DataAnalytics.sep.isnot(None)
-            ).all()
-            
-            # Convert ke set untuk lookup yang lebih cepat
-            sep_set = {sep[0] for sep in existing_seps if sep[0] is not None}
-            
-            logger.info(f"Found {len(sep_set)} existing SEPs in database")
+            if seps is None:
+                # Query semua SEP dari database
+                existing_seps = db.session.query(DataAnalytics.sep).filter(
+                    DataAnalytics.sep.isnot(None)
+                ).all()
+                sep_set = {sep[0] for sep in existing_seps if sep[0] is not None}
+                logger.info("Found %s existing SEPs in database", len(sep_set))
+                return sep_set
+            
+            candidate_seps = pd.Series(list(seps), dtype=object).dropna().astype(str).unique().tolist()
+            sep_set = set()
+            
+            for start in range(0, len(candidate_seps), self.chunk_size):
+                chunk = candidate_seps[start:start + self.chunk_size]
+                sep_set.update(self._query_existing_chunk(chunk))
+            
+            logger.info("Found %s of %s incoming SEPs already in database", len(sep_set), len(candidate_seps))
             return sep_set
             
         except Exception as e:
             logger.error(f"Error getting existing SEPs: {e}")
             return set()
     
+    def _query_existing_chunk(self, chunk: List[str]) -> Set[str]:
+        """Cek satu chunk SEP terhadap unique index sep"""
+        if db.session.get_bind().dialect.name == 'postgresql':
+            result = db.session.execute(
+                text("SELECT sep FROM data_analytics WHERE sep = ANY(:seps)"),
+                {'seps': chunk}
+            )
+        else:
+            result = db.session.execute(
+                select(DataAnalytics.sep).where(DataAnalytics.sep.in_(chunk))
+            )
+        
+        return {row[0] for row in result}
+    
     def check_duplicates(self, df: pd.DataFrame) -> Dict[str, Any]:
         """
         Cek duplikasi dalam DataFrame berdasarkan SEP
@@ -58,9 +87,6 @@ class DuplicateChecker:
                     'duplicate_seps': []
                 }
             
-            # Get existing SEPs from database
-            existing_seps = self.get_existing_seps()
-            
             # Check if SEP column exists
             if 'SEP' not in df.columns:
                 return {
@@ -72,36 +98,27 @@ class DuplicateChecker:
                     'duplicate_seps': []
                 }
             
-            # Separate new and duplicate data
-            new_mask = (
-                df['SEP'].notna() & 
-                (~df['SEP'].isin(existing_seps))
-            )
-            
-            duplicate_mask = (
-                df['SEP'].isna() | 
-                (df['SEP'].isin(existing_seps))
-            )
+            # Get existing SEPs from database (hanya SEP yang ada di file)
+            existing_seps = self.get_existing_seps(df['SEP'])
             
-            new_data = df[new_mask]
-            duplicate_data = df[duplicate_mask]
+            # Mask baris baru; baris lain (SEP kosong atau sudah ada) duplikat.
+            # Frame partisi tidak dibentuk di sini, DataFrameManager memisahkannya saat dibutuhkan
+            new_mask = (df['SEP'].notna() & ~df['SEP'].isin(existing_seps)).to_numpy(dtype=bool)
+            new_rows = int(new_mask.sum())
             
             # Get list of duplicate SEPs
-            duplicate_seps = []
-            if not duplicate_data.empty and 'SEP' in duplicate_data.columns:
-                duplicate_seps = duplicate_data['SEP'].dropna().unique().tolist()
+            duplicate_seps = df['SEP'][~new_mask].dropna().unique().tolist()
             
             result = {
                 'success': True,
                 'total_rows': len(df),
-                'new_rows': len(new_data),
-                'duplicate_rows': len(duplicate_data),
+                'new_rows': new_rows,
+                'duplicate_rows': len(df) - new_rows,
                 'duplicate_seps': duplicate_seps,
-                'new_data': new_data,
-                'duplicate_data': duplicate_data
+                'existing_seps': existing_seps
             }
             
-            logger.info(f"Duplicate check completed: {result['new_rows']} new, {result['duplicate_rows']} duplicates")
+            logger.info("Duplicate check completed: %s new, %s duplicates", result['new_rows'], result['duplicate_rows'])
             return result
             
         except Exception as e:
@@ -136,7 +153,7 @@ class DuplicateChecker:
             internal_duplicates = df[df.duplicated(subset=['SEP'], keep=False)]
             
             # Check for database duplicates
-            existing_seps = self.get_existing_seps()
+            existing_seps = self.get_existing_seps(df['SEP'])
             db_duplicates = df[df['SEP'].isin(existing_seps)]
             
             # Check for null SEPs
@@ -153,7 +170,7 @@ class DuplicateChecker:
                 'database_duplicate_seps': db_duplicates['SEP'].unique().tolist() if not db_duplicates.empty else []
             }
             
-            logger.info(f"Duplicate details: {result}")
+            logger.info("Duplicate details: %s", LazySummary(result))
             return result
             
         except Exception as e:
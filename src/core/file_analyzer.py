@@ -54,7 +54,7 @@ class FileAnalyzer:
             else:
                 file_info['error'] = f'File type {ext} tidak didukung. Hanya mendukung: {", ".join(self.supported_extensions)}'
             
-            logger.info(f"File analyzed: {file_info['filename']} - Type: {file_info['file_type']}")
+            logger.info("File analyzed: %s - Type: %s", file_info['filename'], file_info['file_type'])
             return file_info
             
         except Exception as e:
@@ -0,0 +1,102 @@
+"""
+INACBG pricing engine untuk penyesuaian harga berdasarkan severity level INACBG
+"""
+import pandas as pd
+import numpy as np
+from typing import Dict, Any, List, Optional, Tuple
+
+# Multiplier per severity level (segmen terakhir kode INACBG, misal "K-4-17-I")
+SEVERITY_0_MULTIPLIER = 0.79
+SEVERITY_I_II_III_MULTIPLIER = 0.73
+SEVERITY_I_II_III = ['I', 'II', 'III']
+
+# Kolom harga yang disesuaikan saat upload
+DEFAULT_PRICING_COLUMNS = [
+    'TOTAL_TARIF', 'TARIF_RS', 'SELISIH',
+    'PENUNJANG', 'RADIOLOGI', 'LABORATORIUM'
+]
+
+
+class INACBGPricingEngine:
+    """
+    Engine penyesuaian harga INACBG yang dipakai bersama oleh UploadService dan DataProcessor
+
+    Aturan:
+    - Kode INACBG berformat "K-4-17-I", severity level adalah segmen setelah tanda '-' terakhir
+    - Severity '0': harga dikali 0.79 (79%)
+    - Severity 'I', 'II', atau 'III': harga dikali 0.73 (73%)
+    - Lainnya (atau kode dengan kurang dari 4 segmen): tidak ada penyesuaian
+    """
+
+    def classify(self, inacbg: pd.Series) -> Tuple[np.ndarray, Dict[str, int]]:
+        """
+        Hitung multiplier per baris dari kolom INACBG
+
+        Args:
+            inacbg: Series berisi kode INACBG
+
+        Returns:
+            Tuple (array multiplier, dict jumlah baris per kategori)
+        """
+        codes = inacbg.astype(str)
+        has_four_segments = (codes.str.count('-') >= 3).to_numpy(dtype=bool)
+        severity = codes.str.rpartition('-')[2].str.upper()
+
+        is_0 = has_four_segments & (severity == '0').to_numpy(dtype=bool)
+        is_i_ii_iii = has_four_segments & severity.isin(SEVERITY_I_II_III).to_numpy(dtype=bool)
+
+        multiplier = np.select(
+            [is_0, is_i_ii_iii],
+            [SEVERITY_0_MULTIPLIER, SEVERITY_I_II_III_MULTIPLIER],
+            default=1.0
+        )
+
+        digit_0_count = int(is_0.sum())
+        digit_i_ii_iii_count = int(is_i_ii_iii.sum())
+        counts = {
+            'digit_0_count': digit_0_count,
+            'digit_i_ii_iii_count': digit_i_ii_iii_count,
+            'other_count': len(codes) - digit_0_count - digit_i_ii_iii_count
+        }
+
+        return multiplier, counts
+
+    def apply(self, df: pd.DataFrame, pricing_columns: Optional[List[str]] = None,
+              decimals: Optional[int] = None) -> Tuple[pd.DataFrame, Dict[str, Any]]:
+        """
+        Terapkan penyesuaian harga ke seluruh kolom harga sekaligus
+
+        Args:
+            df: DataFrame dengan kolom INACBG dan kolom harga
+            pricing_columns: Kolom yang disesuaikan (default: DEFAULT_PRICING_COLUMNS)
+            decimals: Jumlah desimal untuk pembulatan hasil (None = tanpa pembulatan)
+
+        Returns:
+            Tuple (DataFrame yang sudah disesuaikan, dict statistik penyesuaian)
+        """
+        if pricing_columns is None:
+            pricing_columns = DEFAULT_PRICING_COLUMNS
+
+        if 'INACBG' in df.columns:
+            inacbg = df['INACBG']
+        else:
+            inacbg = pd.Series('', index=df.index)
+
+        multiplier, counts = self.classify(inacbg)
+
+        columns = [col for col in pricing_columns if col in df.columns]
+        if columns:
+            values = df[columns].apply(pd.to_numeric, errors='coerce').to_numpy(dtype='float64')
+            adjusted = values * multiplier[:, np.newaxis]
+            if decimals is not None:
+                adjusted = np.round(adjusted, decimals)
+
+            df = df.assign(**{col: adjusted[:, i] for i, col in enumerate(columns)})
+
+        stats = {
+            'adjusted_rows': len(df),
+            'adjusted_columns': columns,
+            **counts
+        }
+
+        return df, stats
@@ -0,0 +1,383 @@
+"""
+INACBG Summary untuk menjaga tabel ringkasan agregat INACBG per bulan admission
+"""
+import logging
+from datetime import date, datetime
+from typing import Dict, Any, List, Optional, Tuple
+
+import pandas as pd
+from sqlalchemy import func, select, union_all, cast, literal
+
+from core.database import db, DataAnalytics, InacbgMonthlySummary
+from core.bulk_ingest import BulkIngestService
+from core.stats_cache import stats_cache
+from utils.timezone_utils import jakarta_now
+
+logger = logging.getLogger(__name__)
+
+# Bucket bulan untuk baris tanpa admission_date (kolom kunci tidak boleh NULL)
+UNKNOWN_ADMISSION_MONTH = date(1900, 1, 1)
+
+# Kolom file yang dibutuhkan untuk menghitung ringkasan
+SUMMARY_SOURCE_COLUMNS = ['SEP', 'INACBG', 'DESKRIPSI_INACBG', 'ADMISSION_DATE', 'LOS', 'TOTAL_TARIF', 'TARIF_RS']
+
+# Kolom kunci ringkasan (unique constraint uq_inacbg_monthly_summary_key)
+SUMMARY_KEY_COLUMNS = ['inacbg', 'deskripsi_inacbg', 'admission_month']
+
+# Kolom ringkasan: (kolom sumber data_analytics, jenis agregasi)
+SUMMARY_MEASURES = {
+    'jumlah_kunjungan': ('sep', 'count'),
+    'los_count': ('los', 'count'),
+    'los_sum': ('los', 'sum'),
+    'los_min': ('los', 'min'),
+    'los_max': ('los', 'max'),
+    'total_tarif_count': ('total_tarif', 'count'),
+    'total_tarif_sum': ('total_tarif', 'sum'),
+    'tarif_rs_count': ('tarif_rs', 'count'),
+    'tarif_rs_sum': ('tarif_rs', 'sum')
+}
+
+# Key status kelengkapan ringkasan di stats_cache
+INACBG_SUMMARY_READY_CACHE_KEY = 'inacbg_summary_ready'
+
+
+class InacbgSummaryService:
+    """
+    Service untuk tabel inacbg_monthly_summary
+
+    Tabel menyimpan count, sum, min dan max per (INACBG, deskripsi, bulan admission).
+    Setiap batch upload menambah ringkasan di transaksi yang sama dengan insert
+    data_analytics, dan rebuild() menghitung ulang seluruh tabel. Query view INACBG
+    menjumlahkan bucket bulan penuh dan hanya memindai data mentah untuk sisa hari
+    di awal/akhir rentang tanggal.
+    """
+
+    def __init__(self):
+        self.bulk_ingest = BulkIngestService()
+        self.table = InacbgMonthlySummary.__table__
+
+    def apply_frame(self, df: pd.DataFrame) -> Dict[str, Any]:
+        """
+        Tambahkan agregat satu batch upload ke tabel ringkasan (tanpa commit)
+
+        Args:
+            df: DataFrame data valid dengan nama kolom file (uppercase)
+
+        Returns:
+            Dict dengan jumlah bucket yang diupdate
+        """
+        try:
+            records = self.aggregate_frame(df)
+            if not records:
+                return {'success': True, 'buckets': 0}
+
+            if db.session.get_bind().dialect.name == 'postgresql':
+                self._upsert_records(records)
+            else:
+                self._merge_records(records)
+
+            logger.info("INACBG summary updated: %s buckets", len(records))
+            return {'success': True, 'buckets': len(records)}
+
+        except Exception as e:
+            logger.error(f"Error updating INACBG summary: {e}")
+            return {
+                'success': False,
+                'error': str(e),
+                'buckets': 0
+            }
+
+    def aggregate_frame(self, df: pd.DataFrame) -> List[Dict[str, Any]]:
+        """
+        Hitung agregat per (INACBG, deskripsi, bulan admission) dari DataFrame
+
+        Args:
+            df: DataFrame dengan nama kolom file (uppercase)
+
+        Returns:
+            List record ringkasan (satu dict per bucket)
+        """
+        if df is None or df.empty:
+            return []
+
+        # Tipe kolom disamakan dengan data yang masuk ke data_analytics
+        columns = [col for col in SUMMARY_SOURCE_COLUMNS if col in df.columns]
+        frame = self.bulk_ingest.prepare_frame(df[columns])
+        for source_column, _ in SUMMARY_MEASURES.values():
+            if source_column not in frame.columns:
+                frame[source_column] = pd.NA
+
+        if 'admission_date' in frame.columns:
+            admission_date = pd.to_datetime(frame['admission_date'], errors='coerce')
+        else:
+            admission_date = pd.Series(pd.NaT, index=frame.index, dtype='datetime64[ns]')
+        month = admission_date.dt.to_period('M').dt.start_time.dt.date
+
+        for key_column in ('inacbg', 'deskripsi_inacbg'):
+            if key_column not in frame.columns:
+                frame[key_column] = None
+
+        keys = pd.DataFrame({
+            'inacbg': frame['inacbg'].fillna(''),
+            'deskripsi_inacbg': frame['deskripsi_inacbg'].fillna(''),
+            'admission_month': month.astype(object).where(month.notna(), UNKNOWN_ADMISSION_MONTH)
+        })
+        values = pd.DataFrame({
+            source_column: pd.to_numeric(frame[source_column], errors='coerce')
+            if source_column != 'sep' else frame[source_column]
+            for source_column, _ in SUMMARY_MEASURES.values()
+        })
+
+        grouped = pd.concat([keys, values], axis=1).groupby(SUMMARY_KEY_COLUMNS, sort=False)
+        summary = grouped.agg(**{
+            name: (source_column, how) for name, (source_column, how) in SUMMARY_MEASURES.items()
+        }).reset_index()
+
+        # SUM tanpa nilai (semua NULL) harus NULL seperti di SQL, bukan 0
+        for name, (source_column, how) in SUMMARY_MEASURES.items():
+            if how == 'sum':
+                count_column = f"{source_column}_count"
+                summary[name] = summary[name].where(summary[count_column] > 0)
+
+        updated_at = jakarta_now()
+        records = []
+        for row in summary.to_dict('records'):
+            record = {key: row[key] for key in SUMMARY_KEY_COLUMNS}
+            for name in SUMMARY_MEASURES:
+                record[name] = None if pd.isna(row[name]) else int(row[name])
+            record['updated_at'] = updated_at
+            records.append(record)
+        return records
+
+    def rebuild(self) -> Dict[str, Any]:
+        """
+        Hitung ulang seluruh tabel ringkasan dari data_analytics dalam satu transaksi
+
+        Returns:
+            Dict dengan jumlah bucket hasil rebuild
+        """
+        try:
+            db.session.query(InacbgMonthlySummary).delete()
+
+            if db.session.get_bind().dialect.name == 'postgresql':
+                month = func.coalesce(
+                    cast(func.date_trunc('month', DataAnalytics.admission_date), db.Date),
+                    UNKNOWN_ADMISSION_MONTH
+                )
+                inacbg = func.coalesce(DataAnalytics.inacbg, '')
+                deskripsi = func.coalesce(DataAnalytics.deskripsi_inacbg, '')
+                measures = [
+                    getattr(func, how)(getattr(DataAnalytics, source_column))
+                    for source_column, how in SUMMARY_MEASURES.values()
+                ]
+                source = select(inacbg, deskripsi, month, *measures, literal(jakarta_now())).group_by(inacbg, deskripsi, month)
+                db.session.execute(self.table.insert().from_select(
+                    SUMMARY_KEY_COLUMNS + list(SUMMARY_MEASURES) + ['updated_at'], source
+                ))
+            else:
+                query = db.session.query(*[
+                    getattr(DataAnalytics, column.lower()).label(column) for column in SUMMARY_SOURCE_COLUMNS
+                ])
+                df = pd.DataFrame(query.all(), columns=SUMMARY_SOURCE_COLUMNS)
+                records = self.aggregate_frame(df)
+                if records:
+                    db.session.execute(self.table.insert(), records)
+
+            db.session.commit()
+            stats_cache.invalidate(INACBG_SUMMARY_READY_CACHE_KEY)
+
+            buckets = db.session.query(func.count(InacbgMonthlySummary.summary_id)).scalar() or 0
+            logger.info("INACBG summary rebuilt: %s buckets", buckets)
+            return {'success': True, 'buckets': buckets}
+
+        except Exception as e:
+            db.session.rollback()
+            logger.error(f"Error rebuilding INACBG summary: {e}")
+            return {
+                'success': False,
+                'error': str(e),
+                'buckets': 0
+            }
+
+    def is_ready(self) -> bool:
+        """
+        Cek apakah ringkasan lengkap (jumlah kunjungan sama dengan data_analytics)
+
+        Hasil disimpan di stats_cache sehingga hanya dihitung ulang setelah TTL
+        habis atau setelah upload/rebuild.
+        """
+        try:
+            return stats_cache.get(INACBG_SUMMARY_READY_CACHE_KEY, self._check_ready)
+        except Exception as e:
+            db.session.rollback()
+            logger.warning(f"Could not check INACBG summary, using raw aggregation: {e}")
+            return False
+
+    def _check_ready(self) -> bool:
+        """Bandingkan total kunjungan di ringkasan dengan data_analytics"""
+        summary_total = db.session.query(func.sum(InacbgMonthlySummary.jumlah_kunjungan)).scalar() or 0
+        data_total = db.session.query(func.count(DataAnalytics.sep)).scalar() or 0
+
+        if summary_total != data_total:
+            logger.warning(
+                f"INACBG summary out of date ({summary_total} vs {data_total} rows), "
+                f"run tools/rebuild_inacbg_summary.py"
+            )
+            return False
+        return True
+
+    def build_query(self, start_dt: Optional[datetime] = None, end_dt: Optional[datetime] = None,
+                    use_summary: bool = True):
+        """
+        Bangun query agregat view INACBG untuk rentang admission_date [start_dt, end_dt)
+
+        Bulan yang seluruhnya berada di dalam rentang dibaca dari tabel ringkasan,
+        sisa hari di awal dan akhir rentang diagregasi dari data_analytics.
+
+        Args:
+            start_dt: Awal rentang (inklusif, tengah malam) atau None
+            end_dt: Akhir rentang (eksklusif, tengah malam) atau None
+            use_summary: False untuk mengagregasi seluruhnya dari data_analytics
+
+        Returns:
+            Tuple (query, dict nama kolom -> ekspresi SQL berlabel)
+        """
+        if use_summary:
+            summary_range, raw_ranges = self._split_range(start_dt, end_dt)
+        else:
+            summary_range, raw_ranges = None, [(start_dt, end_dt)]
+
+        parts = []
+        if summary_range is not None:
+            parts.append(self._summary_select(*summary_range, exclude_unknown=bool(start_dt or end_dt)))
+        parts.extend(self._raw_select(low, high) for low, high in raw_ranges)
+
+        buckets = (parts[0] if len(parts) == 1 else union_all(*parts)).subquery('inacbg_buckets')
+
+        def average(sum_column, count_column):
+            return cast(func.sum(sum_column), db.Float) / func.nullif(func.sum(count_column), 0)
+
+        columns = [
+            buckets.c.inacbg.label('INACBG'),
+            buckets.c.deskripsi_inacbg.label('DESKRIPSI_INACBG'),
+            cast(func.sum(buckets.c.jumlah_kunjungan), db.BigInteger).label('jumlah_kunjungan'),
+            average(buckets.c.los_sum, buckets.c.los_count).label('rata_los'),
+            func.min(buckets.c.los_min).label('min_los'),
+            func.max(buckets.c.los_max).label('max_los'),
+            average(buckets.c.total_tarif_sum, buckets.c.total_tarif_count).label('rata_tarif'),
+            cast(func.sum(buckets.c.total_tarif_sum), db.BigInteger).label('total_tarif'),
+            average(buckets.c.tarif_rs_sum, buckets.c.tarif_rs_count).label('rata_tarif_rs'),
+            cast(func.sum(buckets.c.tarif_rs_sum), db.BigInteger).label('total_tarif_rs')
+        ]
+        query = db.session.query(*columns).group_by(buckets.c.inacbg, buckets.c.deskripsi_inacbg)
+
+        return query, {column.name: column.element for column in columns}
+
+    def _split_range(self, start_dt: Optional[datetime],
+                     end_dt: Optional[datetime]) -> Tuple[Optional[Tuple], List[Tuple]]:
+        """
+        Bagi rentang tanggal menjadi bulan penuh (ringkasan) dan sisa hari (data mentah)
+
+        Returns:
+            Tuple (rentang bulan (awal, akhir) atau None, list rentang data mentah)
+        """
+        first_full_month = None
+        if start_dt is not None:
+            first_full_month = datetime(start_dt.year, start_dt.month, 1)
+            if first_full_month < start_dt:
+                first_full_month = datetime(start_dt.year + start_dt.month // 12, start_dt.month % 12 + 1, 1)
+
+        end_full_month = datetime(end_dt.year, end_dt.month, 1) if end_dt is not None else None
+
+        if first_full_month is not None and end_full_month is not None and first_full_month >= end_full_month:
+            return None, [(start_dt, end_dt)]
+
+        raw_ranges = []
+        if start_dt is not None and start_dt < first_full_month:
+            raw_ranges.append((start_dt, first_full_month))
+        if end_dt is not None and end_full_month < end_dt:
+            raw_ranges.append((end_full_month, end_dt))
+
+        return (first_full_month, end_full_month), raw_ranges
+
+    def _summary_select(self, month_start: Optional[datetime], month_end: Optional[datetime],
+                        exclude_unknown: bool):
+        """SELECT bucket ringkasan untuk bulan [month_start, month_end)"""
+        summary = InacbgMonthlySummary
+        statement = select(
+            summary.inacbg, summary.deskripsi_inacbg,
+            *[getattr(summary, name) for name in SUMMARY_MEASURES]
+        )
+        if month_start is not None:
+            statement = statement.where(summary.admission_month >= month_start.date())
+        if month_end is not None:
+            statement = statement.where(summary.admission_month < month_end.date())
+        if exclude_unknown:
+            # Baris tanpa admission_date tidak termasuk dalam filter tanggal
+            statement = statement.where(summary.admission_month != UNKNOWN_ADMISSION_MONTH)
+        return statement
+
+    def _raw_select(self, low: Optional[datetime], high: Optional[datetime]):
+        """SELECT agregat data_analytics untuk admission_date [low, high)"""
+        inacbg = func.coalesce(DataAnalytics.inacbg, '')
+        deskripsi = func.coalesce(DataAnalytics.deskripsi_inacbg, '')
+        statement = select(
+            inacbg.label('inacbg'), deskripsi.label('deskripsi_inacbg'),
+            *[
+                getattr(func, how)(getattr(DataAnalytics, source_column)).label(name)
+                for name, (source_column, how) in SUMMARY_MEASURES.items()
+            ]
+        ).group_by(inacbg, deskripsi)
+        if low is not None:
+            statement = statement.where(DataAnalytics.admission_date >= low)
+        if high is not None:
+            statement = statement.where(DataAnalytics.admission_date < high)
+        return statement
+
+    def _upsert_records(self, records: List[Dict[str, Any]]):
+        """INSERT ... ON CONFLICT DO UPDATE untuk PostgreSQL"""
+        from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+        statement = pg_insert(self.table).values(records)
+        current = self.table.c
+        incoming = statement.excluded
+
+        update_values = {'updated_at': incoming.updated_at}
+        for name, (_, how) in SUMMARY_MEASURES.items():
+            if how == 'count':
+                update_values[name] = current[name] + incoming[name]
+            elif how == 'sum':
+                update_values[name] = func.coalesce(current[name] + incoming[name], current[name], incoming[name])
+            elif how == 'min':
+                update_values[name] = func.least(current[name], incoming[name])
+            else:
+                update_values[name] = func.greatest(current[name], incoming[name])
+
+        db.session.execute(statement.on_conflict_do_update(
+            constraint='uq_inacbg_monthly_summary_key',
+            set_=update_values
+        ))
+
+    def _merge_records(self, records: List[Dict[str, Any]]):
+        """Gabungkan record ke ringkasan lewat ORM (dialect selain PostgreSQL)"""
+        for record in records:
+            existing = InacbgMonthlySummary.query.filter_by(
+                **{key: record[key] for key in SUMMARY_KEY_COLUMNS}
+            ).first()
+            if existing is None:
+                db.session.add(InacbgMonthlySummary(**record))
+                continue
+
+            for name, (_, how) in SUMMARY_MEASURES.items():
+                current, incoming = getattr(existing, name), record[name]
+                if current is None or incoming is None:
+                    value = incoming if current is None else current
+                elif how in ('count', 'sum'):
+                    value = current + incoming
+                elif how == 'min':
+                    value = min(current, incoming)
+                else:
+                    value = max(current, incoming)
+                setattr(existing, name, value)
+            existing.updated_at = record['updated_at']
+        db.session.flush()
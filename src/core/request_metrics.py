@@ -0,0 +1,236 @@
+"""
+Metrik request dalam memori per proses: latensi per endpoint, waktu SQL dan
+langkah handler (query, process, render), ditampilkan dalam format teks Prometheus
+"""
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Sequence, Tuple
+
+# Batas atas bucket histogram latensi (detik)
+DEFAULT_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _escape(value: str) -> str:
+    """Escape nilai label sesuai format teks Prometheus"""
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = '') -> str:
+    """Label '{a="x",b="y"}' (kosong jika tanpa label)"""
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return '{' + ','.join(parts) + '}' if parts else ''
+
+
+def _format_number(value: float) -> str:
+    """Angka metrik: integer tanpa desimal, float dengan repr"""
+    if value == float('inf'):
+        return '+Inf'
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """Counter per kombinasi label (tidak thread-safe, dipakai di bawah lock RequestMetrics)"""
+
+    def __init__(self, name: str, help_text: str, label_names: Sequence[str] = ()):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = tuple(label_names)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, labels: Tuple[str, ...] = (), amount: float = 1):
+        self._values[labels] = self._values.get(labels, 0) + amount
+
+    def clear(self):
+        self._values.clear()
+
+    def render(self, lines: List[str]):
+        lines.append(f"# HELP {self.name} {self.help_text}")
+        lines.append(f"# TYPE {self.name} counter")
+        for labels, value in sorted(self._values.items()):
+            lines.append(f"{self.name}{_format_labels(self.label_names, labels)} {_format_number(value)}")
+
+
+class Histogram:
+    """Histogram dengan bucket tetap per kombinasi label (tidak thread-safe)"""
+
+    def __init__(self, name: str, help_text: str, label_names: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = tuple(label_names)
+        self.buckets = tuple(sorted(buckets))
+        # labels -> [jumlah per bucket (bukan kumulatif, + satu untuk +Inf), total nilai, jumlah observasi]
+        self._series: Dict[Tuple[str, ...], list] = {}
+
+    def observe(self, labels: Tuple[str, ...], value: float):
+        series = self._series.get(labels)
+        if series is None:
+            series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+        series[0][bisect.bisect_left(self.buckets, value)] += 1
+        series[1] += value
+        series[2] += 1
+
+    def clear(self):
+        self._series.clear()
+
+    def render(self, lines: List[str]):
+        lines.append(f"# HELP {self.name} {self.help_text}")
+        lines.append(f"# TYPE {self.name} histogram")
+        for labels, (counts, total, count) in sorted(self._series.items()):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += bucket_count
+                le = f'le="{_format_number(float(bound))}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.label_names, labels, le)} {cumulative}")
+            label_text = _format_labels(self.label_names, labels)
+            lines.append(f"{self.name}_sum{label_text} {_format_number(total)}")
+            lines.append(f"{self.name}_count{label_text} {count}")
+
+
+class PhaseTimer:
+    """Diisi pemanggil di dalam RequestMetrics.phase(): jumlah baris dan byte hasil render"""
+
+    __slots__ = ('rows', 'bytes')
+
+    def __init__(self):
+        self.rows: Optional[int] = None
+        self.bytes: Optional[int] = None
+
+
+class RequestMetrics:
+    """
+    Kumpulan metrik request, SQL dan handler dalam satu proses
+
+    Setiap pencatatan hanya berupa beberapa operasi dict di bawah satu lock,
+    sehingga aman dibiarkan aktif di produksi. Waktu dan jumlah query SQL juga
+    dijumlahkan per request (thread-local) lalu dicatat per endpoint saat
+    request selesai. Di gunicorn setiap worker punya metrik sendiri.
+    """
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS):
+        """
+        Args:
+            buckets: Batas atas bucket histogram latensi (detik)
+        """
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.requests = Counter(
+            'http_requests_total', 'HTTP requests by endpoint, method and status',
+            ('endpoint', 'method', 'status'))
+        self.request_duration = Histogram(
+            'http_request_duration_seconds', 'HTTP request latency by endpoint', ('endpoint',), buckets)
+        self.request_db_queries = Counter(
+            'http_request_db_queries_total', 'SQL statements executed while serving requests', ('endpoint',))
+        self.request_db_seconds = Counter(
+            'http_request_db_seconds_total', 'Time spent in SQL while serving requests', ('endpoint',))
+        self.response_bytes = Counter(
+            'http_response_bytes_total', 'Response body bytes before compression', ('endpoint',))
+        self.db_query_duration = Histogram(
+            'db_query_duration_seconds', 'SQL statement latency (requests, uploads and jobs)', (), buckets)
+        self.handler_phase_duration = Histogram(
+            'handler_phase_duration_seconds', 'Handler time per view and phase (query, process, render)',
+            ('view', 'phase'), buckets)
+        self.handler_rows = Counter(
+            'handler_rows_total', 'Rows handled per view and phase', ('view', 'phase'))
+        self.handler_rendered_bytes = Counter(
+            'handler_rendered_bytes_total', 'Bytes of HTML rendered per view', ('view',))
+        self._metrics = [
+            self.requests, self.request_duration, self.request_db_queries, self.request_db_seconds,
+            self.response_bytes, self.db_query_duration, self.handler_phase_duration,
+            self.handler_rows, self.handler_rendered_bytes
+        ]
+
+    def start_request(self):
+        """Mulai menghitung waktu dan query SQL request di thread ini"""
+        local = self._local
+        local.started = time.perf_counter()
+        local.queries = 0
+        local.db_seconds = 0.0
+
+    def finish_request(self, endpoint: str, method: str, status: int, response_bytes: Optional[int] = None):
+        """
+        Catat request yang selesai di thread ini
+
+        Args:
+            endpoint: Nama endpoint Flask (bukan URL, agar jumlah label terbatas)
+            method: HTTP method
+            status: HTTP status code
+            response_bytes: Ukuran body response, None jika di-stream
+        """
+        local = self._local
+        started = getattr(local, 'started', None)
+        if started is None:
+            return
+        duration = time.perf_counter() - started
+        local.started = None
+
+        labels = (endpoint,)
+        with self._lock:
+            self.requests.inc((endpoint, method, str(status)))
+            self.request_duration.observe(labels, duration)
+            self.request_db_queries.inc(labels, local.queries)
+            self.request_db_seconds.inc(labels, local.db_seconds)
+            if response_bytes is not None:
+                self.response_bytes.inc(labels, response_bytes)
+
+    def record_query(self, seconds: float):
+        """Catat satu statement SQL (dipanggil listener after_cursor_execute)"""
+        local = self._local
+        if getattr(local, 'started', None) is not None:
+            local.queries += 1
+            local.db_seconds += seconds
+        with self._lock:
+            self.db_query_duration.observe((), seconds)
+
+    @contextmanager
+    def phase(self, view: str, phase: str):
+        """
+        Ukur satu langkah handler
+
+        Args:
+            view: Nama view handler
+            phase: 'query', 'process' atau 'render'
+
+        Yields:
+            PhaseTimer untuk mengisi rows dan bytes
+        """
+        timer = PhaseTimer()
+        started = time.perf_counter()
+        try:
+            yield timer
+        finally:
+            elapsed = time.perf_counter() - started
+            labels = (view, phase)
+            with self._lock:
+                self.handler_phase_duration.observe(labels, elapsed)
+                if timer.rows is not None:
+                    self.handler_rows.inc(labels, timer.rows)
+                if timer.bytes is not None:
+                    self.handler_rendered_bytes.inc((view,), timer.bytes)
+
+    def render(self) -> List[str]:
+        """
+        Semua metrik dalam format teks Prometheus
+
+        Returns:
+            Baris-baris teks (tanpa newline)
+        """
+        lines: List[str] = []
+        with self._lock:
+            for metric in self._metrics:
+                metric.render(lines)
+        return lines
+
+    def reset(self):
+        """Kosongkan semua metrik"""
+        with self._lock:
+            for metric in self._metrics:
+                metric.clear()
+
+
+# Metrik bersama untuk semua request dalam satu proses
+request_metrics = RequestMetrics()
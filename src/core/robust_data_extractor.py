@@ -15,6 +15,9 @@ import json
 import re
 
 from core.database import db, DataAnalytics, User, UploadLog
+from core.duplicate_checker import DuplicateChecker
+from core.column_dtypes import apply_column_dtypes
+from utils.log_utils import log_event
 
 logger = logging.getLogger(__name__)
 
@@ -191,7 +194,7 @@ class RobustDataExtractor:
                 # Baca Excel file
                 try:
                     df = pd.read_excel(file_path)
-                    logger.info(f"Successfully read Excel file: {len(df)} rows, {len(df.columns)} columns")
+                    logger.info("Successfully read Excel file: %s rows, %s columns", len(df), len(df.columns))
                 except Exception as e:
                     errors.append(f"Error reading Excel file: {str(e)}")
                     
@@ -204,7 +207,7 @@ class RobustDataExtractor:
                         sep=file_info['separator'],
                         on_bad_lines='skip'  # Skip bad lines
                     )
-                    logger.info(f"Successfully read text file: {len(df)} rows, {len(df.columns)} columns")
+                    logger.info("Successfully read text file: %s rows, %s columns", len(df), len(df.columns))
                 except Exception as e:
                     errors.append(f"Error reading text file: {str(e)}")
             
@@ -243,7 +246,8 @@ class RobustDataExtractor:
                 # Hapus duplikasi SEP dalam file
                 df = df.drop_duplicates(subset=['SEP'], keep='first')
             
-            return df
+            # Tipe kolom sesuai registry dtype
+            return apply_column_dtypes(df)
             
         except Exception as e:
             logger.error(f"Error cleaning dataframe: {e}")
@@ -320,31 +324,26 @@ class RobustDataExtractor:
             
             if 'SEP' in df.columns:
                 # Check duplikasi SEP dengan database
-                existing_seps = set()
-                try:
-                    existing_data = DataAnalytics.query.with_entities(DataAnalytics.sep).all()
-                    existing_seps = {row.sep for row in existing_data}
-                except Exception as e:
-                    logger.warning(f"Error checking existing SEPs: {e}")
+                # Hanya SEP yang ada di file yang dicek ke database
+                existing_seps = DuplicateChecker().get_existing_seps(df['SEP'])
                 
-                for idx, row in df.iterrows():
-                    sep_value = row.get('SEP')
-                    if sep_value and sep_value in existing_seps:
-                        duplicate_result['duplicate_records'].append({
-                            'row_index': idx,
-                            'sep': sep_value,
-                            'reason': 'SEP sudah ada di database'
-                        })
-                        logger.info(f"Duplicate found: SEP {sep_value} at row {idx}")
-                    else:
-                        duplicate_result['new_records'].append({
-                            'row_index': idx,
-                            'sep': sep_value
-                        })
-                        logger.info(f"New record: SEP {sep_value} at row {idx}")
+                # Mask duplikat tervektorisasi (SEP terisi dan sudah ada di database)
+                sep = df['SEP']
+                duplicate_mask = (sep.notna() & (sep != '') & sep.isin(existing_seps)).to_numpy(dtype=bool)
                 
+                duplicate_result['duplicate_records'] = [
+                    {'row_index': idx, 'sep': sep_value, 'reason': 'SEP sudah ada di database'}
+                    for idx, sep_value in zip(df.index[duplicate_mask], sep[duplicate_mask])
+                ]
+                duplicate_result['new_records'] = [
+                    {'row_index': idx, 'sep': sep_value}
+                    for idx, sep_value in zip(df.index[~duplicate_mask], sep[~duplicate_mask])
+                ]
                 duplicate_result['total_new'] = len(duplicate_result['new_records'])
                 duplicate_result['total_duplicates'] = len(duplicate_result['duplicate_records'])
+                
+                log_event(logger, 'database_duplicates_checked', new=duplicate_result['total_new'],
+                          duplicates=duplicate_result['total_duplicates'])
             
             return duplicate_result
             
@@ -518,6 +517,14 @@ class RobustDataExtractor:
                             clean_data[target_col] = float(value) if value else None
                         except:
                             clean_data[target_col] = None
+                    elif target_col in ['admission_date', 'discharge_date', 'birth_date']:
+                        parsed = pd.to_datetime(value, errors='coerce')
+                        if pd.isna(parsed):
+                            clean_data[target_col] = None
+                        elif target_col == 'birth_date':
+                            clean_data[target_col] = parsed.date()
+                        else:
+                            clean_data[target_col] = parsed.to_pydatetime()
                     elif target_col in ['tarif_inacbg', 'tarif_subacute', 'tarif_chronic', 'tarif_sp', 'tarif_sr', 'tarif_si', 'tarif_sd', 'total_tarif', 'tarif_rs', 'tarif_poli_eks', 'prosedur_non_bedah', 'prosedur_bedah', 'konsultasi', 'tenaga_ahli', 'keperawatan', 'penunjang', 'radiologi', 'laboratorium', 'pelayanan_darah', 'rehabilitasi', 'kamar_akomodasi', 'rawat_intensif', 'obat', 'alkes', 'bmhp', 'sewa_alat', 'obat_kronis', 'obat_kemo']:
                         try:
                             clean_data[target_col] = int(float(value)) if value else None
@@ -568,7 +575,7 @@ class RobustDataExtractor:
             DataFrame dengan kolom tanggal yang sudah dikonversi
         """
         try:
-            logger.info("Starting date column conversion...")
+            logger.debug("Starting date column conversion...")
             
             # Daftar kolom tanggal yang perlu dikonversi (prioritas utama)
             priority_date_columns = ['ADMISSION_DATE', 'DISCHARGE_DATE', 'BIRTH_DATE']
@@ -586,37 +593,34 @@ class RobustDataExtractor:
                     conversion_stats['columns_found'].append(col)
                     conversion_stats['total_columns_processed'] += 1
                     
-                    logger.info(f"Processing column: {col}")
+                    logger.debug("Processing column: %s", col)
                     
-                    # Simpan data asli untuk logging
-                    original_sample = df[col].dropna().head(3).tolist()
-                    logger.info(f"Original data sample for {col}: {original_sample}")
+                    # Sample data asli hanya dibentuk jika DEBUG aktif
+                    if logger.isEnabledFor(logging.DEBUG):
+                        logger.debug("Original data sample for %s: %s", col, df[col].dropna().head(3).tolist())
                     
                     # Check apakah kolom sudah dalam format date atau masih angka
                     if self._is_numeric_date_column(df[col], col):
-                        logger.info(f"Column {col} contains numeric values, converting to date format")
+                        logger.debug("Column %s contains numeric values, converting to date format", col)
                         # Konversi dari angka ke format date
                         converted_series = self._convert_numeric_to_date(df[col], col)
                         
                         if converted_series is not None:
+                            # Simpan sebagai datetime64, kolom database sudah bertipe timestamp/date
                             df[col] = converted_series
                             conversion_stats['successful_conversions'] += 1
                             
-                            # Format tanggal ke string YYYY-MM-DD HH:MM:SS untuk konsistensi database
-                            df[col] = df[col].dt.strftime('%Y-%m-%d %H:%M:%S')
-                            logger.info(f"Formatted {col} to YYYY-MM-DD HH:MM:SS format")
-                            
                             # Log hasil konversi
-                            converted_sample = df[col].dropna().head(3).tolist()
-                            logger.info(f"Converted data sample for {col}: {converted_sample}")
+                            if logger.isEnabledFor(logging.DEBUG):
+                                logger.debug("Converted data sample for %s: %s", col, df[col].dropna().head(3).tolist())
                         else:
                             conversion_stats['failed_conversions'] += 1
                             logger.warning(f"Failed to convert column: {col}")
                     else:
-                        logger.info(f"Column {col} is already in correct format, skipping conversion")
+                        logger.debug("Column %s is already in correct format, skipping conversion", col)
                         conversion_stats['successful_conversions'] += 1
             
-            logger.info(f"Date conversion completed: {conversion_stats}")
+            log_event(logger, 'date_conversion_completed', rows=len(df), **conversion_stats)
             return df
             
         except Exception as e:
@@ -641,7 +645,7 @@ class RobustDataExtractor:
             
             # Ambil sample untuk dicek
             sample_values = non_null_series.head(5).tolist()
-            logger.info(f"Checking if {column_name} is numeric, sample values: {sample_values}")
+            logger.debug("Checking if %s is numeric, sample values: %s", column_name, sample_values)
             
             numeric_count = 0
             for value in sample_values:
@@ -649,27 +653,27 @@ class RobustDataExtractor:
                     # Cek apakah nilai dalam rentang yang masuk akal untuk Excel serial date
                     if 1 <= value <= 100000:
                         numeric_count += 1
-                        logger.info(f"Value {value} is numeric and in Excel serial date range")
+                        logger.debug("Value %s is numeric and in Excel serial date range", value)
                 elif isinstance(value, str):
                     # Cek apakah string berisi angka (bukan format date)
                     try:
                         float_val = float(value)
                         if 1 <= float_val <= 100000:
                             numeric_count += 1
-                            logger.info(f"String value {value} is numeric and in Excel serial date range")
+                            logger.debug("String value %s is numeric and in Excel serial date range", value)
                     except ValueError:
                         # Bukan angka, kemungkinan sudah format date
-                        logger.info(f"String value {value} is not numeric (likely already date format)")
+                        logger.debug("String value %s is not numeric (likely already date format)", value)
                 else:
-                    logger.info(f"Value {value} is not numeric (type: {type(value)})")
+                    logger.debug("Value %s is not numeric (type: %s)", value, type(value))
             
             # Jika 80% atau lebih adalah nilai numerik, perlu konversi
             is_numeric = numeric_count >= len(sample_values) * 0.8
-            logger.info(f"Column {column_name} is numeric: {is_numeric} ({numeric_count}/{len(sample_values)} samples)")
+            logger.debug("Column %s is numeric: %s (%s/%s samples)", column_name, is_numeric, numeric_count, len(sample_values))
             
             # Jika tidak ada nilai numerik sama sekali, pasti tidak perlu konversi
             if numeric_count == 0:
-                logger.info(f"Column {column_name} has no numeric values, skipping conversion")
+                logger.debug("Column %s has no numeric values, skipping conversion", column_name)
                 return False
                 
             return is_numeric
@@ -690,15 +694,15 @@ class RobustDataExtractor:
             Series yang sudah dikonversi atau None jika gagal
         """
         try:
-            logger.info(f"Converting numeric values to date for {column_name}")
+            logger.debug("Converting numeric values to date for %s", column_name)
             
-            # Konversi dari Excel serial date
-            converted = pd.to_datetime(series, origin='1899-12-30', unit='D', errors='coerce')
-            logger.info(f"Converted {column_name} from Excel numeric format")
+            # Konversi dari Excel serial date (nilai bisa berupa string angka dari reader per chunk)
+            converted = pd.to_datetime(pd.to_numeric(series, errors='coerce'), origin='1899-12-30', unit='D', errors='coerce')
+            logger.debug("Converted %s from Excel numeric format", column_name)
             
             # Log sample hasil konversi
-            sample_converted = converted.dropna().head(3).tolist()
-            logger.info(f"Sample converted values for {column_name}: {sample_converted}")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Sample converted values for %s: %s", column_name, converted.dropna().head(3).tolist())
             
             return converted
             
@@ -720,40 +724,40 @@ class RobustDataExtractor:
         try:
             # Cek apakah kolom sudah dalam format datetime
             if pd.api.types.is_datetime64_any_dtype(series):
-                logger.info(f"Column {column_name} is already datetime format")
+                logger.debug("Column %s is already datetime format", column_name)
                 return series
             
             # Cek apakah format sudah benar (YYYY-MM-DD atau YYYY-MM-DD HH:MM:SS)
             is_correct_format = self._is_already_correct_format(series, column_name)
-            logger.info(f"Format check for {column_name}: is_correct_format = {is_correct_format}")
+            logger.debug("Format check for %s: is_correct_format = %s", column_name, is_correct_format)
             if is_correct_format:
-                logger.info(f"Column {column_name} is already in correct format, skipping conversion")
+                logger.debug("Column %s is already in correct format, skipping conversion", column_name)
                 return series
             
             # Cek tipe data dalam kolom
             non_null_series = series.dropna()
             if len(non_null_series) == 0:
-                logger.info(f"Column {column_name} is empty")
+                logger.debug("Column %s is empty", column_name)
                 return series
             
             # Ambil sample untuk menentukan format
             sample_values = non_null_series.head(10).tolist()
-            logger.info(f"Sample values for {column_name}: {sample_values}")
+            logger.debug("Sample values for %s: %s", column_name, sample_values)
             
             # Tentukan format berdasarkan sample
             format_detected = self._detect_date_format(sample_values)
-            logger.info(f"Detected format for {column_name}: {format_detected}")
+            logger.debug("Detected format for %s: %s", column_name, format_detected)
             
             if format_detected == 'excel_numeric':
                 # Konversi dari Excel serial date
-                logger.info(f"Starting Excel serial date conversion for {column_name}")
+                logger.debug("Starting Excel serial date conversion for %s", column_name)
                 try:
                     # Method 1: Menggunakan pd.to_datetime dengan origin
                     converted = pd.to_datetime(series, origin='1899-12-30', unit='D', errors='coerce')
-                    logger.info(f"Converted {column_name} from Excel numeric format using pd.to_datetime")
+                    logger.debug("Converted %s from Excel numeric format using pd.to_datetime", column_name)
                     # Log sample hasil konversi
-                    sample_converted = converted.dropna().head(3).tolist()
-                    logger.info(f"Sample converted values for {column_name}: {sample_converted}")
+                    if logger.isEnabledFor(logging.DEBUG):
+                        logger.debug("Sample converted values for %s: %s", column_name, converted.dropna().head(3).tolist())
                     return converted
                 except Exception as e1:
                     logger.warning(f"Method 1 failed for {column_name}: {e1}")
@@ -769,7 +773,7 @@ class RobustDataExtractor:
                                 return pd.NaT
                         
                         converted = series.apply(excel_to_datetime)
-                        logger.info(f"Converted {column_name} from Excel numeric format using manual conversion")
+                        logger.debug("Converted %s from Excel numeric format using manual conversion", column_name)
                         return converted
                     except Exception as e2:
                         logger.error(f"Method 2 also failed for {column_name}: {e2}")
@@ -778,19 +782,19 @@ class RobustDataExtractor:
             elif format_detected == 'dd_mm_yyyy':
                 # Konversi dari format DD/MM/YYYY
                 converted = pd.to_datetime(series, format='%d/%m/%Y', errors='coerce')
-                logger.info(f"Converted {column_name} from DD/MM/YYYY format")
+                logger.debug("Converted %s from DD/MM/YYYY format", column_name)
                 return converted
                 
             elif format_detected == 'yyyy_mm_dd':
                 # Konversi dari format YYYY-MM-DD
                 converted = pd.to_datetime(series, format='%Y-%m-%d', errors='coerce')
-                logger.info(f"Converted {column_name} from YYYY-MM-DD format")
+                logger.debug("Converted %s from YYYY-MM-DD format", column_name)
                 return converted
                 
             else:
                 # Coba konversi otomatis
                 converted = pd.to_datetime(series, errors='coerce')
-                logger.info(f"Converted {column_name} using automatic detection")
+                logger.debug("Converted %s using automatic detection", column_name)
                 return converted
                 
         except Exception as e:
@@ -819,7 +823,7 @@ class RobustDataExtractor:
                     # Cek apakah nilai dalam rentang yang masuk akal untuk Excel serial date
                     if 1 <= value <= 100000:  # Rentang yang masuk akal untuk Excel serial date
                         numeric_count += 1
-                        logger.info(f"Detected numeric value {value} as potential Excel serial date")
+                        logger.debug("Detected numeric value %s as potential Excel serial date", value)
             
             if numeric_count >= len(sample_values) * 0.8:  # 80% numerik
                 return 'excel_numeric'
@@ -875,35 +879,35 @@ class RobustDataExtractor:
             
             # Ambil sample untuk dicek
             sample_values = non_null_series.head(5).tolist()
-            logger.info(f"Checking format for {column_name}, sample values: {sample_values}")
+            logger.debug("Checking format for %s, sample values: %s", column_name, sample_values)
             
             correct_format_count = 0
             
             for value in sample_values:
-                logger.info(f"Checking value {value} (type: {type(value)})")
+                logger.debug("Checking value %s (type: %s)", value, type(value))
                 if isinstance(value, str):
                     # Cek format YYYY-MM-DD
                     if re.match(r'^\d{4}-\d{2}-\d{2}$', value):
                         correct_format_count += 1
-                        logger.info(f"Value {value} matches YYYY-MM-DD format")
+                        logger.debug("Value %s matches YYYY-MM-DD format", value)
                     # Cek format YYYY-MM-DD HH:MM:SS
                     elif re.match(r'^\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}$', value):
                         correct_format_count += 1
-                        logger.info(f"Value {value} matches YYYY-MM-DD HH:MM:SS format")
+                        logger.debug("Value %s matches YYYY-MM-DD HH:MM:SS format", value)
                     # Cek format YYYY-MM-DD HH:MM:SS.000000
                     elif re.match(r'^\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}\.\d+$', value):
                         correct_format_count += 1
-                        logger.info(f"Value {value} matches YYYY-MM-DD HH:MM:SS.000000 format")
+                        logger.debug("Value %s matches YYYY-MM-DD HH:MM:SS.000000 format", value)
                     else:
-                        logger.info(f"Value {value} does not match any correct format")
+                        logger.debug("Value %s does not match any correct format", value)
                 elif isinstance(value, (int, float)):
                     # Jika nilai numerik, kemungkinan Excel serial date, perlu konversi
-                    logger.info(f"Value {value} is numeric, needs conversion")
+                    logger.debug("Value %s is numeric, needs conversion", value)
                     return False
             
             # Jika 80% atau lebih sudah dalam format yang benar, skip konversi
             if correct_format_count >= len(sample_values) * 0.8:
-                logger.info(f"Column {column_name} is already in correct format ({correct_format_count}/{len(sample_values)} samples)")
+                logger.debug("Column %s is already in correct format (%s/%s samples)", column_name, correct_format_count, len(sample_values))
                 return True
             
             return False
@@ -974,11 +978,11 @@ class RobustDataExtractor:
             }
             
             # Log summary for debugging
-            logger.info(f"Upload summary: Total={result['summary']['total_rows']}, "
-                       f"Success={result['summary']['success_rows']}, "
-                       f"Failed={result['summary']['total_failed_rows']} "
-                       f"(Duplicates={result['summary']['duplicate_failed_rows']}, "
-                       f"Insert errors={result['summary']['insert_failed_rows']})")
+            log_event(logger, 'upload_summary', total=result['summary']['total_rows'],
+                      success=result['summary']['success_rows'],
+                      failed=result['summary']['total_failed_rows'],
+                      duplicates=result['summary']['duplicate_failed_rows'],
+                      insert_errors=result['summary']['insert_failed_rows'])
             
             if insert_result['success']:
                 result['success'] = True
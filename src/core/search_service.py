@@ -0,0 +1,167 @@
+"""
+Search Service untuk membangun kondisi pencarian yang bisa memakai index
+"""
+import logging
+from datetime import timedelta
+from typing import Dict, Any, List
+
+import pandas as pd
+from sqlalchemy import Column, Date, DateTime, Integer, Numeric, case, cast, or_
+
+from core.database import db, DataAnalytics
+
+logger = logging.getLogger(__name__)
+
+# Operator pencarian per kolom data_analytics. Kolom teks lain memakai 'trigram',
+# kolom angka dan tanggal memakai equality berdasarkan tipe kolom.
+# - trigram : ILIKE '%nilai%' (index GIN gin_trgm_ops)
+# - prefix  : LIKE 'nilai%' (index varchar_pattern_ops)
+# - equality: = nilai (kode dengan sedikit variasi nilai)
+SEARCH_COLUMN_OPERATORS = {
+    'nama_pasien': 'trigram',
+    'mrn': 'trigram',
+    'dpjp': 'trigram',
+    'inacbg': 'trigram',
+    'deskripsi_inacbg': 'trigram',
+    'diaglist': 'trigram',
+    'proclist': 'trigram',
+    'sep': 'prefix',
+    'nokartu': 'prefix',
+    'kode_rs': 'equality',
+    'kelas_rs': 'equality',
+    'kelas_rawat': 'equality',
+    'kode_tarif': 'equality',
+    'ptd': 'equality',
+    'sex': 'equality',
+    'discharge_status': 'equality',
+    'icu_indikator': 'equality'
+}
+
+# Index trigram hanya efektif untuk kata kunci minimal 3 karakter,
+# kata kunci yang lebih pendek dicari sebagai prefix
+TRIGRAM_MIN_LENGTH = 3
+
+# Batas jumlah hasil endpoint /search
+MAX_SEARCH_RESULTS = 50
+
+
+def escape_like(value: str) -> str:
+    """Escape karakter wildcard LIKE (\\, % dan _)"""
+    return str(value).replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+
+class SearchService:
+    """Service untuk pencarian data_analytics dengan operator sesuai tipe kolom"""
+
+    def condition(self, column, value: Any):
+        """
+        Bangun kondisi pencarian untuk satu kolom
+
+        Args:
+            column: Atribut/kolom DataAnalytics
+            value: Nilai yang dicari
+
+        Returns:
+            Kondisi SQLAlchemy, atau None jika nilai kosong
+        """
+        term = str(value).strip() if value is not None else ''
+        if not term:
+            return None
+
+        column_type = column.type
+        if isinstance(column_type, (Integer, Numeric)):
+            return self._numeric_condition(column, term)
+        if isinstance(column_type, (Date, DateTime)):
+            return self._date_condition(column, term)
+
+        operator = SEARCH_COLUMN_OPERATORS.get(column.key, 'trigram')
+        if operator == 'equality':
+            return column == term
+        if operator == 'prefix':
+            return column.like(f'{escape_like(term)}%', escape='\\')
+        if len(term) < TRIGRAM_MIN_LENGTH:
+            return column.ilike(f'{escape_like(term)}%', escape='\\')
+        return column.ilike(f'%{escape_like(term)}%', escape='\\')
+
+    def expression_condition(self, expression, value: Any):
+        """
+        Kondisi pencarian untuk ekspresi hasil query view
+
+        Kolom data_analytics memakai condition(); ekspresi lain (agregat atau
+        kolom turunan) dicari dengan 'contains' pada nilai teksnya.
+        """
+        if isinstance(expression, Column) and getattr(expression, 'table', None) is DataAnalytics.__table__:
+            return self.condition(expression, value)
+
+        return cast(expression, db.String).ilike(f'%{escape_like(value)}%', escape='\\')
+
+    def search_pasien(self, search_term: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """
+        Cari kunjungan pasien berdasarkan MRN atau nama, diurutkan berdasarkan relevansi
+
+        Urutan: MRN sama persis, awalan MRN, awalan nama, lalu nama/MRN yang
+        mengandung kata kunci (di PostgreSQL diurutkan dengan similarity pg_trgm).
+
+        Args:
+            search_term: Kata kunci pencarian
+            limit: Jumlah hasil maksimal (dibatasi MAX_SEARCH_RESULTS)
+
+        Returns:
+            List dict hasil pencarian
+        """
+        term = str(search_term or '').strip()
+        if not term:
+            return []
+        limit = min(max(int(limit or 1), 1), MAX_SEARCH_RESULTS)
+
+        prefix = f'{escape_like(term)}%'
+        rank = case(
+            (DataAnalytics.mrn == term, 0),
+            (DataAnalytics.mrn.like(prefix, escape='\\'), 1),
+            (DataAnalytics.nama_pasien.ilike(prefix, escape='\\'), 2),
+            else_=3
+        ).label('rank')
+
+        order_by = [rank]
+        if db.session.get_bind().dialect.name == 'postgresql':
+            order_by.append(db.func.similarity(DataAnalytics.nama_pasien, term).desc())
+        order_by.extend([DataAnalytics.admission_date.desc(), DataAnalytics.data_id])
+
+        results = db.session.query(
+            DataAnalytics.mrn,
+            DataAnalytics.nama_pasien,
+            DataAnalytics.sep,
+            DataAnalytics.admission_date,
+            rank
+        ).filter(
+            or_(
+                self.condition(DataAnalytics.mrn, term),
+                self.condition(DataAnalytics.nama_pasien, term)
+            )
+        ).order_by(*order_by).limit(limit).all()
+
+        return [{
+            'mrn': row.mrn,
+            'nama_pasien': row.nama_pasien,
+            'sep': row.sep,
+            'admission_date': row.admission_date.strftime('%Y-%m-%d %H:%M:%S') if row.admission_date else None,
+            'rank': row.rank
+        } for row in results]
+
+    def _numeric_condition(self, column, term: str):
+        """Equality untuk kolom angka, 'contains' pada teks jika nilai bukan angka"""
+        number = pd.to_numeric(term.replace(',', '.'), errors='coerce')
+        if pd.isna(number):
+            return cast(column, db.String).ilike(f'%{escape_like(term)}%', escape='\\')
+        return column == number.item()
+
+    def _date_condition(self, column, term: str):
+        """Range satu hari [tanggal, tanggal + 1 hari) untuk kolom tanggal"""
+        value = pd.to_datetime(term, errors='coerce', dayfirst='/' in term)
+        if pd.isna(value):
+            return cast(column, db.String).ilike(f'%{escape_like(term)}%', escape='\\')
+
+        day = value.to_pydatetime().replace(hour=0, minute=0, second=0, microsecond=0)
+        if isinstance(column.type, DateTime):
+            return (column >= day) & (column < day + timedelta(days=1))
+        return column == day.date()
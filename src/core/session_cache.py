@@ -0,0 +1,164 @@
+"""
+Session Cache untuk validasi session login (token -> user, role) dengan TTL
+"""
+import time
+import threading
+import logging
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+
+from core.database import db, User, UserSession
+from utils.timezone_utils import jakarta_now
+
+logger = logging.getLogger(__name__)
+
+# Lama hasil validasi session disimpan sebelum dicek ulang ke database (detik)
+DEFAULT_SESSION_TTL_SECONDS = 30
+
+# Batas jumlah token di cache; entry terlama dibuang jika penuh
+DEFAULT_MAX_SESSIONS = 10000
+
+
+class CachedSession:
+    """Hasil validasi satu session login (tanpa objek ORM, aman dipakai antar request)"""
+
+    def __init__(self, session_id: int, user_id: int, username: str, role: str, expires_at: datetime):
+        self.session_id = session_id
+        self.user_id = user_id
+        self.username = username
+        self.role = role
+        self.expires_at = expires_at
+
+    def __repr__(self):
+        return f'<CachedSession {self.session_id}: {self.username} ({self.role})>'
+
+
+class SessionCache:
+    """
+    Cache in-process hasil validasi session per token
+
+    Decorator login memanggil validate() di setiap request. Session valid (token
+    aktif, belum kadaluarsa, user aktif) disimpan bersama role user selama TTL,
+    tetapi tidak pernah melewati expires_at session tersebut. Token yang tidak
+    valid tidak disimpan. Cache di-invalidate saat logout, reset password dan
+    penghapusan user; perubahan dari proses lain terlihat paling lambat setelah TTL.
+    """
+
+    def __init__(self, ttl_seconds: float = DEFAULT_SESSION_TTL_SECONDS,
+                 max_entries: int = DEFAULT_MAX_SESSIONS):
+        """
+        Args:
+            ttl_seconds: Lama hasil validasi disimpan (0 = selalu cek database)
+            max_entries: Jumlah token maksimal di cache
+        """
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: Dict[str, Tuple[float, CachedSession]] = {}
+        self._generation = 0
+        self._hits = 0
+        self._misses = 0
+        self._lock = threading.Lock()
+
+    def validate(self, user_id: int, session_token: str) -> Optional[CachedSession]:
+        """
+        Validasi session dari cache, atau dari database jika belum ada/kadaluarsa
+
+        Args:
+            user_id: user_id dari Flask session
+            session_token: Token session dari Flask session
+
+        Returns:
+            CachedSession jika session valid, None jika tidak
+        """
+        if not user_id or not session_token:
+            return None
+
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(session_token)
+            if entry is not None and now < entry[0] and entry[1].user_id == user_id:
+                self._hits += 1
+                return entry[1]
+            self._misses += 1
+            generation = self._generation
+
+        cached = self._load(user_id, session_token)
+
+        with self._lock:
+            if cached is None:
+                self._entries.pop(session_token, None)
+            elif generation == self._generation and self.ttl_seconds > 0:
+                # Jangan simpan hasil yang dibaca sebelum invalidate() terakhir
+                remaining = _seconds_until(cached.expires_at)
+                if len(self._entries) >= self.max_entries and session_token not in self._entries:
+                    self._entries.pop(next(iter(self._entries)))
+                self._entries[session_token] = (now + min(self.ttl_seconds, remaining), cached)
+        return cached
+
+    def _load(self, user_id: int, session_token: str) -> Optional[CachedSession]:
+        """Baca session aktif dan role user dari database"""
+        row = db.session.query(
+            UserSession.session_id, UserSession.expires_at, User.username, User.role
+        ).join(User, User.user_id == UserSession.user_id).filter(
+            UserSession.user_id == user_id,
+            UserSession.session_token == session_token,
+            UserSession.is_active.is_(True),
+            UserSession.expires_at > jakarta_now(),
+            User.is_active.is_(True)
+        ).first()
+
+        if row is None:
+            return None
+        return CachedSession(row.session_id, user_id, row.username, row.role, row.expires_at)
+
+    def invalidate_token(self, session_token: str):
+        """Hapus satu token dari cache (logout)"""
+        with self._lock:
+            self._generation += 1
+            self._entries.pop(session_token, None)
+        logger.debug("Session cache invalidated for one token")
+
+    def invalidate_user(self, user_id: int):
+        """Hapus semua token milik satu user (reset password, hapus user)"""
+        with self._lock:
+            self._generation += 1
+            tokens = [token for token, (_, cached) in self._entries.items() if cached.user_id == user_id]
+            for token in tokens:
+                del self._entries[token]
+        logger.debug(f"Session cache invalidated for user {user_id}: {len(tokens)} tokens")
+
+    def invalidate(self):
+        """Hapus semua token dari cache"""
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+        logger.debug("Session cache invalidated: all")
+
+    def stats(self) -> Dict[str, float]:
+        """
+        Statistik cache
+
+        Returns:
+            Dict dengan hits, misses, hit_rate, entries dan ttl_seconds
+        """
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                'hits': self._hits,
+                'misses': self._misses,
+                'hit_rate': round(self._hits / lookups, 4) if lookups else 0.0,
+                'entries': len(self._entries),
+                'ttl_seconds': self.ttl_seconds
+            }
+
+
+def _seconds_until(expires_at: datetime) -> float:
+    """Sisa detik sampai expires_at (kolom DateTime tanpa zona berisi waktu Jakarta)"""
+    now = jakarta_now()
+    if expires_at.tzinfo is None:
+        now = now.replace(tzinfo=None)
+    return (expires_at - now).total_seconds()
+
+
+# Cache bersama untuk semua request dalam satu proses
+session_cache = SessionCache()
@@ -0,0 +1,326 @@
+"""
+Snapshot Cache untuk menyimpan kolom data_analytics sebagai file Parquet per bulan admisi
+
+Handler analisa membaca subset kolom dari snapshot (memory-mapped, dengan filter
+tanggal yang di-push down ke partisi dan row group) sehingga tidak perlu query
+dan konversi row-by-row dari PostgreSQL. pyarrow bersifat opsional: jika tidak
+terinstall, atau snapshot belum dibuat/sudah basi, pembacaan kembali ke database.
+"""
+import os
+import json
+import uuid
+import shutil
+import logging
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional
+
+import pandas as pd
+from sqlalchemy import Date, DateTime, Integer, Numeric, select
+
+from core.database import db, DataAnalytics
+from utils.timezone_utils import jakarta_now
+
+try:
+    import pyarrow as pa
+    import pyarrow.dataset as pa_dataset
+    import pyarrow.fs as pa_fs
+    import pyarrow.parquet as pq
+    PYARROW_AVAILABLE = True
+except ImportError:  # pragma: no cover - pyarrow opsional
+    pa = None
+    PYARROW_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# Folder default snapshot (bisa diganti lewat app.config['SNAPSHOT_FOLDER'])
+DEFAULT_SNAPSHOT_FOLDER = 'instance/snapshots'
+
+# File penanda snapshot aktif (versi, upload_id terakhir, kolom)
+MANIFEST_FILENAME = 'current.json'
+
+# Kolom partisi dan nilai partisi untuk baris tanpa admission_date
+PARTITION_COLUMN = 'admission_month'
+UNKNOWN_PARTITION = 'unknown'
+
+# Jumlah baris per fetch dari database, sekaligus ukuran row group Parquet
+SNAPSHOT_BATCH_SIZE = 50000
+
+
+class SnapshotCache:
+    """
+    Snapshot kolom data_analytics dalam format Parquet, dipartisi per bulan admisi
+
+    Snapshot dibangun ulang setelah upload sukses dan ditandai dengan upload_id
+    UploadLog sukses terakhir. Snapshot dianggap basi jika upload_id tersebut
+    berbeda dengan upload sukses terakhir di database. Setiap build ditulis ke
+    folder versi baru lalu manifest diganti secara atomic, sehingga pembaca
+    tidak pernah melihat snapshot yang setengah jadi.
+    """
+
+    def __init__(self, folder: Optional[str] = None):
+        """
+        Args:
+            folder: Folder snapshot, default dari app.config['SNAPSHOT_FOLDER']
+        """
+        self._folder = folder
+
+    @property
+    def folder(self) -> str:
+        """Folder snapshot"""
+        if self._folder:
+            return self._folder
+        try:
+            from flask import current_app
+            return current_app.config.get('SNAPSHOT_FOLDER', DEFAULT_SNAPSHOT_FOLDER)
+        except RuntimeError:
+            return DEFAULT_SNAPSHOT_FOLDER
+
+    @property
+    def available(self) -> bool:
+        """True jika pyarrow terinstall"""
+        return PYARROW_AVAILABLE
+
+    def manifest(self) -> Optional[Dict[str, Any]]:
+        """
+        Baca manifest snapshot aktif
+
+        Returns:
+            Dict manifest, atau None jika snapshot belum ada
+        """
+        path = os.path.join(self.folder, MANIFEST_FILENAME)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning(f"Could not read snapshot manifest: {e}")
+            return None
+
+    def is_fresh(self, last_upload_id: Optional[int], columns: Iterable[str] = ()) -> bool:
+        """
+        Cek apakah snapshot aktif masih sesuai dengan data di database
+
+        Args:
+            last_upload_id: upload_id UploadLog sukses terakhir
+            columns: Kolom yang harus ada di snapshot
+
+        Returns:
+            True jika snapshot bisa dipakai
+        """
+        if not PYARROW_AVAILABLE or last_upload_id is None:
+            return False
+
+        manifest = self.manifest()
+        if manifest is None or manifest.get('upload_id') != last_upload_id:
+            return False
+
+        return set(columns).issubset(manifest.get('columns', []))
+
+    def build(self, columns: Iterable[str], upload_id: int) -> Dict[str, Any]:
+        """
+        Bangun ulang snapshot dari tabel data_analytics
+
+        Args:
+            columns: Kolom DataAnalytics yang disimpan di snapshot
+            upload_id: upload_id UploadLog sukses terakhir, dibaca SEBELUM data
+                       sehingga upload yang commit selama build membuat snapshot basi
+
+        Returns:
+            Dict dengan status build
+        """
+        if not PYARROW_AVAILABLE:
+            return {
+                'success': False,
+                'error': 'pyarrow tidak terinstall'
+            }
+
+        columns = self._snapshot_columns(columns)
+        schema = pa.schema([(name, self._arrow_type(DataAnalytics.__table__.columns[name].type))
+                            for name in columns])
+
+        os.makedirs(self.folder, exist_ok=True)
+        version = f"snapshot_{upload_id}_{uuid.uuid4().hex[:8]}"
+        version_path = os.path.join(self.folder, version)
+        tmp_path = os.path.join(self.folder, f".tmp_{version}")
+
+        try:
+            os.makedirs(tmp_path)
+            total_rows = 0
+            for partition, condition in self._partitions():
+                total_rows += self._write_partition(tmp_path, partition, condition, columns, schema)
+
+            os.rename(tmp_path, version_path)
+            manifest = {
+                'version': version,
+                'upload_id': upload_id,
+                'columns': columns,
+                'rows': total_rows,
+                'created_at': jakarta_now().isoformat()
+            }
+            self._write_manifest(manifest)
+
+        except Exception as e:
+            db.session.rollback()
+            shutil.rmtree(tmp_path, ignore_errors=True)
+            logger.error(f"Error building data snapshot: {e}", exc_info=True)
+            return {
+                'success': False,
+                'error': str(e)
+            }
+
+        self._remove_old_versions(keep=version)
+        logger.info(f"Data snapshot {version} built: {total_rows} rows")
+
+        return {
+            'success': True,
+            'version': version,
+            'rows': total_rows
+        }
+
+    def read(self, columns: List[str], start_dt: Optional[datetime] = None,
+             end_dt: Optional[datetime] = None) -> pd.DataFrame:
+        """
+        Baca subset kolom dari snapshot aktif
+
+        Partisi bulan di luar range dilewati dan filter admission_date di-push
+        down ke statistik row group Parquet.
+
+        Args:
+            columns: Kolom DataAnalytics yang dibaca
+            start_dt: Awal range admission_date (inklusif)
+            end_dt: Akhir range admission_date (eksklusif)
+
+        Returns:
+            DataFrame dengan nama kolom DataAnalytics
+        """
+        manifest = self.manifest()
+        if manifest is None:
+            raise FileNotFoundError('Snapshot belum dibuat')
+        if not manifest.get('rows'):
+            return pd.DataFrame(columns=list(columns))
+
+        dataset = pa_dataset.dataset(
+            os.path.join(self.folder, manifest['version']),
+            format='parquet',
+            partitioning=pa_dataset.partitioning(pa.schema([(PARTITION_COLUMN, pa.string())]), flavor='hive'),
+            filesystem=pa_fs.LocalFileSystem(use_mmap=True)
+        )
+
+        table = dataset.to_table(columns=list(columns), filter=self._date_filter(start_dt, end_dt))
+        return table.to_pandas(date_as_object=False)
+
+    def clear(self):
+        """Hapus semua snapshot (dipanggil saat data dihapus)"""
+        if os.path.isdir(self.folder):
+            shutil.rmtree(self.folder, ignore_errors=True)
+            logger.info("Data snapshot cleared")
+
+    def _snapshot_columns(self, columns: Iterable[str]) -> List[str]:
+        """Kolom snapshot tanpa duplikat, selalu termasuk admission_date"""
+        table_columns = DataAnalytics.__table__.columns
+        result = ['admission_date']
+        for name in columns:
+            if name not in result and name in table_columns:
+                result.append(name)
+        return result
+
+    @staticmethod
+    def _arrow_type(column_type):
+        """Tipe Arrow untuk tipe kolom database"""
+        if isinstance(column_type, Integer):
+            return pa.int64()
+        if isinstance(column_type, Numeric):
+            return pa.float64()
+        if isinstance(column_type, DateTime):
+            return pa.timestamp('us')
+        if isinstance(column_type, Date):
+            return pa.date32()
+        return pa.string()
+
+    def _partitions(self):
+        """
+        Daftar partisi bulan admisi (nama partisi, kondisi filter)
+
+        Range bulan diambil dari MIN/MAX admission_date sehingga setiap partisi
+        dibaca dengan range scan index admission_date.
+        """
+        min_date, max_date = db.session.query(
+            db.func.min(DataAnalytics.admission_date),
+            db.func.max(DataAnalytics.admission_date)
+        ).one()
+
+        if min_date is not None:
+            month = datetime(min_date.year, min_date.month, 1)
+            while month <= max_date:
+                next_month = datetime(month.year + month.month // 12, month.month % 12 + 1, 1)
+                yield (month.strftime('%Y-%m'),
+                       (DataAnalytics.admission_date >= month) & (DataAnalytics.admission_date < next_month))
+                month = next_month
+
+        yield UNKNOWN_PARTITION, DataAnalytics.admission_date.is_(None)
+
+    def _write_partition(self, base_path: str, partition: str, condition, columns: List[str], schema) -> int:
+        """Tulis satu partisi bulan sebagai satu file Parquet, satu row group per batch"""
+        table_columns = DataAnalytics.__table__.columns
+        query = select(*[table_columns[name] for name in columns]).where(condition)
+        numeric_indexes = [i for i, name in enumerate(columns)
+                           if isinstance(table_columns[name].type, Numeric)]
+
+        writer = None
+        rows_written = 0
+        result = db.session.execute(query.execution_options(stream_results=True, yield_per=SNAPSHOT_BATCH_SIZE))
+        try:
+            for rows in result.partitions(SNAPSHOT_BATCH_SIZE):
+                values = [list(col) for col in zip(*rows)]
+                for i in numeric_indexes:
+                    values[i] = [float(v) if v is not None else None for v in values[i]]
+                batch = pa.Table.from_arrays(
+                    [pa.array(col_values, type=field.type) for col_values, field in zip(values, schema)],
+                    schema=schema
+                )
+
+                if writer is None:
+                    partition_path = os.path.join(base_path, f"{PARTITION_COLUMN}={partition}")
+                    os.makedirs(partition_path, exist_ok=True)
+                    writer = pq.ParquetWriter(os.path.join(partition_path, 'part-0.parquet'), schema)
+                writer.write_table(batch, row_group_size=SNAPSHOT_BATCH_SIZE)
+                rows_written += batch.num_rows
+        finally:
+            result.close()
+            if writer is not None:
+                writer.close()
+
+        return rows_written
+
+    @staticmethod
+    def _date_filter(start_dt: Optional[datetime], end_dt: Optional[datetime]):
+        """Filter Arrow untuk range admission_date (partisi bulan + row group)"""
+        conditions = []
+        if start_dt:
+            conditions.append(pa_dataset.field(PARTITION_COLUMN) >= start_dt.strftime('%Y-%m'))
+            conditions.append(pa_dataset.field('admission_date') >= pa.scalar(start_dt, type=pa.timestamp('us')))
+        if end_dt:
+            conditions.append(pa_dataset.field(PARTITION_COLUMN) <= end_dt.strftime('%Y-%m'))
+            conditions.append(pa_dataset.field('admission_date') < pa.scalar(end_dt, type=pa.timestamp('us')))
+
+        if not conditions:
+            return None
+        expression = conditions[0]
+        for condition in conditions[1:]:
+            expression = expression & condition
+        return expression
+
+    def _write_manifest(self, manifest: Dict[str, Any]):
+        """Ganti manifest secara atomic (tulis file sementara lalu os.replace)"""
+        path = os.path.join(self.folder, MANIFEST_FILENAME)
+        tmp_path = f"{path}.{uuid.uuid4().hex[:8]}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f)
+        os.replace(tmp_path, path)
+
+    def _remove_old_versions(self, keep: str):
+        """Hapus folder snapshot versi lama"""
+        for name in os.listdir(self.folder):
+            if name.startswith('snapshot_') and name != keep:
+                shutil.rmtree(os.path.join(self.folder, name), ignore_errors=True)
@@ -0,0 +1,77 @@
+"""
+Stats Cache untuk menyimpan statistik database (jumlah data, info upload) dengan TTL
+"""
+import time
+import threading
+import logging
+from typing import Any, Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Lama statistik disimpan sebelum dihitung ulang (detik)
+DEFAULT_STATS_TTL_SECONDS = 30
+
+
+class StatsCache:
+    """
+    Cache in-process dengan TTL untuk statistik yang mahal dihitung
+
+    Nilai dihitung ulang jika sudah lebih tua dari TTL atau setelah invalidate()
+    dipanggil (upload selesai atau data dihapus). Cache dipakai bersama oleh
+    semua request dan worker thread dalam satu proses.
+    """
+
+    def __init__(self, ttl_seconds: float = DEFAULT_STATS_TTL_SECONDS):
+        """
+        Args:
+            ttl_seconds: Lama nilai disimpan sebelum dihitung ulang
+        """
+        self.ttl_seconds = ttl_seconds
+        self._entries: Dict[str, Tuple[float, Any]] = {}
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: str, loader: Callable[[], Any]) -> Any:
+        """
+        Ambil nilai dari cache, hitung dengan loader jika belum ada atau kadaluarsa
+
+        Args:
+            key: Nama statistik
+            loader: Fungsi untuk menghitung nilai. Exception dari loader tidak disimpan
+
+        Returns:
+            Nilai statistik
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and now - entry[0] < self.ttl_seconds:
+                return entry[1]
+            generation = self._generation
+
+        value = loader()
+
+        with self._lock:
+            # Jangan simpan nilai yang dihitung sebelum invalidate() terakhir
+            if generation == self._generation:
+                self._entries[key] = (now, value)
+        return value
+
+    def invalidate(self, key: Optional[str] = None):
+        """
+        Hapus nilai dari cache sehingga request berikutnya menghitung ulang
+
+        Args:
+            key: Nama statistik, None untuk menghapus semua
+        """
+        with self._lock:
+            self._generation += 1
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+        logger.debug(f"Stats cache invalidated: {key or 'all'}")
+
+
+# Cache bersama untuk statistik data_analytics dan upload_logs
+stats_cache = StatsCache()
@@ -0,0 +1,46 @@
+"""
+Upload Context untuk menyimpan state satu proses upload
+"""
+import time
+from typing import Any, Dict, Optional
+
+from core.dataframe_manager import DataFrameManager
+from core.upload_metrics import UploadStageRecorder
+
+
+class UploadContext:
+    """
+    State satu upload (file, user, job, DataFrame yang sedang diproses dan waktu per langkah)
+
+    UploadService tidak menyimpan state per upload; setiap process_upload membuat
+    context sendiri, sehingga beberapa upload bisa diproses paralel di thread
+    atau proses berbeda tanpa saling menimpa DataFrame.
+    """
+
+    def __init__(self, file_path: str, user_id: int, upload_id: Optional[int] = None,
+                 started_at: Optional[float] = None):
+        """
+        Args:
+            file_path: Path ke file yang diupload
+            user_id: ID user yang melakukan upload
+            upload_id: ID UploadLog job upload (None = upload sinkron)
+            started_at: Waktu mulai upload (time.monotonic), default sekarang
+        """
+        self.file_path = file_path
+        self.user_id = user_id
+        self.upload_id = upload_id
+        self.started_at = time.monotonic() if started_at is None else started_at
+        self.file_info: Optional[Dict[str, Any]] = None
+        self.dataframe_manager = DataFrameManager()
+        self.stages = UploadStageRecorder()
+        # UploadLog yang ditulis _log_upload (sama dengan upload_id untuk job upload)
+        self.log_id: Optional[int] = upload_id
+
+    @property
+    def elapsed_seconds(self) -> int:
+        """Lama proses upload dalam detik (dibulatkan)"""
+        return int(round(time.monotonic() - self.started_at))
+
+    def clear(self):
+        """Lepaskan DataFrame upload (setelah selesai atau per chunk streaming)"""
+        self.dataframe_manager.clear_dataframe()
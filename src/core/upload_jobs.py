@@ -0,0 +1,422 @@
+"""
+Upload Job Queue untuk memproses upload file di background tanpa broker eksternal
+"""
+import os
+import queue
+import shutil
+import threading
+import time
+import logging
+import uuid
+from typing import Dict, Any, List, Optional, Callable
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+    import msvcrt
+
+from core.database import db, UploadLog
+from core.upload_service import UploadService, ACTIVE_UPLOAD_STATUSES
+from core.database_query_service import DatabaseQueryService
+from utils.timezone_utils import jakarta_now
+
+logger = logging.getLogger(__name__)
+
+# Folder antrian per proses di dalam UPLOAD_FOLDER: queue-<pid>-<acak>/ berisi file
+# job yang menunggu dan file .lock yang dikunci selama proses pemiliknya hidup
+SPOOL_PREFIX = 'queue-'
+SPOOL_LOCK_NAME = '.lock'
+# Folder spool baru dibuat dan dikunci dengan nama ini dulu, lalu di-rename,
+# supaya pemulihan di proses lain tidak pernah melihat spool yang belum terkunci
+SPOOL_TMP_PREFIX = '.tmp-' + SPOOL_PREFIX
+
+STALE_JOB_ERROR = 'Upload terhenti karena server di-restart sebelum selesai. Silakan upload ulang file.'
+
+
+def _try_lock(handle) -> bool:
+    """Kunci file secara eksklusif tanpa menunggu; False jika sudah dikunci proses lain"""
+    try:
+        if fcntl is not None:
+            fcntl.flock(handle.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        else:
+            msvcrt.locking(handle.fileno(), msvcrt.LK_NBLCK, 1)
+        return True
+    except OSError:
+        return False
+
+
+class UploadJobQueue:
+    """
+    Antrian job upload in-process dengan worker thread
+
+    Route upload hanya menyimpan file ke spool_folder dan memanggil submit();
+    pipeline upload dijalankan oleh worker di background. Job id adalah upload_id
+    dari UploadLog, sehingga status dan progress job dibaca langsung dari tabel
+    upload_logs.
+
+    Antrian hanya ada di memori, jadi job milik proses yang mati (restart,
+    worker gunicorn di-recycle atau crash) dipulihkan oleh proses lain saat
+    request pertamanya: job yang filenya masih ada diantrikan ulang, sisanya
+    ditandai failed. Proses pemilik dikenali dari folder spool yang masih
+    terkunci.
+    """
+
+    def __init__(self, app, workers: int = 1, cleanup_file: Optional[Callable[[str], None]] = None):
+        """
+        Args:
+            app: Flask app, dipakai untuk app context di worker thread
+            workers: Jumlah worker thread. Upload diproses paralel; hanya bagian
+                     cek duplikasi SEP sampai commit yang bergantian antar upload
+            cleanup_file: Fungsi untuk menghapus file upload setelah job selesai
+        """
+        self.app = app
+        self.workers = max(1, int(workers))
+        self.cleanup_file = cleanup_file
+        self.upload_folder = app.config.get('UPLOAD_FOLDER', 'instance/uploads')
+        # UploadService stateless (state per upload ada di UploadContext), jadi dipakai bersama
+        self.upload_service = UploadService()
+        self._queue = queue.Queue()
+        self._threads = []
+        self._lock = threading.Lock()
+        self._pid = None
+        self._spool_folder = None
+        self._spool_lock = None
+        # Spool dan pemulihan job dibuat di proses yang melayani request (setelah fork gunicorn)
+        app.before_request(self.ensure_process)
+
+    @property
+    def spool_folder(self) -> str:
+        """Folder tempat route menyimpan file job milik proses ini"""
+        self.ensure_process()
+        return self._spool_folder
+
+    def ensure_process(self):
+        """
+        Siapkan antrian untuk proses ini (sekali per proses, butuh app context)
+
+        Membuat folder spool yang dikunci selama proses hidup, lalu memulihkan
+        job milik proses yang sudah mati.
+        """
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            # Setelah fork, thread dan isi antrian proses induk tidak ikut dipakai
+            self._queue = queue.Queue()
+            self._threads = []
+            self._open_spool()
+            self._pid = os.getpid()
+        self.recover_stale_jobs()
+
+    def _open_spool(self):
+        """
+        Buat folder spool proses ini dan kunci file .lock-nya
+
+        Folder dibuat dan dikunci dengan nama sementara (dilewati
+        recover_stale_jobs), lalu di-rename ke nama spool sambil tetap dikunci.
+        """
+        suffix = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        folder = os.path.join(self.upload_folder, f"{SPOOL_PREFIX}{suffix}")
+        if fcntl is None:
+            # Windows: folder dengan file terbuka tidak bisa di-rename, dan tanpa
+            # server preforking tidak ada proses lain yang memulihkan bersamaan
+            tmp_folder = folder
+        else:
+            tmp_folder = os.path.join(self.upload_folder, f"{SPOOL_TMP_PREFIX}{suffix}")
+        os.makedirs(tmp_folder)
+        handle = open(os.path.join(tmp_folder, SPOOL_LOCK_NAME), 'a+')
+        if not _try_lock(handle):
+            handle.close()
+            raise RuntimeError(f"Upload spool {tmp_folder} is locked by another process")
+        if tmp_folder != folder:
+            os.rename(tmp_folder, folder)
+        self._spool_folder = folder
+        self._spool_lock = handle
+
+    def _lock_dead_spool(self, folder: str):
+        """
+        Kunci folder spool proses lain jika pemiliknya sudah mati
+
+        Returns:
+            Handle file lock (tutup setelah selesai), atau None jika pemilik masih hidup
+        """
+        try:
+            handle = open(os.path.join(folder, SPOOL_LOCK_NAME), 'a+')
+        except OSError:
+            return None
+        if _try_lock(handle):
+            return handle
+        handle.close()
+        return None
+
+    def recover_stale_jobs(self) -> Dict[str, int]:
+        """
+        Pulihkan job aktif (queued/processing) milik proses yang sudah mati
+
+        Daftar job dibaca sebelum folder spool diperiksa, sehingga spool pemilik
+        setiap job pasti sudah ada saat diperiksa. Job dengan file di folder spool
+        yang tidak lagi terkunci (atau langsung di UPLOAD_FOLDER, format lama) dipindahkan ke spool proses ini dan
+        diantrikan ulang; jika filenya sudah tidak ada, job ditandai failed.
+        Job yang filenya di luar UPLOAD_FOLDER (server lain) tidak disentuh.
+        Folder spool yang mati dihapus setelahnya.
+
+        Returns:
+            Dict dengan jumlah job requeued dan failed
+        """
+        upload_root = os.path.abspath(self.upload_folder)
+        own_spool = os.path.abspath(self._spool_folder)
+        dead_spools = {}
+        live_spools = set()
+        requeued: List[Dict[str, Any]] = []
+        failed = 0
+
+        try:
+            stale_logs = UploadLog.query.filter(UploadLog.status.in_(ACTIVE_UPLOAD_STATUSES)).all()
+        except Exception as e:
+            db.session.rollback()
+            logger.error(f"Error reading active upload jobs for recovery: {e}")
+            return {'requeued': 0, 'failed': 0}
+
+        # Kunci semua spool mati sebelum memeriksa job, supaya proses lain yang
+        # sedang memulihkan tidak memakai spool yang sama
+        for name in os.listdir(upload_root) if os.path.isdir(upload_root) else []:
+            folder = os.path.join(upload_root, name)
+            if name.startswith(SPOOL_TMP_PREFIX):
+                # Sisa proses yang mati sebelum rename (belum berisi job)
+                handle = self._lock_dead_spool(folder)
+                if handle is not None:
+                    dead_spools[folder] = handle
+                continue
+            if not name.startswith(SPOOL_PREFIX) or folder == own_spool or not os.path.isdir(folder):
+                continue
+            handle = self._lock_dead_spool(folder)
+            if handle is None:
+                live_spools.add(folder)
+            else:
+                dead_spools[folder] = handle
+
+        try:
+            for upload_log in stale_logs:
+                file_path = upload_log.file_path
+                owner = os.path.dirname(os.path.abspath(file_path)) if file_path else None
+                if owner is None or owner == own_spool or owner in live_spools:
+                    continue
+                # Spool yang tidak terkunci/sudah dihapus atau UPLOAD_FOLDER sendiri (format lama)
+                if owner != upload_root and os.path.dirname(owner) != upload_root:
+                    continue
+
+                job = self._claim_job(upload_log, file_path)
+                if job is not None:
+                    requeued.append(job)
+                elif self.upload_service.mark_upload_failed(upload_log.upload_id, STALE_JOB_ERROR):
+                    failed += 1
+        finally:
+            for folder, handle in dead_spools.items():
+                shutil.rmtree(folder, ignore_errors=True)
+                handle.close()
+
+        if requeued:
+            self.start()
+            for job in requeued:
+                self._queue.put(job)
+        if requeued or failed:
+            logger.warning(f"Recovered stale upload jobs: {len(requeued)} requeued, {failed} marked failed")
+        return {'requeued': len(requeued), 'failed': failed}
+
+    def _claim_job(self, upload_log: UploadLog, file_path: str) -> Optional[Dict[str, Any]]:
+        """
+        Ambil alih job milik proses mati: pindahkan file ke spool ini dan set status queued
+
+        Update bersyarat (status masih aktif dan file_path belum berubah) memastikan
+        hanya satu proses yang mengambil alih job yang sama.
+
+        Returns:
+            Job untuk antrian, atau None jika file tidak ada atau job sudah diambil proses lain
+        """
+        if not os.path.exists(file_path):
+            return None
+
+        upload_id = upload_log.upload_id
+        user_id = upload_log.user_id
+        new_path = os.path.join(self._spool_folder, os.path.basename(file_path))
+        try:
+            claimed = UploadLog.query.filter(
+                UploadLog.upload_id == upload_id,
+                UploadLog.status.in_(ACTIVE_UPLOAD_STATUSES),
+                UploadLog.file_path == file_path
+            ).update({'file_path': new_path, 'status': 'queued', 'rows_processed': 0},
+                     synchronize_session=False)
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            logger.error(f"Error claiming stale upload job {upload_id}: {e}")
+            return None
+        if claimed != 1:
+            return None
+
+        try:
+            os.replace(file_path, new_path)
+        except OSError as e:
+            logger.error(f"Error moving file of stale upload job {upload_id}: {e}")
+            self.upload_service.mark_upload_failed(upload_id, STALE_JOB_ERROR)
+            return None
+        return {'job_id': upload_id, 'file_path': new_path, 'user_id': user_id}
+
+    def start(self):
+        """Jalankan worker thread (dipanggil otomatis saat job pertama di-submit)"""
+        with self._lock:
+            self._threads = [t for t in self._threads if t.is_alive()]
+            for i in range(len(self._threads), self.workers):
+                thread = threading.Thread(
+                    target=self._worker_loop,
+                    name=f"upload-worker-{i + 1}",
+                    daemon=True
+                )
+                thread.start()
+                self._threads.append(thread)
+
+    def submit(self, file_path: str, user_id: int, ip_address: Optional[str] = None,
+               user_agent: Optional[str] = None, filename: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Daftarkan job upload baru dan masukkan ke antrian
+
+        Args:
+            file_path: Path file yang sudah disimpan
+            user_id: ID user yang melakukan upload
+            ip_address: IP address client
+            user_agent: User agent client
+            filename: Nama file asli dari client untuk UploadLog (default: nama file_path)
+
+        Returns:
+            Dict dengan job_id (upload_id) dan status awal job
+        """
+        self.ensure_process()
+        try:
+            upload_log = UploadLog(
+                user_id=user_id,
+                filename=(filename or os.path.basename(file_path))[:255],
+                file_path=file_path,
+                file_size=os.path.getsize(file_path),
+                file_type=os.path.splitext(file_path)[1].lstrip('.').lower(),
+                upload_time=jakarta_now(),
+                status='queued',
+                ip_address=ip_address,
+                user_agent=user_agent
+            )
+            db.session.add(upload_log)
+            db.session.commit()
+
+        except Exception as e:
+            db.session.rollback()
+            logger.error(f"Error registering upload job: {e}")
+            return {
+                'success': False,
+                'error': str(e)
+            }
+
+        job_id = upload_log.upload_id
+        self.start()
+        self._queue.put({'job_id': job_id, 'file_path': file_path, 'user_id': user_id})
+        logger.info(f"Upload job {job_id} queued (queue size: {self._queue.qsize()})")
+
+        return {
+            'success': True,
+            'job_id': job_id,
+            'status': 'queued'
+        }
+
+    def drain(self, timeout: float, tick: Optional[Callable[[], None]] = None) -> bool:
+        """
+        Tunggu sampai semua job di antrian proses ini selesai (dipakai saat worker berhenti)
+
+        Job yang belum selesai saat timeout dipulihkan oleh proses lain setelah
+        proses ini mati (lihat recover_stale_jobs).
+
+        Args:
+            timeout: Batas waktu menunggu (detik)
+            tick: Dipanggil setiap detik selama menunggu (misal heartbeat worker gunicorn)
+
+        Returns:
+            True jika antrian kosong sebelum timeout
+        """
+        deadline = time.monotonic() + timeout
+        if self._queue.unfinished_tasks:
+            logger.info(f"Waiting up to {timeout:.0f}s for {self._queue.unfinished_tasks} upload jobs")
+        while self._queue.unfinished_tasks:
+            if time.monotonic() >= deadline:
+                logger.warning(f"Upload queue not drained: {self._queue.unfinished_tasks} jobs left "
+                               f"for recovery by the next worker")
+                return False
+            if tick is not None:
+                tick()
+            time.sleep(1)
+        return True
+
+    def get_status(self, job_id: int) -> Optional[Dict[str, Any]]:
+        """
+        Ambil status job dari UploadLog
+
+        Args:
+            job_id: upload_id dari job
+
+        Returns:
+            Dict status job, atau None jika job tidak ditemukan
+        """
+        upload_log = db.session.get(UploadLog, job_id)
+        if upload_log is None:
+            return None
+
+        status = upload_log.to_dict()
+        status['job_id'] = upload_log.upload_id
+        status['done'] = upload_log.status not in ACTIVE_UPLOAD_STATUSES
+        return status
+
+    def _worker_loop(self):
+        """Ambil job dari antrian dan proses satu per satu"""
+        while True:
+            job = self._queue.get()
+            try:
+                with self.app.app_context():
+                    self._run_job(self.upload_service, job)
+            except Exception as e:
+                logger.error(f"Unhandled error in upload job {job.get('job_id')}: {e}", exc_info=True)
+            finally:
+                self._queue.task_done()
+
+    def _run_job(self, upload_service: UploadService, job: Dict[str, Any]):
+        """Jalankan pipeline upload untuk satu job"""
+        job_id = job['job_id']
+        file_path = job['file_path']
+        logger.info(f"Upload job {job_id} started: {file_path}")
+
+        try:
+            result = upload_service.process_upload(file_path, job['user_id'], upload_id=job_id)
+            if not result.get('success'):
+                # Error sebelum pipeline berjalan (misal file tidak didukung) belum tercatat di log
+                upload_service.mark_upload_failed(job_id, result.get('error', 'Upload gagal'))
+            else:
+                self._refresh_snapshot(job_id)
+
+        except Exception as e:
+            db.session.rollback()
+            logger.error(f"Error in upload job {job_id}: {e}")
+            upload_service.mark_upload_failed(job_id, str(e))
+
+        finally:
+            db.session.remove()
+            if self.cleanup_file:
+                self.cleanup_file(file_path)
+
+        logger.info(f"Upload job {job_id} finished")
+
+    def _refresh_snapshot(self, job_id: int):
+        """Bangun ulang snapshot Parquet setelah upload sukses (gagal tidak mempengaruhi job)"""
+        try:
+            result = DatabaseQueryService().refresh_snapshot()
+            if not result.get('success'):
+                logger.info(f"Data snapshot not refreshed after upload job {job_id}: {result.get('error')}")
+        except Exception as e:
+            db.session.rollback()
+            logger.error(f"Error refreshing data snapshot after upload job {job_id}: {e}")
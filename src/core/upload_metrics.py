@@ -0,0 +1,116 @@
+"""
+Instrumentasi per langkah pipeline upload (waktu, jumlah baris, kenaikan puncak RSS)
+"""
+import sys
+import time
+import logging
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional
+
+from core.database import db, UploadStageMetric
+
+try:
+    import resource
+except ImportError:  # pragma: no cover - resource tidak ada di Windows
+    resource = None
+
+logger = logging.getLogger(__name__)
+
+
+def peak_rss_bytes() -> Optional[int]:
+    """Puncak RSS proses sejauh ini dalam bytes (None jika tidak tersedia)"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss dalam kilobytes di Linux, bytes di macOS
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+class StageMeasurement:
+    """Jumlah baris satu eksekusi langkah; rows_out diisi di dalam blok stage()"""
+
+    def __init__(self, rows_in: Optional[int] = None):
+        self.rows_in = rows_in
+        self.rows_out: Optional[int] = None
+
+
+class UploadStageRecorder:
+    """
+    Pencatat waktu, jumlah baris masuk/keluar dan kenaikan puncak RSS per langkah
+
+    Langkah yang sama dijalankan berulang (per chunk pada upload streaming)
+    digabung: waktu, baris dan kenaikan RSS dijumlahkan, calls menghitung eksekusi.
+    Kenaikan puncak RSS adalah selisih ru_maxrss proses sebelum dan sesudah
+    langkah, jadi hanya langkah yang menaikkan puncak memori yang bernilai > 0,
+    dan upload lain yang berjalan paralel di proses yang sama ikut terhitung.
+    """
+
+    def __init__(self):
+        self._stages: Dict[str, Dict[str, Any]] = {}
+
+    @contextmanager
+    def stage(self, name: str, rows_in: Optional[int] = None):
+        """
+        Ukur satu eksekusi langkah (juga dicatat jika blok berakhir dengan return/exception)
+
+        Args:
+            name: Nama langkah
+            rows_in: Jumlah baris yang masuk ke langkah
+
+        Yields:
+            StageMeasurement untuk mengisi rows_out
+        """
+        measurement = StageMeasurement(rows_in)
+        rss_before = peak_rss_bytes()
+        started = time.perf_counter()
+        try:
+            yield measurement
+        finally:
+            elapsed = time.perf_counter() - started
+            rss_after = peak_rss_bytes()
+            rss_delta = rss_after - rss_before if rss_before is not None and rss_after is not None else None
+            self._add(name, elapsed, measurement, rss_delta)
+
+    def _add(self, name: str, elapsed: float, measurement: StageMeasurement, rss_delta: Optional[int]):
+        """Gabungkan satu eksekusi ke total langkah"""
+        entry = self._stages.setdefault(name, {
+            'stage': name,
+            'stage_order': len(self._stages) + 1,
+            'calls': 0,
+            'wall_time_seconds': 0.0,
+            'rows_in': None,
+            'rows_out': None,
+            'peak_rss_delta_bytes': None
+        })
+        entry['calls'] += 1
+        entry['wall_time_seconds'] += elapsed
+        for key, value in (('rows_in', measurement.rows_in), ('rows_out', measurement.rows_out),
+                           ('peak_rss_delta_bytes', rss_delta)):
+            if value is not None:
+                entry[key] = (entry[key] or 0) + int(value)
+
+    def __str__(self) -> str:
+        """Ringkasan singkat untuk log: langkah:detik"""
+        return ' '.join(f"{entry['stage']}:{entry['wall_time_seconds']:.3f}" for entry in self._stages.values())
+
+    @property
+    def stages(self) -> List[Dict[str, Any]]:
+        """Total per langkah, urut sesuai eksekusi pertama"""
+        return [dict(entry, wall_time_seconds=round(entry['wall_time_seconds'], 6))
+                for entry in self._stages.values()]
+
+    def save(self, upload_id: int) -> int:
+        """
+        Tambahkan total per langkah ke session sebagai UploadStageMetric (tanpa commit)
+
+        Args:
+            upload_id: ID UploadLog upload
+
+        Returns:
+            Jumlah langkah yang disimpan
+        """
+        UploadStageMetric.query.filter_by(upload_id=upload_id).delete(synchronize_session=False)
+        stages = self.stages
+        for entry in stages:
+            db.session.add(UploadStageMetric(upload_id=upload_id, **entry))
+        return len(stages)
@@ -2,47 +2,87 @@
 Upload Service untuk mengelola proses upload file dengan alur yang terstruktur
 """
 import os
-import pandas as pd
-from typing import Dict, Any, Optional, Tuple
+import threading
+from contextlib import contextmanager, nullcontext
+from typing import Dict, Any, List, Optional, Tuple
 import logging
 from datetime import datetime
+from sqlalchemy import text
+from sqlalchemy.orm import selectinload
 
 from core.file_analyzer import FileAnalyzer
-from core.data_extractor import DataExtractor
+from core.data_extractor import DataExtractor, DEFAULT_CHUNK_SIZE
 from core.robust_data_extractor import RobustDataExtractor
-from core.dataframe_manager import DataFrameManager
+from core.upload_context import UploadContext
+from core.upload_metrics import UploadStageRecorder
 from core.duplicate_checker import DuplicateChecker
-from core.database import db, DataAnalytics, UploadLog
+from core.bulk_ingest import BulkIngestService
+from core.inacbg_pricing import INACBGPricingEngine, DEFAULT_PRICING_COLUMNS
+from core.inacbg_summary import InacbgSummaryService, SUMMARY_SOURCE_COLUMNS
+from core.database import db, UploadLog
+from core.stats_cache import stats_cache
 from utils.timezone_utils import jakarta_now
+from utils.log_utils import log_event
 
 logger = logging.getLogger(__name__)
 
+# File di atas ukuran ini diproses per chunk (streaming) supaya memori tetap terbatas
+STREAMING_THRESHOLD_BYTES = 20 * 1024 * 1024
+
+# Status UploadLog untuk upload yang masih antri atau sedang diproses
+ACTIVE_UPLOAD_STATUSES = ('queued', 'processing')
+
+# Key pg_advisory_xact_lock untuk bagian cek duplikasi SEP sampai commit insert.
+# Upload lain (thread atau proses lain) menunggu di sini, sehingga SEP yang baru
+# di-commit upload sebelumnya terlihat sebagai duplikat, bukan melanggar unique index.
+INGEST_LOCK_KEY = 4415601
+
+# Pengganti advisory lock untuk database selain PostgreSQL (hanya dalam satu proses)
+_ingest_thread_lock = threading.Lock()
+
 class UploadService:
-    """Service untuk mengelola proses upload file"""
+    """
+    Service untuk mengelola proses upload file
+    
+    Service ini stateless: state satu upload (DataFrame, job, waktu mulai) disimpan
+    di UploadContext, sehingga satu instance aman dipakai beberapa thread sekaligus.
+    """
     
     def __init__(self):
         self.file_analyzer = FileAnalyzer()
         self.data_extractor = DataExtractor()
         self.robust_extractor = RobustDataExtractor()
-        self.dataframe_manager = DataFrameManager()
         self.duplicate_checker = DuplicateChecker()
+        self.bulk_ingest = BulkIngestService()
+        self.pricing_engine = INACBGPricingEngine()
+        self.inacbg_summary = InacbgSummaryService()
+        self.chunk_size = DEFAULT_CHUNK_SIZE
     
-    def process_upload(self, file_path: str, user_id: int) -> Dict[str, Any]:
+    def process_upload(self, file_path: str, user_id: int, streaming: Optional[bool] = None,
+                       upload_id: Optional[int] = None) -> Dict[str, Any]:
         """
         Proses upload file dengan alur yang terstruktur
         
         Args:
             file_path: Path ke file yang akan diupload
             user_id: ID user yang melakukan upload
+            streaming: Proses file per chunk. None = otomatis untuk file
+                       berukuran >= STREAMING_THRESHOLD_BYTES
+            upload_id: ID UploadLog yang sudah dibuat (job upload). Progress tiap
+                       langkah ditulis ke log ini, bukan membuat log baru
             
         Returns:
             Dict dengan hasil upload
         """
+        context = UploadContext(file_path, user_id, upload_id=upload_id)
+        stages = context.stages
         try:
-            logger.info(f"Starting upload process for file: {file_path}")
+            logger.info("Starting upload process for file: %s", file_path)
+            self._report_progress(context)
             
             # Step 1: Analisa file
-            file_info = self.file_analyzer.analyze_file(file_path)
+            with stages.stage('analyze'):
+                file_info = self.file_analyzer.analyze_file(file_path)
             if not file_info.get('is_supported'):
                 return {
                     'success': False,
@@ -50,9 +90,17 @@ class UploadService:
                     'rows_success': 0,
                     'rows_failed': 0
                 }
+            context.file_info = file_info
+            
+            if streaming is None:
+                streaming = file_info.get('file_size', 0) >= STREAMING_THRESHOLD_BYTES
+            if streaming:
+                return self._process_upload_streaming(context)
             
             # Step 2: Ekstraksi data ke DataFrame
-            df, extraction_info = self.data_extractor.extract_data(file_path, file_info)
+            with stages.stage('extract') as stage:
+                df, extraction_info = self.data_extractor.extract_data(file_path, file_info)
+                stage.rows_out = 0 if df is None else len(df)
             if df is None or df.empty:
                 return {
                     'success': False,
@@ -61,13 +109,19 @@ class UploadService:
                     'rows_failed': 0
                 }
             
+            self._report_progress(context, rows_processed=len(df))
+            
             # Step 2.5: Konversi format tanggal (admission_date, discharge_date, birth_date)
             logger.info("Starting date conversion for uploaded data...")
-            df = self.robust_extractor.convert_date_columns(df)
+            with stages.stage('convert_dates', rows_in=len(df)) as stage:
+                df = self.robust_extractor.convert_date_columns(df)
+                stage.rows_out = len(df)
             logger.info("Date conversion completed")
             
-            # Step 3: Set DataFrame ke manager
-            df_info = self.dataframe_manager.set_dataframe(df)
+            # Step 3: Set DataFrame ke manager milik upload ini
+            with stages.stage('set_dataframe', rows_in=len(df)) as stage:
+                df_info = context.dataframe_manager.set_dataframe(df)
+                stage.rows_out = df_info.get('total_rows')
             if not df_info.get('success'):
                 return {
                     'success': False,
@@ -77,7 +131,9 @@ class UploadService:
                 }
             
             # Step 4: Validasi DataFrame
-            validation_result = self.dataframe_manager.validate_dataframe()
+            with stages.stage('validate', rows_in=len(df)) as stage:
+                validation_result = context.dataframe_manager.validate_dataframe()
+                stage.rows_out = len(df) if validation_result.get('is_valid') else 0
             if not validation_result.get('is_valid'):
                 return {
                     'success': False,
@@ -86,53 +142,64 @@ class UploadService:
                     'rows_failed': 0
                 }
             
-            # Step 5: Cek duplikasi
-            duplicate_result = self.duplicate_checker.check_duplicates(df)
-            if not duplicate_result.get('success'):
-                return {
-                    'success': False,
-                    'error': duplicate_result.get('error', 'Gagal mengecek duplikasi'),
-                    'rows_success': 0,
-                    'rows_failed': 0
-                }
-            
-            # Step 6: Pisahkan data valid dan duplikat
-            separation_result = self.dataframe_manager.separate_valid_duplicate_data(
-                self.duplicate_checker.get_existing_seps()
-            )
-            if not separation_result.get('success'):
-                return {
-                    'success': False,
-                    'error': separation_result.get('error', 'Gagal memisahkan data'),
-                    'rows_success': 0,
-                    'rows_failed': 0
-                }
-            
-            # Step 7: Apply INACBG pricing adjustments
-            pricing_result = self._apply_inacbg_pricing_adjustments()
-            if not pricing_result.get('success'):
-                return {
-                    'success': False,
-                    'error': pricing_result.get('error', 'Gagal menerapkan penyesuaian harga'),
-                    'rows_success': 0,
-                    'rows_failed': 0
-                }
-            
-            # Step 8: Upload data valid ke database
-            upload_result = self._upload_valid_data(user_id, file_path)
+            # Step 5-8: Cek duplikasi sampai commit insert, bergantian dengan upload lain
+            with self._ingest_lock(stages):
+                # Step 5: Cek duplikasi
+                with stages.stage('check_duplicates', rows_in=len(df)) as stage:
+                    duplicate_result = self.duplicate_checker.check_duplicates(df)
+                    stage.rows_out = duplicate_result.get('new_rows')
+                if not duplicate_result.get('success'):
+                    return {
+                        'success': False,
+                        'error': duplicate_result.get('error', 'Gagal mengecek duplikasi'),
+                        'rows_success': 0,
+                        'rows_failed': 0
+                    }
+                
+                # Step 6: Pisahkan data valid dan duplikat
+                with stages.stage('separate', rows_in=len(df)) as stage:
+                    separation_result = context.dataframe_manager.separate_valid_duplicate_data(
+                        duplicate_result['existing_seps']
+                    )
+                    stage.rows_out = separation_result.get('valid_rows')
+                if not separation_result.get('success'):
+                    return {
+                        'success': False,
+                        'error': separation_result.get('error', 'Gagal memisahkan data'),
+                        'rows_success': 0,
+                        'rows_failed': 0
+                    }
+                
+                # Step 7: Apply INACBG pricing adjustments
+                with stages.stage('pricing', rows_in=separation_result['valid_rows']) as stage:
+                    pricing_result = self._apply_inacbg_pricing_adjustments(context)
+                    stage.rows_out = separation_result['valid_rows']
+                if not pricing_result.get('success'):
+                    return {
+                        'success': False,
+                        'error': pricing_result.get('error', 'Gagal menerapkan penyesuaian harga'),
+                        'rows_success': 0,
+                        'rows_failed': 0
+                    }
+                
+                # Step 8: Upload data valid ke database
+                with stages.stage('insert', rows_in=separation_result['valid_rows']) as stage:
+                    upload_result = self._upload_valid_data(context)
+                    stage.rows_out = upload_result.get('inserted_rows', 0)
             
             # Step 9: Log upload ke database
-            log_result = self._log_upload(
-                user_id, 
-                file_path, 
-                separation_result['valid_rows'],
-                separation_result['duplicate_rows'],
-                upload_result.get('success', False),
-                upload_result.get('error')
-            )
+            with stages.stage('log'):
+                log_result = self._log_upload(
+                    context,
+                    separation_result['valid_rows'],
+                    separation_result['duplicate_rows'],
+                    upload_result.get('success', False),
+                    upload_result.get('error')
+                )
             
             # Step 10: Clear DataFrame
-            self.dataframe_manager.clear_dataframe()
+            with stages.stage('clear'):
+                context.clear()
             
             # Prepare final result
             final_result = {
@@ -147,13 +214,18 @@ class UploadService:
                 'duplicate_result': duplicate_result,
                 'pricing_result': pricing_result,
                 'upload_result': upload_result,
-                'log_result': log_result
+                'log_result': log_result,
+                'stages': stages.stages
             }
             
-            logger.info(f"Upload process completed: {final_result}")
+            log_event(logger, 'upload_completed', file=file_info.get('filename'),
+                      success=final_result['success'], rows=final_result['total_rows'],
+                      rows_success=final_result['rows_success'], rows_failed=final_result['rows_failed'],
+                      stages=stages)
             return final_result
             
         except Exception as e:
+            context.clear()
             logger.error(f"Error in upload process: {e}")
             return {
                 'success': False,
@@ -161,83 +233,200 @@ class UploadService:
                 'rows_success': 0,
                 'rows_failed': 0
             }
+        
+        finally:
+            # Waktu per langkah disimpan juga untuk upload yang gagal (jika sudah ada UploadLog)
+            self._save_stage_metrics(context)
     
-    def _apply_inacbg_pricing_adjustments(self) -> Dict[str, Any]:
+    def _process_upload_streaming(self, context: UploadContext) -> Dict[str, Any]:
         """
-        Menerapkan penyesuaian harga berdasarkan digit ke-4 INACBG
+        Proses upload per chunk: setiap chunk melewati konversi tanggal, validasi,
+        cek duplikasi, penyesuaian harga dan insert massal. Semua chunk dimasukkan
+        dalam satu transaksi sehingga upload tetap all-or-nothing.
+        
+        Args:
+            context: Context upload (file_info sudah diisi)
+            
+        Returns:
+            Dict dengan hasil upload
+        """
+        file_path = context.file_path
+        file_info = context.file_info
+        manager = context.dataframe_manager
+        totals = {'total_rows': 0, 'valid_rows': 0, 'duplicate_rows': 0}
+        pricing_result = {
+            'success': True,
+            'adjusted_rows': 0,
+            'digit_0_count': 0,
+            'digit_i_ii_iii_count': 0,
+            'other_count': 0
+        }
+        batches = []
+        chunk_count = 0
+        stages = context.stages
+        
+        try:
+            logger.info("Starting streaming upload (chunk size %s) for file: %s", self.chunk_size, file_path)
+            
+            # Semua chunk satu transaksi, jadi cek duplikasi sampai commit dijalankan bergantian dengan upload lain
+            with self._ingest_lock(stages):
+                chunks = self.data_extractor.iter_chunks(file_path, file_info, self.chunk_size)
+                while True:
+                    with stages.stage('extract') as stage:
+                        chunk = next(chunks, None)
+                        stage.rows_out = 0 if chunk is None else len(chunk)
+                    if chunk is None:
+                        break
+                    chunk_count += 1
+                    chunk_rows = len(chunk)
+                    
+                    # Konversi tanggal, set dan validasi chunk
+                    with stages.stage('convert_dates', rows_in=chunk_rows) as stage:
+                        chunk = self.robust_extractor.convert_date_columns(chunk)
+                        stage.rows_out = len(chunk)
+                    
+                    with stages.stage('set_dataframe', rows_in=chunk_rows) as stage:
+                        df_info = manager.set_dataframe(chunk)
+                        stage.rows_out = df_info.get('total_rows')
+                    if not df_info.get('success'):
+                        raise ValueError(df_info.get('error', 'Gagal mengatur DataFrame'))
+                    
+                    with stages.stage('validate', rows_in=chunk_rows) as stage:
+                        validation_result = manager.validate_dataframe()
+                        stage.rows_out = chunk_rows if validation_result.get('is_valid') else 0
+                    if not validation_result.get('is_valid'):
+                        errors = validation_result.get('errors') or [validation_result.get('error', 'Validasi gagal')]
+                        raise ValueError(f"Chunk {chunk_count}: {'; '.join(errors)}")
+                    
+                    # Cek duplikasi (termasuk baris dari chunk sebelumnya di transaksi yang sama)
+                    with stages.stage('check_duplicates', rows_in=chunk_rows) as stage:
+                        duplicate_result = self.duplicate_checker.check_duplicates(chunk)
+                        stage.rows_out = duplicate_result.get('new_rows')
+                    if not duplicate_result.get('success'):
+                        raise ValueError(duplicate_result.get('error', 'Gagal mengecek duplikasi'))
+                    
+                    with stages.stage('separate', rows_in=chunk_rows) as stage:
+                        separation_result = manager.separate_valid_duplicate_data(
+                            duplicate_result['existing_seps']
+                        )
+                        stage.rows_out = separation_result.get('valid_rows')
+                    if not separation_result.get('success'):
+                        raise ValueError(separation_result.get('error', 'Gagal memisahkan data'))
+                    
+                    with stages.stage('pricing', rows_in=separation_result['valid_rows']) as stage:
+                        chunk_pricing = self._apply_inacbg_pricing_adjustments(context)
+                        stage.rows_out = separation_result['valid_rows']
+                    if not chunk_pricing.get('success'):
+                        raise ValueError(chunk_pricing.get('error', 'Gagal menerapkan penyesuaian harga'))
+                    
+                    with stages.stage('insert', rows_in=separation_result['valid_rows']) as stage:
+                        upload_result = self._upload_valid_data(context, commit=False)
+                        stage.rows_out = upload_result.get('inserted_rows', 0)
+                    if not upload_result.get('success'):
+                        raise ValueError(upload_result.get('error', 'Gagal mengupload data'))
+                    
+                    for key in totals:
+                        totals[key] += separation_result[key]
+                    for key in ('adjusted_rows', 'digit_0_count', 'digit_i_ii_iii_count', 'other_count'):
+                        pricing_result[key] += chunk_pricing.get(key, 0)
+                    batches.extend(upload_result.get('batches', []))
+                    
+                    with stages.stage('clear'):
+                        manager.clear_dataframe()
+                    self._report_progress(context, rows_processed=totals['total_rows'])
+                    logger.info("Chunk %s processed: %s valid, %s duplicates", chunk_count,
+                                separation_result['valid_rows'], separation_result['duplicate_rows'])
+                
+                if chunk_count == 0:
+                    return {
+                        'success': False,
+                        'error': 'File berhasil dibaca tetapi tidak ada data yang ditemukan. Pastikan file memiliki baris data selain header.',
+                        'rows_success': 0,
+                        'rows_failed': 0
+                    }
+                
+                with stages.stage('commit', rows_in=totals['valid_rows']):
+                    db.session.commit()
+            
+        except Exception as e:
+            db.session.rollback()
+            context.clear()
+            logger.error(f"Error in streaming upload process: {e}")
+            self._log_upload(context, 0, totals['total_rows'], False, str(e))
+            return {
+                'success': False,
+                'error': str(e),
+                'rows_success': 0,
+                'rows_failed': 0
+            }
+        
+        upload_result = {
+            'success': True,
+            'inserted_rows': totals['valid_rows'],
+            'batches': batches,
+            'message': f"Berhasil mengupload {totals['valid_rows']} baris data"
+        }
+        with stages.stage('log'):
+            log_result = self._log_upload(context, totals['valid_rows'], totals['duplicate_rows'], True)
+        
+        final_result = {
+            'success': True,
+            'rows_success': totals['valid_rows'],
+            'rows_failed': totals['duplicate_rows'],
+            'total_rows': totals['total_rows'],
+            'message': self._generate_message(totals, upload_result, pricing_result),
+            'file_info': file_info,
+            'extraction_info': {
+                'success': True,
+                'extraction_method': 'streaming',
+                'chunks': chunk_count,
+                'chunk_size': self.chunk_size,
+                'rows_extracted': totals['total_rows']
+            },
+            'pricing_result': pricing_result,
+            'upload_result': upload_result,
+            'log_result': log_result,
+            'stages': stages.stages
+        }
+        
+        log_event(logger, 'streaming_upload_completed', file=file_info.get('filename'),
+                  rows=totals['total_rows'], rows_success=totals['valid_rows'],
+                  rows_failed=totals['duplicate_rows'], chunks=chunk_count, stages=stages)
+        return final_result
+    
+    def _apply_inacbg_pricing_adjustments(self, context: UploadContext) -> Dict[str, Any]:
+        """
+        Menerapkan penyesuaian harga berdasarkan severity level (digit ke-4) INACBG
+        
+        Args:
+            context: Context upload dengan data valid hasil pemisahan duplikat
         
         Returns:
             Dict dengan hasil penyesuaian harga
         """
         try:
-            valid_data = self.dataframe_manager.get_valid_data()
+            manager = context.dataframe_manager
             
-            if valid_data is None or valid_data.empty:
+            if manager.valid_rows == 0:
                 return {
                     'success': True,
                     'message': 'Tidak ada data untuk disesuaikan',
                     'adjusted_rows': 0
                 }
             
-            # Kolom yang akan disesuaikan
-            pricing_columns = [
-                'TOTAL_TARIF', 'TARIF_RS', 'SELISIH', 
-                'PENUNJANG', 'RADIOLOGI', 'LABORATORIUM'
-            ]
+            # Penyesuaian harga tervektorisasi hanya pada kolom INACBG + kolom harga baris valid
+            pricing_data = manager.get_valid_columns(['INACBG'] + DEFAULT_PRICING_COLUMNS)
+            pricing_data, pricing_stats = self.pricing_engine.apply(pricing_data, DEFAULT_PRICING_COLUMNS)
+            adjusted_rows = pricing_stats['adjusted_rows']
+            digit_0_count = pricing_stats['digit_0_count']
+            digit_i_ii_iii_count = pricing_stats['digit_i_ii_iii_count']
+            other_count = pricing_stats['other_count']
             
-            adjusted_rows = 0
-            digit_0_count = 0
-            digit_i_ii_iii_count = 0
-            other_count = 0
+            # Tulis kolom harga yang sudah disesuaikan kembali ke DataFrame upload
+            manager.set_valid_columns(pricing_data[pricing_stats['adjusted_columns']])
             
-            # Iterasi setiap baris data
-            for index, row in valid_data.iterrows():
-                inacbg_value = str(row.get('INACBG', ''))
-                
-                # Cek apakah INACBG memiliki minimal 4 digit
-                if len(inacbg_value) >= 4:
-                    digit_4 = inacbg_value[3]  # Digit ke-4 (index 3)
-                    
-                    # Terapkan penyesuaian berdasarkan digit ke-4
-                    if digit_4 == '0':
-                        # Digit ke-4 = 0, kalikan dengan 79%
-                        for col in pricing_columns:
-                            if col in valid_data.columns and pd.notna(row[col]):
-                                try:
-                                    original_value = float(row[col])
-                                    adjusted_value = original_value * 0.79
-                                    valid_data.at[index, col] = adjusted_value
-                                except (ValueError, TypeError):
-                                    continue
-                        digit_0_count += 1
-                        
-                    elif digit_4 in ['I', 'II', 'III']:
-                        # Digit ke-4 = I/II/III, kalikan dengan 73%
-                        for col in pricing_columns:
-                            if col in valid_data.columns and pd.notna(row[col]):
-                                try:
-                                    original_value = float(row[col])
-                                    adjusted_value = original_value * 0.73
-                                    valid_data.at[index, col] = adjusted_value
-                                except (ValueError, TypeError):
-                                    continue
-                        digit_i_ii_iii_count += 1
-                    else:
-                        # Digit ke-4 lainnya, tidak ada penyesuaian
-                        other_count += 1
-                else:
-                    # INACBG kurang dari 4 digit, tidak ada penyesuaian
-                    other_count += 1
-                
-                adjusted_rows += 1
-            
-            # Update DataFrame dengan data yang sudah disesuaikan
-            self.dataframe_manager.set_valid_data(valid_data)
-            
-            logger.info(f"INACBG pricing adjustments applied: {adjusted_rows} rows processed")
-            logger.info(f"Digit 4 = '0': {digit_0_count} rows (79% adjustment)")
-            logger.info(f"Digit 4 = 'I/II/III': {digit_i_ii_iii_count} rows (73% adjustment)")
-            logger.info(f"Other cases: {other_count} rows (no adjustment)")
+            log_event(logger, 'inacbg_pricing_applied', rows=adjusted_rows, digit_0=digit_0_count,
+                      digit_i_ii_iii=digit_i_ii_iii_count, other=other_count)
             
             return {
                 'success': True,
@@ -256,79 +445,68 @@ class UploadService:
                 'adjusted_rows': 0
             }
     
-    def _upload_valid_data(self, user_id: int, file_path: str) -> Dict[str, Any]:
+    def _upload_valid_data(self, context: UploadContext, commit: bool = True) -> Dict[str, Any]:
         """
         Upload data valid ke database
         
         Args:
-            user_id: ID user
-            file_path: Path file
+            context: Context upload dengan data valid yang sudah disesuaikan
+            commit: Commit setelah insert (False untuk chunk dalam mode streaming)
             
         Returns:
             Dict dengan hasil upload
         """
-        try:
-            valid_data = self.dataframe_manager.get_valid_data()
-            
-            if valid_data is None or valid_data.empty:
-                return {
-                    'success': True,
-                    'inserted_rows': 0,
-                    'message': 'Tidak ada data valid untuk diupload'
-                }
-            
-            # Convert DataFrame to list of dictionaries
-            data_list = valid_data.to_dict('records')
-            
-            # Insert data to database
-            inserted_count = 0
-            errors = []
-            
-            for row_data in data_list:
-                try:
-                    # Map column names from uppercase to lowercase for database
-                    mapped_data = self._map_column_names(row_data)
-                    
-                    # Add uploader_id to mark who first uploaded this row
-                    mapped_data['uploader_id'] = user_id
-                    
-                    # Create DataAnalytics object
-                    data_analytics = DataAnalytics(**mapped_data)
-                    db.session.add(data_analytics)
-                    inserted_count += 1
-                except Exception as e:
-                    errors.append(f"Row error: {str(e)}")
-                    logger.warning(f"Error inserting row: {e}")
-            
-            # Commit transaction
-            if inserted_count > 0:
-                db.session.commit()
-                logger.info(f"Successfully inserted {inserted_count} rows to database")
-            
+        manager = context.dataframe_manager
+        
+        if manager.valid_rows == 0:
             return {
                 'success': True,
-                'inserted_rows': inserted_count,
-                'errors': errors,
-                'message': f'Berhasil mengupload {inserted_count} baris data'
+                'inserted_rows': 0,
+                'message': 'Tidak ada data valid untuk diupload'
             }
-            
-        except Exception as e:
+        
+        # Insert massal dalam satu transaksi (COPY untuk PostgreSQL); baris duplikat
+        # difilter per batch dengan mask sehingga data valid tidak disalin utuh
+        frame, valid_mask = manager.get_valid_frame()
+        ingest_result = self.bulk_ingest.ingest(frame, context.user_id, commit=False, row_mask=valid_mask)
+        
+        if not ingest_result.get('success'):
+            return {
+                'success': False,
+                'error': ingest_result.get('error'),
+                'inserted_rows': 0
+            }
+        
+        # Ringkasan INACBG diupdate di transaksi yang sama dengan insert data
+        summary_result = self.inacbg_summary.apply_frame(manager.get_valid_columns(SUMMARY_SOURCE_COLUMNS))
+        if not summary_result.get('success'):
             db.session.rollback()
-            logger.error(f"Error uploading valid data: {e}")
             return {
                 'success': False,
-                'error': str(e),
+                'error': summary_result.get('error'),
                 'inserted_rows': 0
             }
+        
+        if commit:
+            db.session.commit()
+        
+        inserted_count = ingest_result['inserted_rows']
+        return {
+            'success': True,
+            'inserted_rows': inserted_count,
+            'batches': ingest_result['batches'],
+            'method': ingest_result['method'],
+            'errors': ingest_result['errors'],
+            'message': f'Berhasil mengupload {inserted_count} baris data'
+        }
     
-    def _log_upload(self, user_id: int, file_path: str, rows_success: int, 
-                   rows_failed: int, upload_success: bool, error_message: str = None) -> Dict[str, Any]:
+    def _log_upload(self, context: UploadContext, rows_success: int, rows_failed: int,
+                    upload_success: bool, error_message: str = None) -> Dict[str, Any]:
         """
         Log upload ke database
         
         Args:
-            user_id: ID user
-            file_path: Path file
+            context: Context upload; UploadLog job (upload_id) diupdate jika ada
             rows_success: Jumlah baris berhasil
             rows_failed: Jumlah baris gagal
             upload_success: Status upload
@@ -338,23 +516,31 @@ class UploadService:
             Dict dengan hasil logging
         """
         try:
-            upload_log = UploadLog(
-                user_id=user_id,
-                filename=os.path.basename(file_path),
-                file_path=file_path,
-                file_size=os.path.getsize(file_path),
-                rows_processed=rows_success + rows_failed,
-                rows_success=rows_success,
-                rows_failed=rows_failed,
-                upload_time=jakarta_now(),
-                status='success' if upload_success else 'failed',
-                error_message=error_message
-            )
+            upload_log = db.session.get(UploadLog, context.upload_id) if context.upload_id else None
+            if upload_log is None:
+                upload_log = UploadLog(
+                    user_id=context.user_id,
+                    filename=os.path.basename(context.file_path),
+                    file_path=context.file_path,
+                    file_size=os.path.getsize(context.file_path),
+                    upload_time=jakarta_now()
+                )
+                db.session.add(upload_log)
+            
+            upload_log.rows_processed = rows_success + rows_failed
+            upload_log.rows_success = rows_success
+            upload_log.rows_failed = rows_failed
+            upload_log.status = 'success' if upload_success else 'failed'
+            upload_log.error_message = error_message
+            upload_log.processing_time_seconds = context.elapsed_seconds
             
-            db.session.add(upload_log)
             db.session.commit()
+            context.log_id = upload_log.upload_id
+            
+            # Data dan upload_logs berubah, statistik dihitung ulang pada request berikutnya
+            stats_cache.invalidate()
             
-            logger.info(f"Upload logged: {rows_success} success, {rows_failed} failed")
+            logger.info("Upload logged: %s success, %s failed", rows_success, rows_failed)
             return {
                 'success': True,
                 'log_id': upload_log.upload_id
@@ -368,107 +554,155 @@ class UploadService:
                 'error': str(e)
             }
     
-    def _map_column_names(self, row_data: Dict[str, Any]) -> Dict[str, Any]:
+    def _save_stage_metrics(self, context: UploadContext) -> bool:
+        """
+        Simpan waktu, jumlah baris dan kenaikan puncak RSS per langkah ke upload_stage_metrics
+        
+        processing_time_seconds di UploadLog diupdate sekalian supaya mencakup
+        langkah log. Upload tanpa UploadLog (error sebelum log ditulis pada upload
+        sinkron) tidak disimpan.
+        
+        Args:
+            context: Context upload
+            
+        Returns:
+            True jika metrik tersimpan
+        """
+        if context.log_id is None or not context.stages.stages:
+            return False
+        
+        try:
+            saved = context.stages.save(context.log_id)
+            UploadLog.query.filter_by(upload_id=context.log_id).update(
+                {'processing_time_seconds': context.elapsed_seconds}, synchronize_session=False
+            )
+            db.session.commit()
+            logger.debug("Upload %s: %s stage metrics saved", context.log_id, saved)
+            return True
+            
+        except Exception as e:
+            # Metrik hanya informasi, kegagalan simpan tidak mengubah hasil upload
+            db.session.rollback()
+            logger.warning(f"Could not save stage metrics for upload {context.log_id}: {e}")
+            return False
+    
+    def get_stage_metrics(self, upload_id: Optional[int] = None, limit: int = 20) -> List[Dict[str, Any]]:
         """
-        Map column names from uppercase (file) to lowercase (database)
+        Ambil UploadLog beserta metrik per langkahnya
         
         Args:
-            row_data: Dictionary with uppercase column names
+            upload_id: ID UploadLog; None untuk upload terbaru yang punya metrik
+            limit: Jumlah upload maksimal jika upload_id None
             
         Returns:
-            Dictionary with lowercase column names
+            List dict upload (UploadLog.to_dict) dengan key stages, terbaru dulu
+        """
+        query = UploadLog.query.options(selectinload(UploadLog.stage_metrics))
+        if upload_id is not None:
+            query = query.filter(UploadLog.upload_id == upload_id)
+        else:
+            query = query.filter(UploadLog.stage_metrics.any()).order_by(UploadLog.upload_id.desc()).limit(limit)
+        
+        results = []
+        for upload_log in query.all():
+            result = upload_log.to_dict()
+            result['stages'] = [stage.to_dict() for stage in upload_log.stage_metrics]
+            results.append(result)
+        return results
+    
+    def _report_progress(self, context: UploadContext, status: str = 'processing',
+                         rows_processed: Optional[int] = None):
         """
-        column_mapping = {
-            'KODE_RS': 'kode_rs',
-            'KELAS_RS': 'kelas_rs',
-            'KELAS_RAWAT': 'kelas_rawat',
-            'KODE_TARIF': 'kode_tarif',
-            'PTD': 'ptd',
-            'ADMISSION_DATE': 'admission_date',
-            'DISCHARGE_DATE': 'discharge_date',
-            'BIRTH_DATE': 'birth_date',
-            'BIRTH_WEIGHT': 'birth_weight',
-            'SEX': 'sex',
-            'DISCHARGE_STATUS': 'discharge_status',
-            'DIAGLIST': 'diaglist',
-            'PROCLIST': 'proclist',
-            'ADL1': 'adl1',
-            'ADL2': 'adl2',
-            'IN_SP': 'in_sp',
-            'IN_SR': 'in_sr',
-            'IN_SI': 'in_si',
-            'IN_SD': 'in_sd',
-            'INACBG': 'inacbg',
-            'SUBACUTE': 'subacute',
-            'CHRONIC': 'chronic',
-            'SP': 'sp',
-            'SR': 'sr',
-            'SI': 'si',
-            'SD': 'sd',
-            'DESKRIPSI_INACBG': 'deskripsi_inacbg',
-            'TARIF_INACBG': 'tarif_inacbg',
-            'TARIF_SUBACUTE': 'tarif_subacute',
-            'TARIF_CHRONIC': 'tarif_chronic',
-            'DESKRIPSI_SP': 'deskripsi_sp',
-            'TARIF_SP': 'tarif_sp',
-            'DESKRIPSI_SR': 'deskripsi_sr',
-            'TARIF_SR': 'tarif_sr',
-            'DESKRIPSI_SI': 'deskripsi_si',
-            'TARIF_SI': 'tarif_si',
-            'DESKRIPSI_SD': 'deskripsi_sd',
-            'TARIF_SD': 'tarif_sd',
-            'TOTAL_TARIF': 'total_tarif',
-            'TARIF_RS': 'tarif_rs',
-            'TARIF_POLI_EKS': 'tarif_poli_eks',
-            'LOS': 'los',
-            'ICU_INDIKATOR': 'icu_indikator',
-            'ICU_LOS': 'icu_los',
-            'VENT_HOUR': 'vent_hour',
-            'NAMA_PASIEN': 'nama_pasien',
-            'MRN': 'mrn',
-            'UMUR_TAHUN': 'umur_tahun',
-            'UMUR_HARI': 'umur_hari',
-            'DPJP': 'dpjp',
-            'SEP': 'sep',
-            'NOKARTU': 'nokartu',
-            'PAYOR_ID': 'payor_id',
-            'CODER_ID': 'coder_id',
-            'VERSI_INACBG': 'versi_inacbg',
-            'VERSI_GROUPER': 'versi_grouper',
-            'C1': 'c1',
-            'C2': 'c2',
-            'C3': 'c3',
-            'C4': 'c4',
-            'PROSEDUR_NON_BEDAH': 'prosedur_non_bedah',
-            'PROSEDUR_BEDAH': 'prosedur_bedah',
-            'KONSULTASI': 'konsultasi',
-            'TENAGA_AHLI': 'tenaga_ahli',
-            'KEPERAWATAN': 'keperawatan',
-            'PENUNJANG': 'penunjang',
-            'RADIOLOGI': 'radiologi',
-            'LABORATORIUM': 'laboratorium',
-            'PELAYANAN_DARAH': 'pelayanan_darah',
-            'REHABILITASI': 'rehabilitasi',
-            'KAMAR_AKOMODASI': 'kamar_akomodasi',
-            'RAWAT_INTENSIF': 'rawat_intensif',
-            'OBAT': 'obat',
-            'ALKES': 'alkes',
-            'BMHP': 'bmhp',
-            'SEWA_ALAT': 'sewa_alat',
-            'OBAT_KRONIS': 'obat_kronis',
-            'OBAT_KEMO': 'obat_kemo'
+        Tulis progress job upload ke UploadLog
+        
+        Update dijalankan di koneksi terpisah dan langsung di-commit supaya
+        terlihat oleh endpoint status selama transaksi upload masih berjalan.
+        
+        Args:
+            context: Context upload (tanpa upload_id = upload sinkron, tidak ada progress)
+            status: Status job
+            rows_processed: Jumlah baris yang sudah diproses
+        """
+        upload_id = context.upload_id
+        if upload_id is None:
+            return
+        
+        values = {
+            'status': status,
+            'processing_time_seconds': context.elapsed_seconds
         }
+        if rows_processed is not None:
+            values['rows_processed'] = rows_processed
         
-        mapped_data = {}
-        for key, value in row_data.items():
-            if key in column_mapping:
-                mapped_data[column_mapping[key]] = value
-            else:
-                # If no mapping found, use lowercase version
-                mapped_data[key.lower()] = value
+        try:
+            with db.engine.begin() as connection:
+                connection.execute(
+                    UploadLog.__table__.update()
+                    .where(UploadLog.__table__.c.upload_id == upload_id)
+                    .values(**values)
+                )
+        except Exception as e:
+            # Progress hanya informasi, kegagalan update tidak menghentikan upload
+            logger.warning(f"Could not update progress for upload {upload_id}: {e}")
+    
+    @contextmanager
+    def _ingest_lock(self, stages: Optional[UploadStageRecorder] = None):
+        """
+        Jalankan cek duplikasi SEP sampai commit insert bergantian antar upload
         
-        return mapped_data
-
+        Di PostgreSQL memakai pg_advisory_xact_lock (berlaku antar thread dan antar
+        proses worker) yang dilepas otomatis saat transaksi commit/rollback.
+        Database lain memakai lock thread dalam proses.
+        
+        Args:
+            stages: Pencatat langkah upload; waktu tunggu lock dicatat sebagai 'lock_wait'
+        """
+        wait = stages.stage('lock_wait') if stages is not None else nullcontext()
+        
+        if db.session.get_bind().dialect.name != 'postgresql':
+            with wait:
+                _ingest_thread_lock.acquire()
+            try:
+                yield
+            finally:
+                _ingest_thread_lock.release()
+            return
+        
+        with wait:
+            db.session.execute(text('SELECT pg_advisory_xact_lock(:key)'), {'key': INGEST_LOCK_KEY})
+        try:
+            yield
+        finally:
+            # Jalur gagal/tanpa data tidak commit; akhiri transaksi agar lock dilepas
+            if db.session.in_transaction():
+                db.session.rollback()
+    
+    def mark_upload_failed(self, upload_id: int, error_message: str) -> bool:
+        """
+        Tandai job upload gagal jika log-nya masih berstatus aktif
+        
+        Args:
+            upload_id: ID UploadLog job upload
+            error_message: Pesan error
+            
+        Returns:
+            True jika status log diubah
+        """
+        try:
+            upload_log = db.session.get(UploadLog, upload_id)
+            if upload_log is None or upload_log.status not in ACTIVE_UPLOAD_STATUSES:
+                return False
+            
+            upload_log.status = 'failed'
+            upload_log.error_message = error_message
+            db.session.commit()
+            return True
+            
+        except Exception as e:
+            db.session.rollback()
+            logger.error(f"Error marking upload {upload_id} as failed: {e}")
+            return False
+    
     def _generate_message(self, separation_result: Dict[str, Any], upload_result: Dict[str, Any], pricing_result: Dict[str, Any] = None) -> str:
         """Generate pesan berdasarkan hasil upload"""
         valid_rows = separation_result.get('valid_rows', 0)
@@ -5,7 +5,7 @@ import pandas as pd
 from typing import List, Dict, Any
 
 from core.base_handler import BaseHandler
-from utils.formatters import format_rupiah
+from core.derived_metrics import DerivedMetric, SELISIH_TARIF, PERSENTASE_SELISIH, TARIF_PER_HARI
 from utils.data_processing import safe_numeric_conversion
 
 
@@ -23,10 +23,22 @@ class FinancialHandler(BaseHandler):
             'KAMAR_AKOMODASI', 'OBAT'
         ]
     
+    def _get_currency_columns(self) -> List[str]:
+        """Get numeric columns rendered as Rupiah"""
+        return ['TOTAL_TARIF', 'TARIF_RS', 'SELISIH_TARIF', 'TARIF_PER_HARI']
+    
+    def _get_derived_metrics(self) -> List[DerivedMetric]:
+        """Get derived financial metrics"""
+        return [SELISIH_TARIF, PERSENTASE_SELISIH, TARIF_PER_HARI]
+    
     def _get_view_name(self) -> str:
         """Get the view name for this handler"""
         return "financial"
     
+    def _get_query_view(self) -> str:
+        """Get the DatabaseQueryService view name for paginated queries"""
+        return "financial"
+    
     def _query_database(self, filters: Dict[str, Any]) -> pd.DataFrame:
         """Query financial data from database"""
         return self.db_query_service.get_financial_data(filters)
@@ -42,24 +54,5 @@ class FinancialHandler(BaseHandler):
             if col in df.columns:
                 df[col] = safe_numeric_conversion(df[col])
         
-        # Calculate additional financial metrics
-        if 'TOTAL_TARIF' in df.columns and 'TARIF_RS' in df.columns:
-            df['SELISIH_TARIF'] = df['TOTAL_TARIF'] - df['TARIF_RS']
-            df['PERSENTASE_SELISIH'] = (df['SELISIH_TARIF'] / df['TARIF_RS'] * 100).round(2)
-        
-        if 'TOTAL_TARIF' in df.columns and 'LOS' in df.columns:
-            df['TARIF_PER_HARI'] = (df['TOTAL_TARIF'] / df['LOS']).round(2)
-        
-        # Format currency columns
-        currency_columns = ['TOTAL_TARIF', 'TARIF_RS', 'SELISIH_TARIF', 'TARIF_PER_HARI']
-        for col in currency_columns:
-            if col in df.columns:
-                df[f'{col}_FORMATTED'] = df[col].apply(format_rupiah)
-        
-        # Remove duplicate numeric columns, keep only formatted versions
-        columns_to_remove = ['TOTAL_TARIF', 'TARIF_RS', 'SELISIH_TARIF', 'TARIF_PER_HARI']
-        for col in columns_to_remove:
-            if col in df.columns:
-                df = df.drop(columns=[col])
-        
-        return df
+        # Calculate additional financial metrics (already selected in SQL for paginated queries)
+        return self._apply_derived_metrics(df)
@@ -5,10 +5,18 @@ import pandas as pd
 from typing import List, Dict, Any
 
 from core.base_handler import BaseHandler
-from utils.formatters import format_rupiah
+from core.derived_metrics import DerivedMetric, TARIF_PER_HARI, col, metric, rounded
 from utils.data_processing import safe_numeric_conversion
 
 
+# Tarif per hari rawat (pembagian dengan LOS 0 menghasilkan NULL)
+LOS_METRICS = [
+    TARIF_PER_HARI,
+    DerivedMetric('TARIF_RS_PER_HARI', rounded(col('TARIF_RS') / col('LOS'))),
+    DerivedMetric('SELISIH_PER_HARI', metric('TARIF_PER_HARI') - metric('TARIF_RS_PER_HARI'))
+]
+
+
 class LOSHandler(BaseHandler):
     """Handler for LOS analysis"""
     
@@ -19,10 +27,22 @@ class LOSHandler(BaseHandler):
             'LOS', 'ADMISSION_DATE', 'DISCHARGE_DATE', 'TOTAL_TARIF', 'TARIF_RS'
         ]
     
+    def _get_currency_columns(self) -> List[str]:
+        """Get numeric columns rendered as Rupiah"""
+        return ['TOTAL_TARIF', 'TARIF_RS', 'TARIF_PER_HARI', 'TARIF_RS_PER_HARI', 'SELISIH_PER_HARI']
+    
+    def _get_derived_metrics(self) -> List[DerivedMetric]:
+        """Get derived LOS metrics"""
+        return LOS_METRICS
+    
     def _get_view_name(self) -> str:
         """Get the view name for this handler"""
         return "LOS"
     
+    def _get_query_view(self) -> str:
+        """Get the DatabaseQueryService view name for paginated queries"""
+        return "los"
+    
     def _query_database(self, filters: Dict[str, Any]) -> pd.DataFrame:
         """Query LOS data from database with filters"""
         return self.db_query_service.get_los_data(filters)
@@ -35,30 +55,15 @@ class LOSHandler(BaseHandler):
         df['TARIF_RS'] = safe_numeric_conversion(df['TARIF_RS'])
         
         # Calculate LOS metrics
-        df['TARIF_PER_HARI'] = (df['TOTAL_TARIF'] / df['LOS']).round(2)
-        df['TARIF_RS_PER_HARI'] = (df['TARIF_RS'] / df['LOS']).round(2)
-        df['SELISIH_PER_HARI'] = df['TARIF_PER_HARI'] - df['TARIF_RS_PER_HARI']
-        
-        # Format currency columns
-        df['TOTAL_TARIF_FORMATTED'] = df['TOTAL_TARIF'].apply(format_rupiah)
-        df['TARIF_RS_FORMATTED'] = df['TARIF_RS'].apply(format_rupiah)
-        df['TARIF_PER_HARI_FORMATTED'] = df['TARIF_PER_HARI'].apply(format_rupiah)
-        df['TARIF_RS_PER_HARI_FORMATTED'] = df['TARIF_RS_PER_HARI'].apply(format_rupiah)
-        df['SELISIH_PER_HARI_FORMATTED'] = df['SELISIH_PER_HARI'].apply(format_rupiah)
-        
-        # Remove duplicate numeric columns, keep only formatted versions
-        columns_to_remove = ['TOTAL_TARIF', 'TARIF_RS', 'TARIF_PER_HARI', 'TARIF_RS_PER_HARI', 'SELISIH_PER_HARI']
-        for col in columns_to_remove:
-            if col in df.columns:
-                df = df.drop(columns=[col])
+        df = self._apply_derived_metrics(df)
         
         # Reorder columns for better display
         column_order = [
             'SEP', 'MRN', 'NAMA_PASIEN', 'INACBG', 'DESKRIPSI_INACBG',
             'LOS', 'ADMISSION_DATE', 'DISCHARGE_DATE',
-            'TOTAL_TARIF_FORMATTED', 'TARIF_RS_FORMATTED',
-            'TARIF_PER_HARI_FORMATTED', 'TARIF_RS_PER_HARI_FORMATTED',
-            'SELISIH_PER_HARI_FORMATTED'
+            'TOTAL_TARIF', 'TARIF_RS',
+            'TARIF_PER_HARI', 'TARIF_RS_PER_HARI',
+            'SELISIH_PER_HARI'
         ]
         
         # Only include columns that exist in the dataframe
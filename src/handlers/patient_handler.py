@@ -5,7 +5,9 @@ import pandas as pd
 from typing import List, Dict, Any
 
 from core.base_handler import BaseHandler
-from utils.data_processing import safe_numeric_conversion, calculate_age_in_days
+from utils.data_processing import (
+    safe_numeric_conversion, calculate_age_in_days_series, fill_missing_as_empty, blank_missing_values
+)
 
 
 class PatientHandler(BaseHandler):
@@ -26,10 +28,18 @@ class PatientHandler(BaseHandler):
         """Get the view name for this handler"""
         return "patient"
     
+    def _get_query_view(self) -> str:
+        """Get the DatabaseQueryService view name for paginated queries"""
+        return "patient"
+    
     def _query_database(self, filters: Dict[str, Any]) -> pd.DataFrame:
         """Query patient data from database with filters"""
         return self.db_query_service.get_patient_data(filters)
     
+    def format_for_display(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Show missing numbers and dates as empty cells"""
+        return blank_missing_values(super().format_for_display(df))
+    
     def _process_data(self, df: pd.DataFrame) -> pd.DataFrame:
         """Process patient data with all required columns"""
         # Check which columns exist in the data
@@ -47,8 +57,8 @@ class PatientHandler(BaseHandler):
         final_columns = self.required_columns
         patient_df = patient_df.reindex(columns=final_columns)
         
-        # Clean up data - replace None values with empty strings
-        patient_df = patient_df.fillna('')
+        # Clean up data - replace None values in text columns with empty strings
+        patient_df = fill_missing_as_empty(patient_df)
         
         # Convert numeric columns
         numeric_columns = ['LOS', 'BIRTH_WEIGHT', 'UMUR_TAHUN', 'UMUR_HARI']
@@ -58,9 +68,8 @@ class PatientHandler(BaseHandler):
         
         # Calculate age in days if birth date and admission date are available
         if 'BIRTH_DATE' in patient_df.columns and 'ADMISSION_DATE' in patient_df.columns:
-            patient_df['CALCULATED_AGE_DAYS'] = patient_df.apply(
-                lambda row: calculate_age_in_days(row['BIRTH_DATE'], row['ADMISSION_DATE']), 
-                axis=1
+            patient_df['CALCULATED_AGE_DAYS'] = calculate_age_in_days_series(
+                patient_df['BIRTH_DATE'], patient_df['ADMISSION_DATE']
             )
         
         return patient_df
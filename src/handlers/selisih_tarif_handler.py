@@ -5,7 +5,7 @@ import pandas as pd
 from typing import List, Dict, Any
 
 from core.base_handler import BaseHandler
-from utils.formatters import format_rupiah
+from core.derived_metrics import DerivedMetric, SELISIH_TARIF, PERSENTASE_SELISIH
 from utils.data_processing import safe_numeric_conversion, extract_diagnosis_codes
 
 
@@ -19,10 +19,22 @@ class SelisihTarifHandler(BaseHandler):
             'TOTAL_TARIF', 'TARIF_RS', 'ADMISSION_DATE', 'DISCHARGE_DATE'
         ]
     
+    def _get_currency_columns(self) -> List[str]:
+        """Get numeric columns rendered as Rupiah"""
+        return ['TOTAL_TARIF', 'TARIF_RS', 'SELISIH_TARIF']
+    
+    def _get_derived_metrics(self) -> List[DerivedMetric]:
+        """Get derived selisih tarif metrics"""
+        return [SELISIH_TARIF, PERSENTASE_SELISIH]
+    
     def _get_view_name(self) -> str:
         """Get the view name for this handler"""
         return "selisih tarif"
     
+    def _get_query_view(self) -> str:
+        """Get the DatabaseQueryService view name for paginated queries"""
+        return "selisih_tarif"
+    
     def _query_database(self, filters: Dict[str, Any]) -> pd.DataFrame:
         """Query selisih tarif data from database with filters"""
         return self.db_query_service.get_selisih_tarif_data(filters)
@@ -40,26 +52,14 @@ class SelisihTarifHandler(BaseHandler):
         df['SDX'] = [item[1] for item in diagnosis_data]
         
         # Calculate selisih tarif metrics
-        df['SELISIH_TARIF'] = df['TOTAL_TARIF'] - df['TARIF_RS']
-        df['PERSENTASE_SELISIH'] = (df['SELISIH_TARIF'] / df['TARIF_RS'] * 100).round(2)
-        
-        # Format currency columns
-        df['TOTAL_TARIF_FORMATTED'] = df['TOTAL_TARIF'].apply(format_rupiah)
-        df['TARIF_RS_FORMATTED'] = df['TARIF_RS'].apply(format_rupiah)
-        df['SELISIH_TARIF_FORMATTED'] = df['SELISIH_TARIF'].apply(format_rupiah)
-        
-        # Remove duplicate numeric columns, keep only formatted versions
-        columns_to_remove = ['TOTAL_TARIF', 'TARIF_RS', 'SELISIH_TARIF']
-        for col in columns_to_remove:
-            if col in df.columns:
-                df = df.drop(columns=[col])
+        df = self._apply_derived_metrics(df)
         
         # Reorder columns for better display
         column_order = [
             'SEP', 'MRN', 'LOS', 'INACBG', 'DESKRIPSI_INACBG',
             'PDX', 'SDX', 'DIAGLIST', 'PROCLIST',
-            'TOTAL_TARIF_FORMATTED', 'TARIF_RS_FORMATTED',
-            'SELISIH_TARIF_FORMATTED', 'PERSENTASE_SELISIH',
+            'TOTAL_TARIF', 'TARIF_RS',
+            'SELISIH_TARIF', 'PERSENTASE_SELISIH',
             'ADMISSION_DATE', 'DISCHARGE_DATE'
         ]
         
@@ -6,10 +6,24 @@ import json
 from typing import List, Dict, Any
 
 from core.base_handler import BaseHandler
-from utils.formatters import format_rupiah
+from core.derived_metrics import DerivedMetric, col, metric, rounded, when
 from utils.data_processing import safe_numeric_conversion
 
 
+# Metrik ventilator; pasien tanpa jam ventilator (atau LOS 0) bernilai 0
+VENTILATOR_METRICS = [
+    DerivedMetric('VENTILATOR_DAYS', rounded(col('VENT_HOUR') / 24)),
+    DerivedMetric('VENTILATOR_COST_PER_HOUR',
+                  rounded(when(col('VENT_HOUR') > 0, col('TOTAL_TARIF') / col('VENT_HOUR'), 0))),
+    DerivedMetric('VENTILATOR_COST_PER_DAY',
+                  rounded(when(metric('VENTILATOR_DAYS') > 0, col('TOTAL_TARIF') / metric('VENTILATOR_DAYS'), 0))),
+    DerivedMetric('VENTILATOR_PERCENTAGE_OF_TOTAL',
+                  rounded(when(col('LOS') > 0, col('VENT_HOUR') / col('LOS') * 100, 0))),
+    DerivedMetric('VENTILATOR_STATUS',
+                  when(col('VENT_HOUR') > 0, 'Menggunakan Ventilator', 'Tidak Menggunakan Ventilator'))
+]
+
+
 class VentilatorHandler(BaseHandler):
     """Handler for ventilator analysis"""
     
@@ -21,10 +35,22 @@ class VentilatorHandler(BaseHandler):
             'VENT_HOUR', 'ICU_INDIKATOR', 'ICU_LOS'
         ]
     
+    def _get_currency_columns(self) -> List[str]:
+        """Get numeric columns rendered as Rupiah"""
+        return ['TOTAL_TARIF', 'TARIF_RS', 'VENTILATOR_COST_PER_HOUR', 'VENTILATOR_COST_PER_DAY']
+    
+    def _get_derived_metrics(self) -> List[DerivedMetric]:
+        """Get derived ventilator metrics"""
+        return VENTILATOR_METRICS
+    
     def _get_view_name(self) -> str:
         """Get the view name for this handler"""
         return "ventilator"
     
+    def _get_query_view(self) -> str:
+        """Get the DatabaseQueryService view name for paginated queries"""
+        return "ventilator"
+    
     def _query_database(self, filters: Dict[str, Any]) -> pd.DataFrame:
         """Query ventilator data from database with filters"""
         return self.db_query_service.get_ventilator_data(filters)
@@ -41,46 +67,16 @@ class VentilatorHandler(BaseHandler):
         df['VENT_HOUR'] = safe_numeric_conversion(df['VENT_HOUR'])
         df['ICU_LOS'] = safe_numeric_conversion(df['ICU_LOS'])
         
-        # Calculate ventilator metrics
-        df['VENTILATOR_DAYS'] = (df['VENT_HOUR'] / 24).round(2)
-        
-        # Handle division by zero for ventilator cost calculations
-        df['VENTILATOR_COST_PER_HOUR'] = df.apply(
-            lambda row: (row['TOTAL_TARIF'] / row['VENT_HOUR']) if row['VENT_HOUR'] > 0 else 0, axis=1
-        ).round(2)
-        
-        df['VENTILATOR_COST_PER_DAY'] = df.apply(
-            lambda row: (row['TOTAL_TARIF'] / row['VENTILATOR_DAYS']) if row['VENTILATOR_DAYS'] > 0 else 0, axis=1
-        ).round(2)
-        
-        df['VENTILATOR_PERCENTAGE_OF_TOTAL'] = df.apply(
-            lambda row: (row['VENT_HOUR'] / row['LOS'] * 100) if row['LOS'] > 0 else 0, axis=1
-        ).round(2)
-        
-        # Add ventilator status indicator
-        df['VENTILATOR_STATUS'] = df['VENT_HOUR'].apply(
-            lambda x: 'Menggunakan Ventilator' if x > 0 else 'Tidak Menggunakan Ventilator'
-        )
-        
-        # Format currency columns
-        currency_columns = ['TOTAL_TARIF', 'TARIF_RS', 'VENTILATOR_COST_PER_HOUR', 'VENTILATOR_COST_PER_DAY']
-        for col in currency_columns:
-            if col in df.columns:
-                df[f'{col}_FORMATTED'] = df[col].apply(format_rupiah)
-        
-        # Remove duplicate numeric columns, keep only formatted versions
-        columns_to_remove = ['TOTAL_TARIF', 'TARIF_RS', 'VENTILATOR_COST_PER_HOUR', 'VENTILATOR_COST_PER_DAY']
-        for col in columns_to_remove:
-            if col in df.columns:
-                df = df.drop(columns=[col])
+        # Calculate ventilator metrics (division by zero and no ventilator give 0)
+        df = self._apply_derived_metrics(df)
         
         # Reorder columns for better display
         column_order = [
             'SEP', 'MRN', 'NAMA_PASIEN', 'INACBG', 'DESKRIPSI_INACBG',
             'LOS', 'ADMISSION_DATE', 'DISCHARGE_DATE',
             'VENT_HOUR', 'VENTILATOR_DAYS', 'VENTILATOR_STATUS', 'ICU_INDIKATOR', 'ICU_LOS',
-            'TOTAL_TARIF_FORMATTED', 'TARIF_RS_FORMATTED',
-            'VENTILATOR_COST_PER_HOUR_FORMATTED', 'VENTILATOR_COST_PER_DAY_FORMATTED',
+            'TOTAL_TARIF', 'TARIF_RS',
+            'VENTILATOR_COST_PER_HOUR', 'VENTILATOR_COST_PER_DAY',
             'VENTILATOR_PERCENTAGE_OF_TOTAL'
         ]
         
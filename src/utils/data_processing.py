@@ -22,17 +22,20 @@ def apply_date_filter(df: pd.DataFrame, start_date: Optional[str], end_date: Opt
     if not start_date and not end_date:
         return df
     
-    # Convert date column to datetime if it's not already
     if date_column in df.columns:
-        df[date_column] = pd.to_datetime(df[date_column], errors='coerce')
+        # Date columns from the database are already datetime64; only parse other inputs
+        dates = df[date_column]
+        if not pd.api.types.is_datetime64_any_dtype(dates):
+            dates = pd.to_datetime(dates, errors='coerce')
         
+        mask = pd.Series(True, index=df.index)
         if start_date:
-            start_dt = pd.to_datetime(start_date)
-            df = df[df[date_column] >= start_dt]
+            mask &= dates >= pd.to_datetime(start_date)
         
         if end_date:
-            end_dt = pd.to_datetime(end_date)
-            df = df[df[date_column] <= end_dt]
+            mask &= dates <= pd.to_datetime(end_date)
+        
+        df = df[mask]
     
     return df
 
@@ -79,6 +82,44 @@ def apply_specific_filter(df: pd.DataFrame, filter_column: str, filter_value: st
     return df[mask]
 
 
+def fill_missing_as_empty(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Replace missing values in text columns with empty strings
+    
+    Categorical columns cannot hold '' and are converted to object first (only
+    when they contain missing values). Numeric and date columns keep their dtype
+    and missing values, so the dtype of a column does not depend on whether the
+    rows contain NULLs; use blank_missing_values() when rendering.
+    
+    Args:
+        df: DataFrame to fill
+        
+    Returns:
+        DataFrame without missing values in text columns
+    """
+    filled = {
+        col: (df[col].astype(object) if isinstance(df[col].dtype, pd.CategoricalDtype) else df[col]).fillna('')
+        for col in df.columns
+        if (df[col].dtype == object or isinstance(df[col].dtype, (pd.CategoricalDtype, pd.StringDtype)))
+        and df[col].hasnans
+    }
+    return df.assign(**filled) if filled else df
+
+
+def blank_missing_values(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Show missing values of any column as empty cells (display only, changes dtypes)
+    
+    Args:
+        df: DataFrame being rendered
+        
+    Returns:
+        DataFrame with '' instead of NaN/NaT/<NA>
+    """
+    blanked = {col: df[col].astype(object).where(df[col].notna(), '') for col in df.columns if df[col].hasnans}
+    return df.assign(**blanked) if blanked else df
+
+
 def safe_numeric_conversion(series: pd.Series, fill_value: float = 0) -> pd.Series:
     """
     Safely convert series to numeric with error handling
@@ -138,3 +179,21 @@ def calculate_age_in_days(birth_date: str, admission_date: str) -> int:
         return max(0, age_days)
     except:
         return 0
+
+
+def calculate_age_in_days_series(birth_dates: pd.Series, admission_dates: pd.Series) -> pd.Series:
+    """
+    Vectorized calculate_age_in_days for whole columns
+    
+    Args:
+        birth_dates: Birth date Series
+        admission_dates: Admission date Series
+        
+    Returns:
+        Series of age in days (0 when a date is missing or invalid)
+    """
+    birth_dt = pd.to_datetime(birth_dates, errors='coerce')
+    admission_dt = pd.to_datetime(admission_dates, errors='coerce')
+    
+    age_days = (admission_dt - birth_dt).dt.days
+    return age_days.clip(lower=0).fillna(0).astype('int64')
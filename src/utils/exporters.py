@@ -0,0 +1,180 @@
+"""
+Utility functions for streaming exports of analysis views (CSV, XLSX, Parquet)
+
+Each writer takes an iterator of DataFrame batches and yields bytes, so a Flask
+streaming response never holds the whole view in memory. An empty batch still
+produces the header (CSV, XLSX) or schema (Parquet).
+"""
+import os
+import tempfile
+from typing import Iterable, Iterator
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    PYARROW_AVAILABLE = True
+except ImportError:  # pragma: no cover - pyarrow is optional
+    PYARROW_AVAILABLE = False
+
+# Rows per XLSX worksheet (Excel limit minus the header row)
+XLSX_MAX_ROWS = 1048575
+
+# Chunk size when streaming the finished XLSX file
+XLSX_READ_CHUNK_SIZE = 64 * 1024
+
+
+def iter_csv(batches: Iterable[pd.DataFrame]) -> Iterator[bytes]:
+    """
+    Write DataFrame batches as CSV, one chunk per batch
+
+    Args:
+        batches: DataFrame batches with identical columns
+
+    Yields:
+        UTF-8 encoded CSV chunks (header in the first chunk)
+    """
+    header = True
+    for batch in batches:
+        yield batch.to_csv(index=False, header=header, date_format='%Y-%m-%d %H:%M:%S').encode('utf-8')
+        header = False
+
+
+def iter_parquet(batches: Iterable[pd.DataFrame]) -> Iterator[bytes]:
+    """
+    Write DataFrame batches as one Parquet file, one row group per batch
+
+    The schema is taken from the first batch; text and categorical columns are
+    written as strings.
+
+    Args:
+        batches: DataFrame batches with identical columns
+
+    Yields:
+        Parquet file bytes written since the previous chunk
+    """
+    sink = _ChunkSink()
+    writer = None
+    schema = None
+    try:
+        for batch in batches:
+            batch = _text_columns_as_string(batch)
+            if writer is None:
+                schema = pa.Table.from_pandas(batch, preserve_index=False).schema
+                # Columns that are entirely NULL in the first batch are typed as string
+                schema = pa.schema([field.with_type(pa.string()) if pa.types.is_null(field.type) else field
+                                    for field in schema]).remove_metadata()
+                writer = pq.ParquetWriter(pa.PythonFile(sink, mode='w'), schema)
+            writer.write_table(pa.Table.from_pandas(batch, schema=schema, preserve_index=False, safe=False))
+            yield sink.drain()
+    finally:
+        if writer is not None:
+            writer.close()
+    yield sink.drain()
+
+
+def iter_xlsx(batches: Iterable[pd.DataFrame], sheet_name: str = 'Data') -> Iterator[bytes]:
+    """
+    Write DataFrame batches to an XLSX workbook with openpyxl write-only mode
+
+    Rows are flushed to openpyxl's temporary sheet files as they arrive, so memory
+    stays constant; the zip container can only be produced at the end, after
+    which the file is streamed in chunks. Views larger than one worksheet continue
+    on additional sheets.
+
+    Args:
+        batches: DataFrame batches with identical columns
+        sheet_name: Name of the first worksheet
+
+    Yields:
+        XLSX file chunks
+    """
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    worksheet = None
+    sheet_rows = 0
+
+    for batch in batches:
+        if worksheet is None:
+            # Header is written even when the first (only) batch is empty
+            worksheet = workbook.create_sheet(sheet_name)
+            worksheet.append(list(batch.columns))
+        # NaN/NaT are not valid cell values; write them as empty cells
+        values = batch.astype(object).where(batch.notna(), None)
+        for row in values.itertuples(index=False, name=None):
+            if sheet_rows >= XLSX_MAX_ROWS:
+                worksheet = workbook.create_sheet(f"{sheet_name} {len(workbook.worksheets) + 1}")
+                worksheet.append(list(batch.columns))
+                sheet_rows = 0
+            worksheet.append(row)
+            sheet_rows += 1
+
+    if worksheet is None:
+        workbook.create_sheet(sheet_name)
+
+    fd, path = tempfile.mkstemp(suffix='.xlsx')
+    os.close(fd)
+    try:
+        workbook.save(path)
+        with open(path, 'rb') as f:
+            while True:
+                chunk = f.read(XLSX_READ_CHUNK_SIZE)
+                if not chunk:
+                    break
+                yield chunk
+    finally:
+        os.remove(path)
+
+
+# Export format -> (writer, mimetype)
+EXPORT_FORMATS = {
+    'csv': (iter_csv, 'text/csv; charset=utf-8'),
+    'xlsx': (iter_xlsx, 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'),
+    'parquet': (iter_parquet, 'application/vnd.apache.parquet')
+}
+
+
+def _text_columns_as_string(batch: pd.DataFrame) -> pd.DataFrame:
+    """
+    Convert object columns (mixed text/values) and categoricals to a string dtype for Arrow
+
+    Categories differ per batch, so they are not written as Arrow dictionaries
+    (the writer schema is fixed by the first batch).
+    """
+    object_columns = [col for col in batch.columns
+                      if batch[col].dtype == object or isinstance(batch[col].dtype, pd.CategoricalDtype)]
+    if not object_columns:
+        return batch
+    return batch.assign(**{col: batch[col].astype('string') for col in object_columns})
+
+
+class _ChunkSink:
+    """Write-only file object that collects written bytes until drained"""
+
+    def __init__(self):
+        self.closed = False
+        self._chunks = []
+        self._position = 0
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self._chunks.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self) -> bytes:
+        """Return and clear the bytes written since the last drain"""
+        data = b''.join(self._chunks)
+        self._chunks = []
+        return data
@@ -1,6 +1,7 @@
 """
 Utility functions for data formatting
 """
+import numpy as np
 import pandas as pd
 
 
@@ -49,3 +50,28 @@ def format_percentage(value, decimal_places=1):
         return formatted
     except (ValueError, TypeError):
         return "0%"
+
+
+def format_rupiah_series(series: pd.Series) -> pd.Series:
+    """
+    Format a whole numeric column to Rupiah in one pass (Rp. 1.000.000)
+    
+    Produces the same strings as format_rupiah: decimals are truncated and
+    empty or non-numeric values become "Rp. 0".
+    """
+    numeric = pd.to_numeric(series, errors='coerce')
+    numeric = numeric.where(np.isfinite(numeric), 0).fillna(0)
+    values = np.trunc(numeric.to_numpy(dtype='float64')).astype('int64')
+    
+    formatted = [f"Rp. {value:,}".replace(",", ".") for value in values.tolist()]
+    return pd.Series(formatted, index=series.index, dtype=object)
+
+
+# Column name parts that stay uppercase in labels
+LABEL_ACRONYMS = {'SEP', 'MRN', 'INACBG', 'LOS', 'DPJP', 'RS', 'ICU', 'ID', 'PDX', 'SDX', 'ADL1', 'ADL2'}
+
+
+def format_column_label(column: str) -> str:
+    """Human-readable label of a column name (TOTAL_TARIF -> Total Tarif, rata_los -> Rata Los)"""
+    words = [word for word in str(column).split('_') if word]
+    return ' '.join(word.upper() if word.upper() in LABEL_ACRONYMS else word.capitalize() for word in words)
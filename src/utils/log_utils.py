@@ -0,0 +1,159 @@
+"""
+Logging helpers for the upload pipeline: lazy structured events, bounded
+summaries and per-module log levels
+"""
+import logging
+import os
+import sys
+from itertools import islice
+from typing import Any, Dict, Mapping, Optional
+
+import numpy as np
+import pandas as pd
+
+# Limits for values rendered by summarize()
+MAX_SUMMARY_ITEMS = 10
+MAX_SUMMARY_CHARS = 200
+
+LOG_FORMAT = '%(asctime)s %(levelname)s [%(process)d] %(name)s: %(message)s'
+
+
+def summarize(value: Any, max_items: int = MAX_SUMMARY_ITEMS, max_chars: int = MAX_SUMMARY_CHARS) -> str:
+    """
+    Bounded text representation of a value for log messages
+
+    DataFrames, Series and arrays are shown by shape only; lists, sets and dicts
+    show their first max_items entries and how many were left out; long strings
+    are cut at max_chars. The size of the result does not grow with the data.
+
+    Args:
+        value: Value to summarize
+        max_items: Entries shown per list, set or dict (nested values too)
+        max_chars: Characters shown per scalar value
+
+    Returns:
+        Summary string
+    """
+    if isinstance(value, pd.DataFrame):
+        return f"<DataFrame {value.shape[0]}x{value.shape[1]}>"
+    if isinstance(value, pd.Series):
+        return f"<Series {value.name!s} len={len(value)} dtype={value.dtype}>"
+    if isinstance(value, np.ndarray):
+        return f"<ndarray shape={value.shape} dtype={value.dtype}>"
+
+    if isinstance(value, Mapping):
+        parts = [f"{key}: {summarize(item, max_items, max_chars)}"
+                 for key, item in islice(value.items(), max_items)]
+        if len(value) > max_items:
+            parts.append(f"... +{len(value) - max_items} more")
+        return '{' + ', '.join(parts) + '}'
+
+    if isinstance(value, (list, tuple, set, frozenset)):
+        parts = [summarize(item, max_items, max_chars) for item in islice(value, max_items)]
+        if len(value) > max_items:
+            parts.append(f"... +{len(value) - max_items} more")
+        return '[' + ', '.join(parts) + ']'
+
+    text = repr(value) if isinstance(value, str) else str(value)
+    if len(text) > max_chars:
+        return f"{text[:max_chars]}... ({len(text)} chars)"
+    return text
+
+
+class LazySummary:
+    """Log argument that is only summarized when the record is actually emitted"""
+
+    __slots__ = ('value', 'max_items', 'max_chars')
+
+    def __init__(self, value: Any, max_items: int = MAX_SUMMARY_ITEMS, max_chars: int = MAX_SUMMARY_CHARS):
+        self.value = value
+        self.max_items = max_items
+        self.max_chars = max_chars
+
+    def __str__(self) -> str:
+        return summarize(self.value, self.max_items, self.max_chars)
+
+
+class _EventFields:
+    """Renders event fields as key=value pairs when the record is formatted"""
+
+    __slots__ = ('fields',)
+
+    def __init__(self, fields: Dict[str, Any]):
+        self.fields = fields
+
+    def __str__(self) -> str:
+        return ' '.join(f"{key}={summarize(value)}" for key, value in self.fields.items())
+
+
+def log_event(logger: logging.Logger, event: str, level: int = logging.INFO, **fields: Any) -> None:
+    """
+    Log a structured pipeline event as 'event key=value ...'
+
+    Nothing is formatted when the level is disabled for the logger. Values are
+    rendered with summarize(), so DataFrames and long SEP lists never end up in
+    the log line. The raw event name and fields are attached to the record
+    (record.event, record.fields) for handlers that emit structured output.
+
+    Args:
+        logger: Logger of the calling module
+        event: Event name (snake_case)
+        level: Log level
+        **fields: Event fields
+    """
+    if not logger.isEnabledFor(level):
+        return
+    logger.log(level, '%s %s', event, _EventFields(fields),
+               extra={'event': event, 'fields': fields}, stacklevel=2)
+
+
+def parse_module_levels(spec: Optional[str]) -> Dict[str, int]:
+    """
+    Parse per-module levels like "core.upload_service=INFO,core.bulk_ingest=DEBUG"
+
+    Args:
+        spec: Comma-separated logger=LEVEL pairs
+
+    Returns:
+        Dict of logger name -> numeric level (unknown levels are skipped)
+    """
+    levels = {}
+    for item in (spec or '').split(','):
+        name, _, level = item.partition('=')
+        level_value = logging.getLevelName(level.strip().upper())
+        if name.strip() and isinstance(level_value, int):
+            levels[name.strip()] = level_value
+    return levels
+
+
+def configure_logging(level: Optional[str] = None, module_levels: Optional[str] = None) -> Dict[str, int]:
+    """
+    Configure application logging from the environment
+
+    LOG_LEVEL sets the root level (default WARNING) and LOG_LEVELS sets
+    per-module levels, e.g. LOG_LEVELS="core.upload_service=INFO". A stderr
+    handler is only added when the root logger has none, so handlers set up by
+    a server or a tool are kept.
+
+    Args:
+        level: Root level, defaults to LOG_LEVEL
+        module_levels: Per-module levels, defaults to LOG_LEVELS
+
+    Returns:
+        Dict of per-module levels that were applied
+    """
+    root = logging.getLogger()
+    level = (level or os.environ.get('LOG_LEVEL') or '').upper()
+
+    if not root.handlers:
+        handler = logging.StreamHandler(sys.stderr)
+        handler.setFormatter(logging.Formatter(LOG_FORMAT))
+        root.addHandler(handler)
+        root.setLevel(logging.WARNING)
+    if isinstance(logging.getLevelName(level), int):
+        root.setLevel(level)
+
+    levels = parse_module_levels(module_levels if module_levels is not None else os.environ.get('LOG_LEVELS'))
+    for name, module_level in levels.items():
+        logging.getLogger(name).setLevel(module_level)
+    return levels
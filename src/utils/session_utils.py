@@ -1,19 +1,21 @@
 """
 Session validation utilities for Flask routes
 """
-from flask import session, redirect, url_for, jsonify
+from flask import session, redirect, url_for, jsonify, g
 from functools import wraps
-from typing import Callable, Any
-from core.database import UserSession
-from utils.timezone_utils import jakarta_now
+from typing import Callable, Any, Optional
+from core.session_cache import session_cache, CachedSession
 
 
 def get_valid_user_session():
     """
     Get and validate user session from Flask session
     
+    Validation goes through the shared session cache (token, user, active flag,
+    expiry and the user's role); the result is kept on flask.g for the request.
+    
     Returns:
-        tuple: (user_id, user_session) or (None, None) if invalid
+        tuple: (user_id, cached_session) or (None, None) if invalid
     """
     user_id = session.get('user_id')
     session_token = session.get('session_token')
@@ -22,19 +24,29 @@ def get_valid_user_session():
         return None, None
     
     # Verify session is still valid
-    user_session = UserSession.query.filter_by(
-        user_id=user_id,
-        session_token=session_token,
-        is_active=True
-    ).filter(UserSession.expires_at > jakarta_now()).first()
+    user_session = session_cache.validate(user_id, session_token)
     
     if not user_session:
         session.clear()
         return None, None
     
+    g.user_session = user_session
     return user_id, user_session
 
 
+def get_current_session() -> Optional[CachedSession]:
+    """
+    Get the validated session of the current request
+    
+    Returns:
+        CachedSession (user_id, username, role, ...) or None when not logged in
+    """
+    user_session = g.get('user_session')
+    if user_session is None:
+        _, user_session = get_valid_user_session()
+    return user_session
+
+
 def login_required(redirect_on_fail=True):
     """
     Decorator factory for routes that require login
@@ -69,17 +81,3 @@ def api_login_required(f: Callable) -> Callable:
     Decorator for API routes that require login (returns JSON)
     """
     return login_required(redirect_on_fail=False)(f)
-
-
-
-
-
-
-
-
-
-
-
-
-
-
@@ -7,14 +7,21 @@ import logging
 
 from core.data_handler import DataHandler
 from core.database import init_db, db
+from core.session_cache import session_cache, DEFAULT_SESSION_TTL_SECONDS
 from .routes import WebRoutes
 from .filters import jakarta_time, jakarta_time_short, jakarta_date
+from .compression import init_compression
+from .metrics import init_metrics
+from utils.log_utils import configure_logging
 
 logger = logging.getLogger(__name__)
 
 
 def create_app():
     """Create and configure the Flask application"""
+    # Root level from LOG_LEVEL, per-module levels from LOG_LEVELS
+    configure_logging()
+    
     app = Flask(__name__, 
                 template_folder='templates',
                 static_folder='static')
@@ -22,6 +29,15 @@ def create_app():
     # Configuration
     UPLOAD_FOLDER = 'instance/uploads'
     app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
+    # Number of background threads processing queued uploads
+    app.config['UPLOAD_WORKERS'] = int(os.environ.get('UPLOAD_WORKERS', 2))
+    # Parquet snapshot of data_analytics read by the analysis views (needs pyarrow)
+    app.config['SNAPSHOT_FOLDER'] = os.environ.get('SNAPSHOT_FOLDER', 'instance/snapshots')
+    # Seconds a validated login session is trusted before it is re-checked in the database
+    app.config['SESSION_CACHE_TTL'] = float(os.environ.get('SESSION_CACHE_TTL', DEFAULT_SESSION_TTL_SECONDS))
+    session_cache.ttl_seconds = app.config['SESSION_CACHE_TTL']
+    # Per-worker request/SQL/handler metrics served at /metrics
+    app.config['METRICS_ENABLED'] = os.environ.get('METRICS_ENABLED', 'true').lower() == 'true'
     
     # Ensure upload directory exists
     os.makedirs(UPLOAD_FOLDER, exist_ok=True)
@@ -42,6 +58,13 @@ def create_app():
     app.jinja_env.filters['jakarta_time_short'] = jakarta_time_short
     app.jinja_env.filters['jakarta_date'] = jakarta_date
     
+    # Compress JSON/HTML responses (gzip, or brotli when installed)
+    init_compression(app)
+    
+    # Registered after compression so response sizes are measured uncompressed
+    if app.config['METRICS_ENABLED']:
+        init_metrics(app)
+    
     # Initialize data handler
     data_handler = DataHandler()
     
@@ -0,0 +1,71 @@
+"""
+Response compression for JSON and HTML responses (gzip, brotli when installed)
+"""
+import gzip
+import logging
+
+from flask import request
+
+try:
+    import brotli
+    BROTLI_AVAILABLE = True
+except ImportError:  # pragma: no cover - brotli is optional
+    BROTLI_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# Responses smaller than this are sent uncompressed
+COMPRESS_MIN_SIZE = 1024
+
+# Compressed response types; static files and streamed exports are skipped
+COMPRESSIBLE_MIMETYPES = {'application/json', 'text/html'}
+
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+
+
+def _accepted_encoding() -> str:
+    """Pick the best encoding accepted by the client ('br', 'gzip' or '')"""
+    accept = request.headers.get('Accept-Encoding', '').lower()
+    if BROTLI_AVAILABLE and 'br' in accept:
+        return 'br'
+    if 'gzip' in accept:
+        return 'gzip'
+    return ''
+
+
+def compress_response(response):
+    """after_request hook: compress eligible responses according to Accept-Encoding"""
+    if (response.status_code < 200 or response.status_code >= 300
+            or response.direct_passthrough or response.is_streamed
+            or response.mimetype not in COMPRESSIBLE_MIMETYPES
+            or 'Content-Encoding' in response.headers):
+        return response
+
+    response.vary.add('Accept-Encoding')
+    encoding = _accepted_encoding()
+    if not encoding:
+        return response
+
+    data = response.get_data()
+    if len(data) < COMPRESS_MIN_SIZE:
+        return response
+
+    try:
+        if encoding == 'br':
+            compressed = brotli.compress(data, quality=BROTLI_QUALITY)
+        else:
+            compressed = gzip.compress(data, compresslevel=GZIP_LEVEL)
+    except Exception as e:
+        logger.warning(f"Response compression failed, sending uncompressed: {e}")
+        return response
+
+    response.set_data(compressed)
+    response.headers['Content-Encoding'] = encoding
+    response.headers['Content-Length'] = str(len(compressed))
+    return response
+
+
+def init_compression(app):
+    """Register response compression on the Flask app"""
+    app.after_request(compress_response)
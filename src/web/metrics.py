@@ -0,0 +1,94 @@
+"""
+Prometheus-style /metrics: request latency, SQL time and handler phases per worker
+"""
+import time
+import logging
+
+from flask import Response, request
+from sqlalchemy import event
+
+from core.database import db
+from core.request_metrics import request_metrics
+from core.session_cache import session_cache
+
+logger = logging.getLogger(__name__)
+
+# Prometheus text exposition format
+METRICS_CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+def _before_request():
+    """before_request hook: start timing the request"""
+    request_metrics.start_request()
+
+
+def _after_request(response):
+    """
+    after_request hook: record latency, SQL time and body size of the request
+
+    Runs before compress_response, so the size is the rendered (uncompressed)
+    body. Streamed responses (exports) are recorded when streaming starts and
+    without a size.
+    """
+    if response.is_streamed or response.direct_passthrough:
+        size = None
+    else:
+        size = response.calculate_content_length()
+    request_metrics.finish_request(request.endpoint or 'unmatched', request.method,
+                                   response.status_code, size)
+    return response
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('metrics_query_start', []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info.get('metrics_query_start')
+    if started:
+        request_metrics.record_query(time.perf_counter() - started.pop())
+
+
+def _handle_error(exception_context):
+    """Drop the start time of a failed statement so the stack stays balanced"""
+    connection = exception_context.connection
+    if connection is not None and connection.info.get('metrics_query_start'):
+        connection.info['metrics_query_start'].pop()
+
+
+def _session_cache_lines():
+    """Session cache counters of this worker"""
+    stats = session_cache.stats()
+    return [
+        '# HELP session_cache_hits_total Login session validations served from the cache',
+        '# TYPE session_cache_hits_total counter',
+        f"session_cache_hits_total {stats['hits']}",
+        '# HELP session_cache_misses_total Login session validations read from the database',
+        '# TYPE session_cache_misses_total counter',
+        f"session_cache_misses_total {stats['misses']}",
+        '# HELP session_cache_entries Login sessions currently cached',
+        '# TYPE session_cache_entries gauge',
+        f"session_cache_entries {stats['entries']}",
+    ]
+
+
+def metrics_view():
+    """Metrics of the worker serving the scrape, in Prometheus text format"""
+    lines = request_metrics.render() + _session_cache_lines()
+    return Response('\n'.join(lines) + '\n', content_type=METRICS_CONTENT_TYPE)
+
+
+def init_metrics(app):
+    """Register request hooks, SQL listeners and the /metrics route on the Flask app"""
+    app.before_request(_before_request)
+    app.after_request(_after_request)
+
+    with app.app_context():
+        engine = db.engine
+    if not event.contains(engine, 'before_cursor_execute', _before_cursor_execute):
+        event.listen(engine, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(engine, 'after_cursor_execute', _after_cursor_execute)
+        event.listen(engine, 'handle_error', _handle_error)
+
+    app.add_url_rule('/metrics', 'metrics', metrics_view)
+    logger.debug("Request metrics enabled at /metrics")
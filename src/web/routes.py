@@ -1,17 +1,29 @@
 """
 Flask routes for the web application
 """
-from flask import render_template, request, redirect, url_for, jsonify, session
+from flask import render_template, request, redirect, url_for, jsonify, session, Response, stream_with_context, g
 from typing import Dict, Any
 from datetime import datetime, timedelta
 from utils.timezone_utils import jakarta_now
 from functools import wraps
 import random
+import logging
+import os
+
+from sqlalchemy import text
 
 from core.data_handler import DataHandler
-from core.database import db, User, UserSession, LoginLog, UploadLog, UserActivityLog
+from core.database import db, User, UserSession, LoginLog, UserActivityLog
 from core.robust_data_extractor import RobustDataExtractor
 from core.upload_service import UploadService
+from core.upload_jobs import UploadJobQueue
+from core.stats_cache import stats_cache
+from core.session_cache import session_cache
+from core.snapshot_cache import SnapshotCache
+from utils.exporters import EXPORT_FORMATS, PYARROW_AVAILABLE
+from utils.handler_registry import HandlerRegistry
+
+logger = logging.getLogger(__name__)
 
 
 class WebRoutes:
@@ -22,6 +34,13 @@ class WebRoutes:
         self.data_handler = data_handler
         self.robust_extractor = RobustDataExtractor()
         self.upload_service = UploadService()
+        self.upload_jobs = UploadJobQueue(
+            app,
+            workers=app.config.get('UPLOAD_WORKERS', 2),
+            cleanup_file=self.data_handler.cleanup_file
+        )
+        # Used by the gunicorn worker_exit hook to drain the queue before the worker exits
+        app.extensions['upload_jobs'] = self.upload_jobs
         self._register_routes()
     
     def login_required(self, f):
@@ -34,17 +53,14 @@ class WebRoutes:
             if not user_id or not session_token:
                 return redirect(url_for('login'))
             
-            # Verify session is still valid
-            user_session = UserSession.query.filter_by(
-                user_id=user_id,
-                session_token=session_token,
-                is_active=True
-            ).filter(UserSession.expires_at > jakarta_now()).first()
+            # Verify session is still valid (cached per token, includes the user's role)
+            user_session = session_cache.validate(user_id, session_token)
             
             if not user_session:
                 session.clear()
                 return redirect(url_for('login'))
             
+            g.user_session = user_session
             return f(*args, **kwargs)
         return decorated_function
         
@@ -61,12 +77,8 @@ class WebRoutes:
                     'message': 'Please login first'
                 }), 401
             
-            # Verify session is still valid
-            user_session = UserSession.query.filter_by(
-                user_id=user_id,
-                session_token=session_token,
-                is_active=True
-            ).filter(UserSession.expires_at > jakarta_now()).first()
+            # Verify session is still valid (cached per token, includes the user's role)
+            user_session = session_cache.validate(user_id, session_token)
             
             if not user_session:
                 session.clear()
@@ -75,6 +87,7 @@ class WebRoutes:
                     'message': 'Session expired. Please login again'
                 }), 401
             
+            g.user_session = user_session
             return f(*args, **kwargs)
         return decorated_function
     
@@ -145,44 +158,23 @@ class WebRoutes:
         @self.app.route('/main')
         @self.login_required
         def main():
-            # Get current user and session info
-            user_id = session.get('user_id')
-            session_token = session.get('session_token')
-            
-            user = User.query.get(user_id)
-            user_session = UserSession.query.filter_by(
-                user_id=user_id,
-                session_token=session_token,
-                is_active=True
-            ).first()
-            
+            # Current user and session info (username and role) from the validated session
             return render_template('index.html', 
                                  table_html="", 
                                  has_data=False,
-                                 current_user=user,
-                                 user_session=user_session)
+                                 current_user=g.user_session,
+                                 user_session=g.user_session)
         
         @self.app.route('/table')
         @self.login_required
         def table():
             """Modern table page with professional design"""
-            # Get current user and session info
-            user_id = session.get('user_id')
-            session_token = session.get('session_token')
-            
-            user = User.query.get(user_id)
-            user_session = UserSession.query.filter_by(
-                user_id=user_id,
-                session_token=session_token,
-                is_active=True
-            ).first()
-            
             # Get view type from query parameter
             view_type = request.args.get('view', 'pasien')
             
             return render_template('main_table.html',
-                                 current_user=user,
-                                 user_session=user_session,
+                                 current_user=g.user_session,
+                                 user_session=g.user_session,
                                  view_type=view_type)
         
         @self.app.route('/auth/login', methods=['POST'])
@@ -415,6 +407,8 @@ class WebRoutes:
                         )
                     
                     db.session.commit()
+                
+                session_cache.invalidate_token(session_token)
             
             # Clear session
             session.clear()
@@ -427,29 +421,21 @@ class WebRoutes:
         @self.app.route('/upload', methods=['POST'])
         @self.api_login_required
         def upload_file():
-            # Get user info from session (already validated by login_required decorator)
+            """Save the uploaded file and queue it for background processing"""
+            # Get user info from session (already validated by api_login_required decorator)
             user_id = session.get('user_id')
-            session_token = session.get('session_token')
             
             # Check if user has permission to upload (not viewer)
-            current_user = User.query.get(user_id)
-            if current_user and current_user.role == 'viewer':
-                return render_template('index.html', table_html="", has_data=False, 
-                                     error="Akses ditolak. Role viewer tidak dapat mengupload data.")
-            
-            # Get current user session for logging
-            user_session = UserSession.query.filter_by(
-                user_id=user_id,
-                session_token=session_token,
-                is_active=True
-            ).first()
+            if g.user_session.role == 'viewer':
+                return jsonify({
+                    'success': False,
+                    'error': 'Akses ditolak. Role viewer tidak dapat mengupload data.'
+                }), 403
 
-            if 'file' not in request.files:
-                return redirect(url_for('index'))
+            if 'file' not in request.files or request.files['file'].filename == '':
+                return jsonify({'success': False, 'error': 'No file selected'}), 400
 
             file = request.files['file']
-            if file.filename == '':
-                return redirect(url_for('index'))
 
             # Get client info
             ip_address = request.remote_addr
@@ -458,23 +444,26 @@ class WebRoutes:
             # Validate file
             is_valid, error = self.data_handler.validate_file(file.filename)
             if not is_valid:
-                return render_template('index.html', table_html="", has_data=False, error=error)
+                return jsonify({'success': False, 'error': error}), 400
 
             try:
                 # Save the uploaded file
-                filepath, error = self.data_handler.save_uploaded_file(file, self.app.config['UPLOAD_FOLDER'])
+                filepath, error = self.data_handler.save_uploaded_file(file, self.upload_jobs.spool_folder)
                 if error:
-                    return render_template('index.html', table_html="", has_data=False, error=error)
-
-                # Process file dengan upload service yang baru
-                upload_result = self.upload_service.process_upload(filepath, user_id)
+                    return jsonify({'success': False, 'error': error}), 400
 
-                # Upload service sudah menangani logging, jadi kita tidak perlu update upload_log lagi
+                # Queue the file; the worker runs the upload pipeline, logs progress
+                # to upload_logs and removes the file when it is done
+                job = self.upload_jobs.submit(filepath, user_id, ip_address, user_agent,
+                                              filename=os.path.basename(file.filename))
+                if not job['success']:
+                    self.data_handler.cleanup_file(filepath)
+                    return jsonify({'success': False, 'error': job.get('error', 'Upload gagal')}), 500
 
                 # Log upload activity
-                user = User.query.get(user_id)
-                if user:
-                    user.log_activity(
+                current_user = User.query.get(user_id)
+                if current_user:
+                    current_user.log_activity(
                         activity_type='upload',
                         description=f'Uploaded file: {file.filename}',
                         table_affected='data_analytics',
@@ -482,42 +471,63 @@ class WebRoutes:
                         user_agent=user_agent
                     )
 
-                # Clean up the uploaded file
-                self.data_handler.cleanup_file(filepath)
-
-                if not upload_result['success']:
-                    return render_template('index.html', table_html="", has_data=False, error=upload_result.get('error', 'Upload gagal'))
+                return jsonify({
+                    'success': True,
+                    'job_id': job['job_id'],
+                    'status': job['status'],
+                    'status_url': url_for('upload_status', job_id=job['job_id'])
+                }), 202
 
-                # Get database stats
-                from core.database_query_service import DatabaseQueryService
-                db_query_service = DatabaseQueryService()
-                db_stats = db_query_service.get_database_stats()
+            except Exception as e:
+                return jsonify({'success': False, 'error': f"Error processing file: {str(e)}"}), 500
+        
+        @self.app.route('/upload/<int:job_id>/status')
+        @self.api_login_required
+        def upload_status(job_id):
+            """Get status and progress of a queued upload job"""
+            job = self.upload_jobs.get_status(job_id)
+            
+            # Users can only poll their own uploads, admins can poll any upload
+            user_id = session.get('user_id')
+            if job and job['user_id'] != user_id and g.user_session.role != 'admin':
+                job = None
+            
+            if not job:
+                return jsonify({'success': False, 'error': 'Upload job not found'}), 404
+            
+            return jsonify({'success': True, 'job': job})
 
-                # Show success message with upload stats
-                success_message = upload_result.get('message', 'Data processed successfully')
+        @self.app.route('/health/live')
+        def health_live():
+            """Liveness probe: the worker process is serving requests"""
+            return jsonify({'status': 'alive', 'pid': os.getpid()})
 
-                # Prepare clean upload result for template (remove non-serializable objects)
-                clean_upload_result = {
-                    'success': upload_result.get('success', False),
-                    'rows_success': upload_result.get('rows_success', 0),
-                    'rows_failed': upload_result.get('rows_failed', 0),
-                    'total_rows': upload_result.get('total_rows', 0),
-                    'message': upload_result.get('message', '')
-                }
-                
-                return render_template('index.html',
-                                     table_html="",
-                                     has_data=True,
-                                     success_message=success_message,
-                                     upload_result=clean_upload_result,
-                                     db_stats=db_stats)
+        @self.app.route('/health/ready')
+        def health_ready():
+            """
+            Readiness probe: the worker can reach the database
 
+            Returns 503 while the database is unreachable so a load balancer or
+            orchestrator stops routing traffic to this worker. The worker pid lets
+            load tests see how requests are spread over the worker processes.
+            """
+            try:
+                db.session.execute(text('SELECT 1'))
             except Exception as e:
-                return render_template('index.html', table_html="", has_data=False, error=f"Error processing file: {str(e)}")
-        
+                db.session.rollback()
+                logger.error(f"Readiness check failed: {e}")
+                return jsonify({'status': 'unavailable', 'pid': os.getpid(), 'error': 'database unreachable'}), 503
+
+            return jsonify({'status': 'ready', 'pid': os.getpid()})
+
         @self.app.route('/api/data/<view_type>')
         def get_data_api(view_type):
-            """API endpoint untuk mengambil data dalam bentuk JSON"""
+            """
+            API endpoint untuk mengambil data dalam bentuk JSON kolom (satu halaman)
+            
+            Parameter sama dengan /<view>/page. Response: columns, dtypes, values
+            (satu array per kolom), currency_columns, total dan state sort/paginasi.
+            """
             try:
                 if not self.data_handler.has_data():
                     return jsonify({"error": "No data available"}), 400
@@ -526,20 +536,47 @@ class WebRoutes:
                 if not handler:
                     return jsonify({"error": f"Handler {view_type} not found"}), 400
                 
-                # Get table HTML
-                table_html, error = handler.get_table()
+                page_data, error = handler.get_columnar_page(
+                    page=request.args.get('page', 1, type=int),
+                    per_page=request.args.get('per_page', 100, type=int),
+                    sort_column=request.args.get('sort_column'),
+                    sort_order=request.args.get('sort_order', 'ASC'),
+                    start_date=request.args.get('start_date'),
+                    end_date=request.args.get('end_date'),
+                    filter_column=request.args.get('filter_column'),
+                    filter_value=request.args.get('filter_value')
+                )
                 if error:
                     return jsonify({"error": error}), 400
                 
                 return jsonify({
                     "success": True,
-                    "table_html": table_html,
-                    "view_type": view_type
+                    "view_type": view_type,
+                    **page_data
                 })
                 
             except Exception as e:
                 return jsonify({"error": str(e)}), 500
         
+        @self.app.route('/search')
+        @self.api_login_required
+        def search():
+            """Patient search by MRN or name (JSON, ranked and limited)"""
+            from core.database_query_service import DatabaseQueryService
+            
+            search_term = request.args.get('q', '').strip()
+            limit = request.args.get('limit', 10, type=int)
+            if not search_term:
+                return jsonify({'success': False, 'error': 'Parameter q is required'}), 400
+            
+            results = DatabaseQueryService().search_pasien(search_term, limit)
+            return jsonify({
+                'success': True,
+                'query': search_term,
+                'count': len(results),
+                'results': results
+            })
+        
         @self.app.route('/processing-info')
         def processing_info():
             """Get database statistics"""
@@ -547,28 +584,16 @@ class WebRoutes:
             
             try:
                 db_query_service = DatabaseQueryService()
+                # Row counts and upload log info come from the cached stats
                 stats = db_query_service.get_database_stats()
                 
-                # Get upload logs count
-                upload_count = UploadLog.query.filter_by(status='success').count()
-                
-                # Get LAST upload data (not cumulative)
-                last_upload = UploadLog.query.filter_by(status='success').order_by(UploadLog.upload_time.desc()).first()
-                
-                if last_upload:
-                    last_rows_success = last_upload.rows_success or 0
-                    last_rows_failed = last_upload.rows_failed or 0
-                else:
-                    last_rows_success = 0
-                    last_rows_failed = 0
-                
                 return jsonify({
                     'success': True,
-                    'has_data': stats.get('total_rows', 0) > 0,
+                    'has_data': stats.get('has_data', False),
                     'total_rows': stats.get('total_rows', 0),
-                    'upload_count': upload_count,
-                    'rows_success': int(last_rows_success),  # Last upload only
-                    'rows_failed': int(last_rows_failed),    # Last upload only
+                    'upload_count': stats.get('upload_count', 0),
+                    'rows_success': int(stats.get('last_upload_rows_success', 0)),  # Last upload only
+                    'rows_failed': int(stats.get('last_upload_rows_failed', 0)),    # Last upload only
                     'stats': stats
                 })
             except Exception as e:
@@ -589,6 +614,8 @@ class WebRoutes:
                 
                 # Clear all tables
                 result = clear_all_tables()
+                stats_cache.invalidate()
+                SnapshotCache().clear()
                 if result:
                     return jsonify({"message": "All database data cleared successfully"})
                 else:
@@ -634,6 +661,10 @@ class WebRoutes:
         def keuangan_specific_filter():
             return self._handle_specific_filter_route('financial')
         
+        @self.app.route('/keuangan/page')
+        def keuangan_page():
+            return self._handle_page_route('financial')
+        
         # Patient routes
         @self.app.route('/pasien')
         def pasien():
@@ -655,6 +686,10 @@ class WebRoutes:
         def pasien_specific_filter():
             return self._handle_specific_filter_route('patient')
         
+        @self.app.route('/pasien/page')
+        def pasien_page():
+            return self._handle_page_route('patient')
+        
         # Selisih Tarif routes
         @self.app.route('/selisih-tarif')
         def selisih_tarif():
@@ -676,6 +711,10 @@ class WebRoutes:
         def selisih_tarif_specific_filter():
             return self._handle_specific_filter_route('selisih_tarif')
         
+        @self.app.route('/selisih-tarif/page')
+        def selisih_tarif_page():
+            return self._handle_page_route('selisih_tarif')
+        
         # LOS routes
         @self.app.route('/los')
         def los():
@@ -697,6 +736,10 @@ class WebRoutes:
         def los_specific_filter():
             return self._handle_specific_filter_route('los')
         
+        @self.app.route('/los/page')
+        def los_page():
+            return self._handle_page_route('los')
+        
         # INACBG routes
         @self.app.route('/inacbg')
         def inacbg():
@@ -718,6 +761,10 @@ class WebRoutes:
         def inacbg_specific_filter():
             return self._handle_specific_filter_route('inacbg')
         
+        @self.app.route('/inacbg/page')
+        def inacbg_page():
+            return self._handle_page_route('inacbg')
+        
         # Ventilator routes
         @self.app.route('/ventilator')
         def ventilator():
@@ -738,6 +785,16 @@ class WebRoutes:
         @self.app.route('/ventilator/specific-filter')
         def ventilator_specific_filter():
             return self._handle_specific_filter_route('ventilator')
+        
+        @self.app.route('/ventilator/page')
+        def ventilator_page():
+            return self._handle_page_route('ventilator')
+        
+        # Export routes for every view: /keuangan/export, /pasien/export, ...
+        @self.app.route('/<view_name>/export')
+        @self.login_required
+        def export_view(view_name):
+            return self._handle_export_route(view_name)
     
     def _get_handler(self, handler_name: str):
         """Get handler by name"""
@@ -788,7 +845,7 @@ class WebRoutes:
         if not sort_column:
             return jsonify({"error": "Column parameter is required"}), 400
         
-        table_html, error = handler.get_table(sort_column, sort_order)
+        table_html, error = handler.get_table(sort_column, sort_order, page=request.args.get('page', 1, type=int))
         
         if error:
             return jsonify({"error": error}), 400
@@ -819,7 +876,8 @@ class WebRoutes:
             start_date=start_date,
             end_date=end_date,
             filter_column=filter_column,
-            filter_value=filter_value
+            filter_value=filter_value,
+            page=request.args.get('page', 1, type=int)
         )
         
         if error:
@@ -833,8 +891,13 @@ class WebRoutes:
         if not handler:
             return jsonify({"error": f"Handler {handler_name} not found"}), 400
         
-        columns = handler.get_columns()
-        return jsonify({"columns": columns})
+        try:
+            schema = handler.get_output_schema()
+        except Exception as e:
+            logger.error(f"Error getting {handler_name} columns: {e}", exc_info=True)
+            return jsonify({"columns": handler.required_columns})
+        
+        return jsonify({"columns": [column['name'] for column in schema], "schema": schema})
     
     def _handle_specific_filter_route(self, handler_name: str):
         """Handle specific filter route with flexible filtering"""
@@ -852,21 +915,85 @@ class WebRoutes:
         sort_order = request.args.get('sort_order', 'ASC')
         start_date = request.args.get('start_date')
         end_date = request.args.get('end_date')
+        page = request.args.get('page', 1, type=int)
         
         # Check if specific filter is provided
         if filter_column and filter_value:
             table_html, error = handler.get_table_with_specific_filter(
-                filter_column, filter_value, sort_column, sort_order, start_date, end_date
+                filter_column, filter_value, sort_column, sort_order, start_date, end_date, page
             )
         else:
             # Fallback to regular filter if no specific filter provided
-            table_html, error = handler.get_table(sort_column, sort_order, start_date, end_date)
+            table_html, error = handler.get_table(sort_column, sort_order, start_date, end_date, page=page)
         
         if error:
             return jsonify({"error": error}), 400
         
         return jsonify({"table_html": table_html})
     
+    def _handle_page_route(self, handler_name: str):
+        """Handle paginated JSON route - filtering, sorting and paging are done in SQL"""
+        handler = self._get_handler(handler_name)
+        if not handler:
+            return jsonify({"error": f"Handler {handler_name} not found"}), 400
+        
+        page = request.args.get('page', 1, type=int)
+        per_page = request.args.get('per_page', 100, type=int)
+        
+        page_data, error = handler.get_page(
+            page=page,
+            per_page=per_page,
+            sort_column=request.args.get('sort_column'),
+            sort_order=request.args.get('sort_order', 'ASC'),
+            start_date=request.args.get('start_date'),
+            end_date=request.args.get('end_date'),
+            filter_column=request.args.get('filter_column'),
+            filter_value=request.args.get('filter_value')
+        )
+        
+        if error:
+            return jsonify({"error": error}), 400
+        
+        return jsonify({"success": True, **page_data})
+    
+    def _handle_export_route(self, view_name: str):
+        """Handle streaming export route (CSV, XLSX or Parquet) with the same filters as the filter route"""
+        handler = self._get_handler(view_name)
+        if not handler:
+            return jsonify({"error": f"View {view_name} not found"}), 404
+        
+        export_format = request.args.get('format', 'csv').lower()
+        if export_format not in EXPORT_FORMATS:
+            return jsonify({"error": f"Unsupported export format: {export_format}"}), 400
+        if export_format == 'parquet' and not PYARROW_AVAILABLE:
+            return jsonify({"error": "Parquet export requires pyarrow"}), 400
+        
+        batches = handler.iter_export_batches(
+            sort_column=request.args.get('sort_column'),
+            sort_order=request.args.get('sort_order', 'ASC'),
+            start_date=request.args.get('start_date'),
+            end_date=request.args.get('end_date'),
+            filter_column=request.args.get('filter_column'),
+            filter_value=request.args.get('filter_value')
+        )
+        
+        writer, mimetype = EXPORT_FORMATS[export_format]
+        filename = f"{HandlerRegistry.get_view_name(view_name)}_{jakarta_now().strftime('%Y%m%d_%H%M%S')}.{export_format}"
+        
+        def generate():
+            try:
+                yield from writer(batches)
+            except Exception as e:
+                # Headers are already sent; the client receives a truncated file
+                logger.error(f"Error exporting {view_name} as {export_format}: {e}", exc_info=True)
+                raise
+        
+        return Response(
+            stream_with_context(generate()),
+            mimetype=mimetype,
+            headers={'Content-Disposition': f'attachment; filename="{filename}"'}
+        )
+    
     def _register_admin_routes(self):
         """Register admin-specific routes"""
         
@@ -875,10 +1002,7 @@ class WebRoutes:
         def admin_get_users():
             """Get all users for admin management"""
             # Check if current user is admin
-            user_id = session.get('user_id')
-            current_user = User.query.get(user_id)
-            
-            if not current_user or current_user.role != 'admin':
+            if g.user_session.role != 'admin':
                 return jsonify({
                     'success': False,
                     'message': 'Access denied. Admin only.'
@@ -911,15 +1035,15 @@ class WebRoutes:
             """Reset user password"""
             # Check if current user is admin
             current_user_id = session.get('user_id')
-            current_user = User.query.get(current_user_id)
             
-            if not current_user or current_user.role != 'admin':
+            if g.user_session.role != 'admin':
                 return jsonify({
                     'success': False,
                     'message': 'Access denied. Admin only.'
                 }), 403
             
             try:
+                current_user = User.query.get(current_user_id)
                 target_user = User.query.get(user_id)
                 if not target_user:
                     return jsonify({
@@ -946,6 +1070,7 @@ class WebRoutes:
                 )
                 
                 db.session.commit()
+                session_cache.invalidate_user(user_id)
                 
                 return jsonify({
                     'success': True,
@@ -966,15 +1091,15 @@ class WebRoutes:
             """Delete user (soft delete)"""
             # Check if current user is admin
             current_user_id = session.get('user_id')
-            current_user = User.query.get(current_user_id)
             
-            if not current_user or current_user.role != 'admin':
+            if g.user_session.role != 'admin':
                 return jsonify({
                     'success': False,
                     'message': 'Access denied. Admin only.'
                 }), 403
             
             try:
+                current_user = User.query.get(current_user_id)
                 target_user = User.query.get(user_id)
                 if not target_user:
                     return jsonify({
@@ -1003,6 +1128,7 @@ class WebRoutes:
                 )
                 
                 db.session.commit()
+                session_cache.invalidate_user(user_id)
                 
                 return jsonify({
                     'success': True,
@@ -1016,6 +1142,46 @@ class WebRoutes:
                     'message': f'Error: {str(e)}'
                 }), 500
         
+        @self.app.route('/admin/uploads/stages', methods=['GET'])
+        @self.app.route('/admin/uploads/<int:upload_id>/stages', methods=['GET'])
+        @self.api_login_required
+        def admin_upload_stages(upload_id=None):
+            """Get per-stage timing, row counts and peak RSS growth of recent uploads (or one upload)"""
+            if g.user_session.role != 'admin':
+                return jsonify({
+                    'success': False,
+                    'message': 'Access denied. Admin only.'
+                }), 403
+            
+            limit = min(max(request.args.get('limit', 20, type=int), 1), 200)
+            uploads = self.upload_service.get_stage_metrics(upload_id, limit)
+            if upload_id is not None and not uploads:
+                return jsonify({
+                    'success': False,
+                    'message': 'Upload not found'
+                }), 404
+            
+            return jsonify({
+                'success': True,
+                'uploads': uploads
+            })
+        
+        @self.app.route('/admin/session-cache', methods=['GET'])
+        @self.api_login_required
+        def admin_session_cache_stats():
+            """Get hit/miss counters of the session validation cache (this worker process)"""
+            if g.user_session.role != 'admin':
+                return jsonify({
+                    'success': False,
+                    'message': 'Access denied. Admin only.'
+                }), 403
+            
+            return jsonify({
+                'success': True,
+                'pid': os.getpid(),
+                'session_cache': session_cache.stats()
+            })
+        
         @self.app.route('/admin/registration-codes', methods=['GET'])
         @self.api_login_required
         def admin_get_registration_codes():
@@ -669,134 +669,52 @@ function handleFileUpload(event) {
     }
 }
 
+// Interval between upload job status requests (ms)
+const UPLOAD_POLL_INTERVAL = 1500;
+
+// Stop polling when the job status and row count have not changed for this long (ms)
+const UPLOAD_POLL_STALL_TIMEOUT = 10 * 60 * 1000;
+
 // Function to handle form submission and preserve data
 function handleFormSubmit(event) {
     event.preventDefault();
     
-    const formData = new FormData(event.target);
+    const form = event.target;
+    const formData = new FormData(form);
     const uploadBtn = document.getElementById('uploadBtn');
     
     // Show loading state
-    uploadBtn.textContent = 'Processing...';
+    uploadBtn.textContent = 'Uploading...';
     uploadBtn.disabled = true;
     
+    // The server saves the file, queues it and answers with a job id right away
     fetch('/upload', {
         method: 'POST',
         body: formData
     })
-    .then(response => response.text())
-    .then(html => {
-        // Parse the HTML response to extract table data
-        const parser = new DOMParser();
-        const doc = parser.parseFromString(html, 'text/html');
-        
-        // Check if there's success message or table data in the response
-        const successMessage = doc.querySelector('.alert-success');
-        const tableContainer = doc.querySelector('.table-container');
-        const errorMessage = doc.querySelector('.alert-danger');
-        
-        // Also check for upload_result data attribute
-        const importStatsElement = doc.querySelector('[data-import-stats]');
-        let hasUploadData = false;
-        if (importStatsElement) {
-            try {
-                const stats = JSON.parse(importStatsElement.getAttribute('data-import-stats'));
-                hasUploadData = stats && (stats.rows_success > 0 || stats.total_rows > 0);
-            } catch (e) {
-                console.log('Could not parse import stats');
-            }
+    .then(response => response.json())
+    .then(data => {
+        if (!data.success) {
+            throw new Error(data.error || data.message || 'Upload failed');
         }
         
-        if (successMessage) {
-            // Success message found - upload was successful
-            console.log('Upload successful - success message found');
-        } else if (tableContainer && tableContainer.innerHTML.trim() !== '' && !tableContainer.innerHTML.includes('Data Belum Tersedia')) {
-            // Table data found - upload was successful
-            console.log('Upload successful - table data found');
-        } else if (hasUploadData) {
-            // Upload data found in stats
-            console.log('Upload successful - upload stats found');
-        } else {
-            // No success indicators found
-            console.log('Upload failed - no success indicators found');
-        }
-        
-        if (successMessage || hasUploadData || (tableContainer && tableContainer.innerHTML.trim() !== '' && !tableContainer.innerHTML.includes('Data Belum Tersedia'))) {
-            // Extract table HTML if available
-            const tableHtml = tableContainer ? tableContainer.innerHTML : '';
-            
-            // Update all view states with the uploaded data
-            updateViewState('keuangan', { 
-                tableHtml: tableHtml, 
-                hasData: true,
-                filters: { ...viewStates.keuangan.filters }
-            });
-            
-            updateViewState('pasien', { 
-                tableHtml: tableHtml, 
-                hasData: true,
-                filters: { ...viewStates.pasien.filters }
-            });
-            
-            updateViewState('selisih-tarif', { 
-                tableHtml: tableHtml, 
-                hasData: true,
-                filters: { ...viewStates['selisih-tarif'].filters }
-            });
-            
-            updateViewState('los', { 
-                tableHtml: tableHtml, 
-                hasData: true,
-                filters: { ...viewStates['los'].filters }
-            });
-            
-            updateViewState('inacbg', { 
-                tableHtml: tableHtml, 
-                hasData: true,
-                filters: { ...viewStates['inacbg'].filters }
-            });
-            
-            updateViewState('ventilator', { 
-                tableHtml: tableHtml, 
-                hasData: true,
-                filters: { ...viewStates['ventilator'].filters }
-            });
-            
-            // Update data management info
-            updateDataManagementInfo();
-            
-            // Extract import stats from response if available (already found above)
-            if (importStatsElement) {
-                try {
-                    const importStats = JSON.parse(importStatsElement.getAttribute('data-import-stats'));
-                    updateDataStatusAfterUpload({summary: importStats});
-                } catch (e) {
-                    console.log('Could not parse import stats');
-                }
-            }
-            
-            // Show success message
-            if (successMessage) {
-                notificationSystem.success('File uploaded and processed successfully!', 'Success');
-            } else {
-                notificationSystem.success('File uploaded and accumulated successfully!', 'Success');
-            }
-            
-        } else if (errorMessage) {
-            // Show error message
-            notificationSystem.error(errorMessage.textContent.trim(), 'Error');
-        } else {
-            notificationSystem.warning('No data found in file.', 'No Data');
-        }
-        
-        // Reset form
-        event.target.reset();
+        // Reset form while the file is processed in the background
+        form.reset();
         document.getElementById('fileInfo').textContent = 'No file selected.';
         document.getElementById('fileInfo').style.color = '#555';
+        
+        uploadBtn.textContent = 'Processing...';
+        return pollUploadStatus(data.job_id, uploadBtn);
+    })
+    .then(job => {
+        if (job.status !== 'success') {
+            throw new Error(job.error_message || 'Upload failed');
+        }
+        handleUploadSuccess(job);
     })
     .catch(error => {
         console.error('Error uploading file:', error);
-        notificationSystem.error('Upload failed. Please try again.', 'Error');
+        notificationSystem.error(error.message || 'Upload failed. Please try again.', 'Error');
     })
     .finally(() => {
         // Restore button state
@@ -805,6 +723,78 @@ function handleFormSubmit(event) {
     });
 }
 
+// Poll the upload job status until the job is finished or stops making progress
+function pollUploadStatus(jobId, uploadBtn) {
+    return new Promise((resolve, reject) => {
+        let lastProgress = null;
+        let lastProgressAt = Date.now();
+        
+        const poll = () => {
+            fetch(`/upload/${jobId}/status`)
+                .then(response => response.json())
+                .then(data => {
+                    if (!data.success) {
+                        reject(new Error(data.error || 'Upload job not found'));
+                        return;
+                    }
+                    
+                    const job = data.job;
+                    if (job.done) {
+                        resolve(job);
+                        return;
+                    }
+                    
+                    const progress = `${job.status}:${job.rows_processed}`;
+                    if (progress !== lastProgress) {
+                        lastProgress = progress;
+                        lastProgressAt = Date.now();
+                    } else if (Date.now() - lastProgressAt > UPLOAD_POLL_STALL_TIMEOUT) {
+                        reject(new Error(`Upload job ${jobId} has not made progress for ` +
+                            `${UPLOAD_POLL_STALL_TIMEOUT / 60000} minutes. Check the upload history later.`));
+                        return;
+                    }
+                    
+                    // Show progress while the job is queued or running
+                    if (job.status === 'queued') {
+                        uploadBtn.textContent = 'Queued...';
+                    } else if (job.rows_processed > 0) {
+                        uploadBtn.textContent = `Processing... (${job.rows_processed} rows)`;
+                    } else {
+                        uploadBtn.textContent = 'Processing...';
+                    }
+                    setTimeout(poll, UPLOAD_POLL_INTERVAL);
+                })
+                .catch(reject);
+        };
+        poll();
+    });
+}
+
+// Update view states and data info after an upload job finished successfully
+function handleUploadSuccess(job) {
+    ['keuangan', 'pasien', 'selisih-tarif', 'los', 'inacbg', 'ventilator'].forEach(viewType => {
+        updateViewState(viewType, {
+            tableHtml: '',
+            hasData: true,
+            filters: { ...viewStates[viewType].filters }
+        });
+    });
+    
+    // Update data management info
+    updateDataManagementInfo();
+    updateDataStatusAfterUpload({
+        rows_success: job.rows_success,
+        rows_failed: job.rows_failed,
+        total_rows: job.rows_processed
+    });
+    
+    if (job.rows_success > 0) {
+        notificationSystem.success(`File processed: ${job.rows_success} rows uploaded, ${job.rows_failed} duplicate rows.`, 'Success');
+    } else {
+        notificationSystem.warning(`No new data uploaded: ${job.rows_failed} duplicate rows.`, 'No Data');
+    }
+}
+
 // Generic function to load data view (keuangan, pasien, selisih-tarif, or los)
 function loadDataView(viewType) {
     const content = document.getElementById(viewType);
@@ -1309,6 +1299,57 @@ function loadFilterColumns(viewType) {
         });
 }
 
+// Load another page of a server-rendered table, keeping the view's current filters
+function loadTablePage(viewType, page) {
+    const filters = viewStates[viewType].filters;
+    const params = new URLSearchParams();
+    if (filters.startDate) params.append('start_date', filters.startDate);
+    if (filters.endDate) params.append('end_date', filters.endDate);
+    if (filters.sortColumn) params.append('sort_column', filters.sortColumn);
+    if (filters.sortOrder) params.append('sort_order', filters.sortOrder);
+    if (filters.filterColumn && filters.filterValue) {
+        params.append('filter_column', filters.filterColumn);
+        params.append('filter_value', filters.filterValue);
+    }
+    params.append('page', page);
+    
+    const tableContainer = document.querySelector(`#${viewType} .table-container`);
+    if (tableContainer) {
+        showTableSkeleton(tableContainer);
+    }
+    
+    fetch(`/${viewType}/filter?${params.toString()}`)
+        .then(response => response.json())
+        .then(data => {
+            if (data.error) {
+                notificationSystem.error('Error: ' + data.error, 'Error');
+                return;
+            }
+            
+            if (tableContainer && data.table_html) {
+                tableContainer.innerHTML = data.table_html;
+                tableContainer.scrollTop = 0;
+                updateViewState(viewType, { tableHtml: data.table_html, hasData: true });
+            }
+        })
+        .catch(error => {
+            console.error(`Error loading ${viewType} page ${page}:`, error);
+            notificationSystem.error('Loading page failed. Please try again.', 'Error');
+        });
+}
+
+// Previous/next buttons rendered below every table page by the server
+document.addEventListener('click', (event) => {
+    const button = event.target.closest('.table-pagination button[data-page]');
+    if (!button || button.disabled) return;
+    
+    const card = button.closest('.table-card');
+    const viewType = card && card.parentElement ? card.parentElement.id : null;
+    if (viewType && viewStates[viewType]) {
+        loadTablePage(viewType, parseInt(button.dataset.page, 10));
+    }
+});
+
 // Function to update view state
 function updateViewState(viewType, updates) {
     viewStates[viewType] = { ...viewStates[viewType], ...updates };
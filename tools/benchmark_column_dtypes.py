@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Benchmark registry dtype kolom DataAnalytics (tanpa database)
+
+Membuat DataFrame sintetis dengan kolom view analisa dalam tipe lama (teks
+sebagai string, integer dengan NULL sebagai float64), lalu membandingkan memori
+dan waktu operasi yang dipakai handler sebelum dan sesudah apply_column_dtypes:
+group-by per INACBG, isin, value_counts, filter kelas rawat dan sort.
+
+Contoh:
+    python tools/benchmark_column_dtypes.py --rows 500000
+"""
+import argparse
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+# Add src to path
+sys.path.append('src')
+
+from core.column_dtypes import apply_column_dtypes
+
+# Jumlah nilai unik per kolom teks (kira-kira seperti data E-Klaim satu rumah sakit)
+TEXT_CARDINALITY = {
+    'KELAS_RAWAT': 3, 'KODE_TARIF': 4, 'INACBG': 900, 'DESKRIPSI_INACBG': 900,
+    'DPJP': 150, 'PAYOR_ID': 5, 'VERSI_INACBG': 3, 'VERSI_GROUPER': 3
+}
+
+# Kolom integer: (nilai maksimum, bagian baris NULL)
+INTEGER_COLUMNS = {
+    'SEX': (2, 0.0), 'DISCHARGE_STATUS': (5, 0.0), 'LOS': (60, 0.01), 'ICU_LOS': (30, 0.8),
+    'VENT_HOUR': (500, 0.9), 'UMUR_TAHUN': (99, 0.0)
+}
+
+AMOUNT_COLUMNS = ['TOTAL_TARIF', 'TARIF_RS', 'TARIF_INACBG', 'OBAT', 'LABORATORIUM', 'RADIOLOGI']
+
+
+def build_frame(rows, seed=42):
+    """DataFrame sintetis dengan tipe seperti hasil read_csv/query sebelum registry"""
+    rng = np.random.default_rng(seed)
+    data = {'SEP': pd.Series([f"0224R{n:014d}" for n in range(rows)], dtype='str')}
+    for col, cardinality in TEXT_CARDINALITY.items():
+        labels = np.array([f"{col[:4]}-{n}" for n in range(cardinality)], dtype=object)
+        data[col] = pd.Series(labels[rng.integers(0, cardinality, rows)], dtype='str')
+    for col, (maximum, null_share) in INTEGER_COLUMNS.items():
+        values = rng.integers(0, maximum + 1, rows).astype('float64')
+        values[rng.random(rows) < null_share] = np.nan
+        data[col] = values
+    for col in AMOUNT_COLUMNS:
+        data[col] = rng.integers(0, 50_000_000, rows).astype('float64')
+    return pd.DataFrame(data)
+
+
+def best_time(func, repeat=5):
+    """Waktu terbaik (detik) dari beberapa kali eksekusi"""
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+OPERATIONS = {
+    'groupby INACBG (count, mean LOS, sum tarif)': lambda df: df.groupby('INACBG', observed=True).agg(
+        jumlah=('SEP', 'count'), rata_los=('LOS', 'mean'), total_tarif=('TOTAL_TARIF', 'sum')),
+    'groupby DPJP + KELAS_RAWAT sum tarif': lambda df: df.groupby(
+        ['DPJP', 'KELAS_RAWAT'], observed=True)['TARIF_RS'].sum(),
+    'isin INACBG (50 codes)': lambda df: df['INACBG'].isin([f"INAC-{n}" for n in range(0, 500, 10)]).sum(),
+    'value_counts PAYOR_ID': lambda df: df['PAYOR_ID'].value_counts(),
+    'filter KELAS_RAWAT == value': lambda df: df[df['KELAS_RAWAT'] == 'KELA-1'],
+    'sort by DESKRIPSI_INACBG': lambda df: df.sort_values('DESKRIPSI_INACBG'),
+}
+
+
+def run_benchmark(rows=500000, repeat=5):
+    """
+    Bandingkan memori dan waktu operasi sebelum/sesudah registry dtype
+
+    Returns:
+        Dict dengan memori sebelum/sesudah (bytes) dan waktu per operasi
+    """
+    print(f"Building {rows} row frame...")
+    before = build_frame(rows)
+
+    started = time.perf_counter()
+    after = apply_column_dtypes(before)
+    convert_time = time.perf_counter() - started
+
+    memory_before = int(before.memory_usage(deep=True).sum())
+    memory_after = int(after.memory_usage(deep=True).sum())
+    print(f"apply_column_dtypes: {convert_time:.3f}s")
+    print(f"Memory (deep): {memory_before / 1e6:.1f} MB -> {memory_after / 1e6:.1f} MB "
+          f"({memory_before / memory_after:.1f}x smaller)")
+
+    changed = [f"{col}: {before[col].dtype} -> {after[col].dtype}"
+               for col in before.columns if before[col].dtype != after[col].dtype]
+    print(f"Converted columns ({len(changed)}): {', '.join(changed)}")
+
+    timings = {}
+    print(f"\n  {'operation':<46} {'before':>9} {'after':>9} {'speedup':>8}")
+    for name, operation in OPERATIONS.items():
+        time_before = best_time(lambda: operation(before), repeat)
+        time_after = best_time(lambda: operation(after), repeat)
+        timings[name] = (time_before, time_after)
+        print(f"  {name:<46} {time_before * 1000:>7.1f}ms {time_after * 1000:>7.1f}ms "
+              f"{time_before / time_after:>7.1f}x")
+
+    return {
+        'memory_before': memory_before,
+        'memory_after': memory_after,
+        'timings': timings
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Benchmark the DataAnalytics dtype registry')
+    parser.add_argument('--rows', type=int, default=500000, help='Rows in the synthetic view frame')
+    parser.add_argument('--repeat', type=int, default=5, help='Runs per operation (best time is reported)')
+    args = parser.parse_args()
+
+    run_benchmark(args.rows, args.repeat)
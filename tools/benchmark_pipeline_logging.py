@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+Benchmark overhead logging pipeline upload (tanpa database)
+
+Membandingkan pola logging lama dan baru pada data sintetis, masing-masing
+dengan level INFO/DEBUG mati (default produksi: WARNING) dan hidup (handler
+menulis ke os.devnull sehingga biaya format pesan ikut terhitung):
+
+- hasil akhir upload: f-string dict final_result (berisi daftar SEP duplikat)
+  vs log_event dengan ringkasan terbatas
+- cek duplikat database RobustDataExtractor: loop iterrows dengan satu log INFO
+  per baris vs mask tervektorisasi dengan satu event ringkasan
+- convert_date_columns: sample DEBUG hanya dibentuk jika DEBUG aktif
+
+Contoh:
+    python tools/benchmark_pipeline_logging.py --rows 100000
+"""
+import argparse
+import logging
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+# Add src to path
+sys.path.append('src')
+
+from core.robust_data_extractor import RobustDataExtractor
+from utils.log_utils import log_event
+
+upload_logger = logging.getLogger('core.upload_service')
+extractor_logger = logging.getLogger('core.robust_data_extractor')
+
+
+def build_frame(rows, duplicate_ratio, seed=42):
+    """DataFrame sintetis dengan SEP dan kolom tanggal berupa serial Excel"""
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({'SEP': pd.Series([f"0224R{n:014d}" for n in range(rows)], dtype='str')})
+    admission = rng.integers(44927, 45657, rows)
+    df['ADMISSION_DATE'] = admission
+    df['DISCHARGE_DATE'] = admission + rng.integers(0, 14, rows)
+    df['BIRTH_DATE'] = rng.integers(10000, 44000, rows)
+    existing_seps = set(df['SEP'].iloc[:int(rows * duplicate_ratio)])
+    return df, existing_seps
+
+
+def build_final_result(df, existing_seps):
+    """final_result upload seperti UploadService, dengan detail duplikat per SEP"""
+    seps = df['SEP'].tolist()
+    return {
+        'success': True,
+        'rows_success': len(df) - len(existing_seps),
+        'rows_failed': len(existing_seps),
+        'total_rows': len(df),
+        'file_info': {'filename': 'eklaim.txt', 'file_type': 'txt', 'file_size': len(df) * 900},
+        'extraction_info': {'success': True, 'columns': list(df.columns), 'rows_extracted': len(df)},
+        'duplicate_result': {
+            'internal_duplicate_seps': [],
+            'database_duplicate_seps': sorted(existing_seps),
+            'new_seps': seps
+        },
+        'stages': [{'stage': name, 'wall_time_seconds': 0.1} for name in ('analyze', 'extract', 'ingest')]
+    }
+
+
+def old_duplicate_loop(df, existing_seps):
+    """Pola lama check_database_duplicates: iterrows + log INFO per baris"""
+    duplicates, new = [], []
+    for idx, row in df.iterrows():
+        sep_value = row.get('SEP')
+        if sep_value and sep_value in existing_seps:
+            duplicates.append({'row_index': idx, 'sep': sep_value, 'reason': 'SEP sudah ada di database'})
+            extractor_logger.info(f"Duplicate found: SEP {sep_value} at row {idx}")
+        else:
+            new.append({'row_index': idx, 'sep': sep_value})
+            extractor_logger.info(f"New record: SEP {sep_value} at row {idx}")
+    return duplicates, new
+
+
+def new_duplicate_mask(df, existing_seps):
+    """Pola baru: mask tervektorisasi + satu event ringkasan"""
+    sep = df['SEP']
+    duplicate_mask = (sep.notna() & (sep != '') & sep.isin(existing_seps)).to_numpy(dtype=bool)
+    duplicates = [{'row_index': idx, 'sep': sep_value, 'reason': 'SEP sudah ada di database'}
+                  for idx, sep_value in zip(df.index[duplicate_mask], sep[duplicate_mask])]
+    new = [{'row_index': idx, 'sep': sep_value}
+           for idx, sep_value in zip(df.index[~duplicate_mask], sep[~duplicate_mask])]
+    log_event(extractor_logger, 'database_duplicates_checked', new=len(new), duplicates=len(duplicates))
+    return duplicates, new
+
+
+def best_time(func, repeat=3):
+    """Waktu terbaik (detik) dari beberapa kali eksekusi"""
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+class _LineCounter(logging.Handler):
+    """Hitung jumlah dan panjang pesan yang benar-benar diformat"""
+
+    def __init__(self):
+        super().__init__()
+        self.records = 0
+        self.chars = 0
+
+    def emit(self, record):
+        self.records += 1
+        self.chars += len(self.format(record))
+
+
+def run_benchmark(rows=100000, duplicate_ratio=0.1, repeat=3):
+    """
+    Bandingkan waktu logging lama/baru dengan level log mati dan hidup
+
+    Returns:
+        Dict nama skenario -> {'off': (lama, baru), 'on': (lama, baru)} dalam detik
+    """
+    print(f"Building {rows} row frame ({duplicate_ratio:.0%} duplicate SEPs)...")
+    df, existing_seps = build_frame(rows, duplicate_ratio)
+    final_result = build_final_result(df, existing_seps)
+    extractor = RobustDataExtractor()
+
+    def log_final_old():
+        upload_logger.info(f"Upload process completed: {final_result}")
+
+    def log_final_new():
+        log_event(upload_logger, 'upload_completed', file=final_result['file_info']['filename'],
+                  success=final_result['success'], rows=final_result['total_rows'],
+                  rows_success=final_result['rows_success'], rows_failed=final_result['rows_failed'])
+
+    scenarios = {
+        'final_result log': (log_final_old, log_final_new, logging.INFO),
+        'duplicate check (per-row log)': (lambda: old_duplicate_loop(df, existing_seps),
+                                          lambda: new_duplicate_mask(df, existing_seps), logging.INFO),
+        'convert_date_columns': (None, lambda: extractor.convert_date_columns(df.copy()), logging.DEBUG),
+    }
+
+    root = logging.getLogger()
+    saved_handlers, saved_level = root.handlers[:], root.level
+    devnull = open(os.devnull, 'w')
+    sink = logging.StreamHandler(devnull)
+    sink.setFormatter(logging.Formatter('%(asctime)s %(levelname)s %(name)s: %(message)s'))
+    counter = _LineCounter()
+    root.handlers = [sink, counter]
+
+    results = {}
+    try:
+        print(f"\n  {'scenario':<30} {'level':<10} {'old':>10} {'new':>10} {'speedup':>8}")
+        for name, (old, new, level) in scenarios.items():
+            results[name] = {}
+            for state, root_level in (('off', logging.WARNING), ('on', level)):
+                root.setLevel(root_level)
+                time_old = best_time(old, repeat) if old else None
+                time_new = best_time(new, repeat)
+                results[name][state] = (time_old, time_new)
+                old_text = f"{time_old * 1000:>8.2f}ms" if old else f"{'-':>10}"
+                speedup = f"{time_old / time_new:>7.1f}x" if old else f"{'-':>8}"
+                level_text = f"{logging.getLevelName(level)} {state}"
+                print(f"  {name:<30} {level_text:<10} {old_text} {time_new * 1000:>8.2f}ms {speedup}")
+
+        # Ukuran output log per upload (level hidup)
+        root.setLevel(logging.INFO)
+        for label, func in (('old', lambda: (log_final_old(), old_duplicate_loop(df, existing_seps))),
+                            ('new', lambda: (log_final_new(), new_duplicate_mask(df, existing_seps)))):
+            counter.records = counter.chars = 0
+            func()
+            print(f"  INFO output per upload ({label}): {counter.records} lines, {counter.chars / 1e6:.2f} MB")
+            results[f'log_output_{label}'] = (counter.records, counter.chars)
+    finally:
+        root.handlers = saved_handlers
+        root.setLevel(saved_level)
+        devnull.close()
+
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Benchmark logging overhead in the upload pipeline')
+    parser.add_argument('--rows', type=int, default=100000, help='Rows in the synthetic upload frame')
+    parser.add_argument('--duplicates', type=float, default=0.1, help='Share of rows with an existing SEP')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per scenario (best time is reported)')
+    args = parser.parse_args()
+
+    run_benchmark(args.rows, args.duplicates, args.repeat)
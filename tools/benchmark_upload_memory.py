@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Benchmark memori pipeline DataFrame upload (tanpa database)
+
+Membuat DataFrame sintetis dengan kolom E-Klaim (default 200.000 baris x 78 kolom),
+lalu menjalankan langkah DataFrameManager seperti UploadService: set, validasi,
+pemisahan valid/duplikat (mask), penyesuaian harga INACBG pada kolom harga baris
+valid, konversi tipe per batch seperti BulkIngestService.ingest (tanpa insert)
+dan kolom ringkasan INACBG.
+Setelah setiap langkah ditampilkan memori yang masih dipegang pipeline di atas
+frame awal, dalam MB dan dalam kelipatan ukuran frame.
+
+Memori diukur dengan tracemalloc (buffer NumPy dan objek Python) ditambah
+alokasi pyarrow jika terinstall (kolom string pandas >= 3).
+
+Contoh:
+    python tools/benchmark_upload_memory.py --rows 200000 --duplicates 0.1
+"""
+import argparse
+import gc
+import sys
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+# Add src to path
+sys.path.append('src')
+
+from core.data_extractor import DataExtractor
+from core.dataframe_manager import DataFrameManager
+from core.inacbg_pricing import INACBGPricingEngine, DEFAULT_PRICING_COLUMNS
+from core.bulk_ingest import BulkIngestService
+from core.inacbg_summary import SUMMARY_SOURCE_COLUMNS
+
+try:
+    import pyarrow as pa
+except ImportError:  # pragma: no cover - pyarrow opsional
+    pa = None
+
+# Kolom teks (selain itu kolom angka)
+TEXT_COLUMNS = {
+    'KODE_RS', 'KELAS_RS', 'KODE_TARIF', 'DIAGLIST', 'PROCLIST', 'INACBG', 'DESKRIPSI_INACBG',
+    'DESKRIPSI_SP', 'DESKRIPSI_SR', 'DESKRIPSI_SI', 'DESKRIPSI_SD', 'NAMA_PASIEN', 'MRN', 'DPJP',
+    'SEP', 'NOKARTU', 'PAYOR_ID', 'CODER_ID', 'VERSI_INACBG', 'VERSI_GROUPER', 'C1', 'C2', 'C3', 'C4',
+    'ADL1', 'ADL2', 'SUBACUTE', 'CHRONIC', 'SP', 'SR', 'SI', 'SD'
+}
+
+INACBG_CODES = np.array(['K-4-17-I', 'A-4-10-0', 'J-1-20-II', 'O-6-10-III', 'Z-3-27-0', 'Q-5-44-0'])
+
+
+def build_frame(rows, seed=42):
+    """DataFrame sintetis dengan kolom file E-Klaim (teks sebagai dtype str seperti read_csv)"""
+    rng = np.random.default_rng(seed)
+    data = {}
+    for col in DataExtractor().required_columns:
+        if col == 'SEP':
+            values = [f"0224R{n:014d}" for n in range(rows)]
+        elif col == 'INACBG':
+            values = INACBG_CODES[rng.integers(0, len(INACBG_CODES), rows)].tolist()
+        elif col in TEXT_COLUMNS:
+            values = [f"{col[:3]}-{n}" for n in rng.integers(0, 5000, rows)]
+        else:
+            data[col] = rng.integers(0, 10_000_000, rows).astype('float64')
+            continue
+        data[col] = pd.Series(values, dtype='str')
+    return pd.DataFrame(data)
+
+
+def arrow_bytes():
+    """Memori yang sedang dialokasikan pyarrow (0 jika tidak terinstall)"""
+    return pa.total_allocated_bytes() if pa is not None else 0
+
+
+def run_benchmark(rows=200000, duplicate_ratio=0.1):
+    """
+    Jalankan langkah pipeline dan tampilkan memori per langkah
+
+    Returns:
+        Dict dengan ukuran frame dan memori puncak tambahan
+    """
+    print(f"Building {rows} x {len(DataExtractor().required_columns)} frame...")
+    df = build_frame(rows)
+    frame_bytes = int(df.memory_usage(deep=True).sum())
+    existing_seps = df['SEP'].iloc[:int(rows * duplicate_ratio)].tolist()
+    pricing_engine = INACBGPricingEngine()
+    bulk_ingest = BulkIngestService()
+    gc.collect()
+
+    tracemalloc.start()
+    arrow_baseline = arrow_bytes()
+    peak_extra = 0
+    manager = DataFrameManager()
+
+    def report(step):
+        nonlocal peak_extra
+        traced, traced_peak = tracemalloc.get_traced_memory()
+        arrow_extra = arrow_bytes() - arrow_baseline
+        extra = traced + arrow_extra
+        # Puncak tracemalloc selama langkah (temporary ikut terhitung) + alokasi pyarrow saat ini
+        peak_extra = max(peak_extra, extra, traced_peak + arrow_extra)
+        tracemalloc.reset_peak()
+        print(f"  {step:<32} {extra / 1e6:>9.1f} MB  {extra / frame_bytes:>5.2f}x frame")
+
+    print(f"Frame size (deep): {frame_bytes / 1e6:.1f} MB, {duplicate_ratio:.0%} duplicate SEPs")
+    print(f"  {'step':<32} {'held above frame':>12}")
+
+    manager.set_dataframe(df)
+    report('set_dataframe')
+
+    manager.validate_dataframe()
+    report('validate_dataframe')
+
+    manager.separate_valid_duplicate_data(existing_seps)
+    report('separate_valid_duplicate_data')
+
+    pricing_data = manager.get_valid_columns(['INACBG'] + DEFAULT_PRICING_COLUMNS)
+    pricing_data, stats = pricing_engine.apply(pricing_data, DEFAULT_PRICING_COLUMNS)
+    manager.set_valid_columns(pricing_data[stats['adjusted_columns']])
+    del pricing_data
+    report('pricing (valid price columns)')
+
+    # Sama seperti BulkIngestService.ingest dengan row_mask, tanpa insert
+    frame, mask = manager.get_valid_frame()
+    for start in range(0, len(frame), bulk_ingest.batch_size):
+        batch = frame.iloc[start:start + bulk_ingest.batch_size]
+        if mask is not None:
+            batch = batch[mask[start:start + bulk_ingest.batch_size]]
+        bulk_ingest.prepare_frame(batch, 1, log_unknown=False)
+    del frame, mask, batch
+    report('prepare ingest batches')
+
+    summary_data = manager.get_valid_columns(SUMMARY_SOURCE_COLUMNS)
+    del summary_data
+    report('summary columns')
+
+    manager.clear_dataframe()
+    gc.collect()
+    report('clear_dataframe')
+
+    tracemalloc.stop()
+    print(f"Peak above frame: {peak_extra / 1e6:.1f} MB ({peak_extra / frame_bytes:.2f}x frame)")
+
+    return {
+        'frame_bytes': frame_bytes,
+        'peak_extra_bytes': peak_extra
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Benchmark DataFrame memory in the upload pipeline')
+    parser.add_argument('--rows', type=int, default=200000, help='Rows in the synthetic upload frame')
+    parser.add_argument('--duplicates', type=float, default=0.1, help='Share of rows with an existing SEP')
+    args = parser.parse_args()
+
+    run_benchmark(args.rows, args.duplicates)
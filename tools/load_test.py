@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+Load test sederhana untuk server produksi (gunicorn) yang sudah berjalan
+
+Menjalankan sejumlah client thread dengan koneksi keep-alive ke beberapa endpoint
+selama durasi tertentu, lalu menampilkan requests per second total, per endpoint
+dan per worker process. Jumlah worker dihitung dari pid yang dikembalikan
+/health/ready (atau diisi manual lewat --workers).
+
+Contoh:
+    WEB_WORKERS=4 WEB_THREADS=4 gunicorn -c gunicorn.conf.py wsgi:app
+    python tools/load_test.py --url http://localhost:5000 --concurrency 32 --duration 30
+
+Endpoint yang butuh login bisa dites dengan cookie session dari browser:
+    python tools/load_test.py --path /keuangan/page?per_page=100 --cookie "session=..."
+"""
+import argparse
+import http.client
+import json
+import statistics
+import sys
+import threading
+import time
+from collections import Counter, defaultdict
+from urllib.parse import urlsplit
+
+DEFAULT_PATHS = [
+    '/health/ready',
+    '/api/data/keuangan?per_page=100',
+    '/api/data/los?per_page=100'
+]
+
+
+class LoadWorker(threading.Thread):
+    """Client thread: kirim request berulang ke daftar path sampai waktu habis"""
+
+    def __init__(self, index, base_url, paths, deadline, headers):
+        super().__init__(name=f"load-client-{index}", daemon=True)
+        self.base = urlsplit(base_url)
+        self.paths = paths
+        self.deadline = deadline
+        self.headers = headers
+        self.offset = index
+        self.latencies = defaultdict(list)
+        self.statuses = Counter()
+        self.pids = Counter()
+        self.errors = 0
+
+    def _connect(self):
+        connection_class = http.client.HTTPSConnection if self.base.scheme == 'https' else http.client.HTTPConnection
+        return connection_class(self.base.hostname, self.base.port, timeout=60)
+
+    def run(self):
+        connection = self._connect()
+        i = self.offset
+        while time.perf_counter() < self.deadline:
+            path = self.paths[i % len(self.paths)]
+            i += 1
+            start = time.perf_counter()
+            try:
+                connection.request('GET', path, headers=self.headers)
+                response = connection.getresponse()
+                body = response.read()
+            except (OSError, http.client.HTTPException):
+                self.errors += 1
+                connection.close()
+                connection = self._connect()
+                continue
+
+            self.latencies[path].append(time.perf_counter() - start)
+            self.statuses[response.status] += 1
+            if path.startswith('/health/') and response.status == 200:
+                try:
+                    self.pids[json.loads(body)['pid']] += 1
+                except (ValueError, KeyError):
+                    pass
+        connection.close()
+
+
+def percentile(values, pct):
+    """Persentil sederhana (nearest rank) dari daftar latency"""
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def check_ready(base_url):
+    """Pastikan server siap (GET /health/ready) sebelum load test dimulai"""
+    base = urlsplit(base_url)
+    connection_class = http.client.HTTPSConnection if base.scheme == 'https' else http.client.HTTPConnection
+    connection = connection_class(base.hostname, base.port, timeout=10)
+    try:
+        connection.request('GET', '/health/ready')
+        response = connection.getresponse()
+        body = response.read()
+    except OSError as e:
+        print(f"Server not reachable at {base_url}: {e}")
+        return False
+    finally:
+        connection.close()
+
+    if response.status != 200:
+        print(f"Server not ready ({response.status}): {body.decode('utf-8', 'replace')}")
+        return False
+    return True
+
+
+def run_load_test(base_url, paths, concurrency, duration, workers=None, cookie=None):
+    """
+    Jalankan load test dan tampilkan ringkasan
+
+    Args:
+        base_url: URL server, misal http://localhost:5000
+        paths: Daftar path yang di-request bergantian
+        concurrency: Jumlah client thread
+        duration: Durasi test dalam detik
+        workers: Jumlah worker server (default: jumlah pid dari /health/ready)
+        cookie: Header Cookie untuk endpoint yang butuh login
+
+    Returns:
+        Dict ringkasan hasil
+    """
+    if not check_ready(base_url):
+        return None
+
+    headers = {'Accept-Encoding': 'gzip'}
+    if cookie:
+        headers['Cookie'] = cookie
+
+    print(f"Load testing {base_url} with {concurrency} clients for {duration}s")
+    for path in paths:
+        print(f"  GET {path}")
+
+    deadline = time.perf_counter() + duration
+    clients = [LoadWorker(i, base_url, paths, deadline, headers) for i in range(concurrency)]
+    started = time.perf_counter()
+    for client in clients:
+        client.start()
+    for client in clients:
+        client.join()
+    elapsed = time.perf_counter() - started
+
+    latencies = defaultdict(list)
+    statuses = Counter()
+    pids = Counter()
+    errors = 0
+    for client in clients:
+        for path, values in client.latencies.items():
+            latencies[path].extend(values)
+        statuses.update(client.statuses)
+        pids.update(client.pids)
+        errors += client.errors
+
+    total = sum(len(values) for values in latencies.values())
+    rps = total / elapsed if elapsed else 0
+    worker_count = workers or len(pids) or 1
+
+    print()
+    print(f"{'endpoint':<45} {'requests':>9} {'req/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    for path in paths:
+        values = latencies.get(path, [])
+        if not values:
+            print(f"{path:<45} {0:>9}")
+            continue
+        print(f"{path:<45} {len(values):>9} {len(values) / elapsed:>9.1f} "
+              f"{statistics.median(values) * 1000:>8.1f} {percentile(values, 95) * 1000:>8.1f} "
+              f"{percentile(values, 99) * 1000:>8.1f}")
+
+    print()
+    print(f"Total requests : {total} in {elapsed:.1f}s ({errors} connection errors)")
+    print(f"Status codes   : {dict(sorted(statuses.items()))}")
+    print(f"Requests/sec   : {rps:.1f}")
+    print(f"Workers        : {worker_count}" + ("" if workers else " (distinct pids seen on /health/ready)"))
+    print(f"Req/sec/worker : {rps / worker_count:.1f}")
+    if pids:
+        print("Health requests per worker pid:")
+        for pid, count in sorted(pids.items()):
+            print(f"  pid {pid}: {count}")
+
+    return {
+        'requests': total,
+        'errors': errors,
+        'elapsed': elapsed,
+        'rps': rps,
+        'workers': worker_count,
+        'rps_per_worker': rps / worker_count
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Load test the running web server')
+    parser.add_argument('--url', default='http://localhost:5000', help='Server base URL')
+    parser.add_argument('--path', action='append', dest='paths',
+                        help='Path to request (repeatable, default: health + /api/data views)')
+    parser.add_argument('--concurrency', type=int, default=16, help='Concurrent client threads')
+    parser.add_argument('--duration', type=float, default=20, help='Test duration in seconds')
+    parser.add_argument('--workers', type=int, help='Server worker count (default: detected from pids)')
+    parser.add_argument('--cookie', help='Cookie header for endpoints that require login')
+    args = parser.parse_args()
+
+    result = run_load_test(args.url.rstrip('/'), args.paths or DEFAULT_PATHS,
+                           args.concurrency, args.duration, args.workers, args.cookie)
+    return result is not None and result['requests'] > 0
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
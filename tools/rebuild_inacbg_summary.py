@@ -0,0 +1,33 @@
+#!/usr/bin/env python3
+"""
+Script untuk menghitung ulang tabel ringkasan inacbg_monthly_summary dari data_analytics
+
+Jalankan setelah tabel ringkasan pertama kali dibuat, atau setelah data_analytics
+diubah di luar alur upload (misal lewat SQL manual atau tools lain).
+"""
+import sys
+
+# Add src to path
+sys.path.append('src')
+
+# Import Flask app untuk application context
+from web.app import create_app
+from core.inacbg_summary import InacbgSummaryService
+
+def rebuild_summary():
+    """Rebuild seluruh ringkasan INACBG dalam satu transaksi"""
+    app = create_app()
+    with app.app_context():
+        print("Rebuilding inacbg_monthly_summary from data_analytics...")
+        result = InacbgSummaryService().rebuild()
+        
+        if not result['success']:
+            print(f"Rebuild failed: {result['error']}")
+            return False
+        
+        print(f"Rebuild completed: {result['buckets']} buckets")
+        return True
+
+if __name__ == "__main__":
+    success = rebuild_summary()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Script untuk menjalankan migration kolom tanggal data_analytics dari TEXT ke TIMESTAMP/DATE
+"""
+import sys
+import os
+
+# Add src to path
+sys.path.append('src')
+
+# Import Flask app untuk application context
+from web.app import create_app
+from core.database import db
+from sqlalchemy import text
+
+DATE_COLUMNS = ['admission_date', 'discharge_date', 'birth_date']
+
+def get_column_types():
+    """Ambil tipe data kolom tanggal di tabel data_analytics"""
+    result = db.session.execute(text("""
+        SELECT column_name, data_type
+        FROM information_schema.columns
+        WHERE table_name = 'data_analytics'
+        AND column_name IN ('admission_date', 'discharge_date', 'birth_date')
+    """))
+    return {row.column_name: row.data_type for row in result}
+
+def run_migration():
+    """Jalankan migration untuk mengubah kolom tanggal menjadi TIMESTAMP/DATE"""
+    app = create_app()
+    with app.app_context():
+        try:
+            column_types = get_column_types()
+            text_columns = [col for col in DATE_COLUMNS if column_types.get(col) == 'text']
+            
+            if not text_columns:
+                print("Date columns are already typed, skipping migration.")
+                return True
+            
+            print(f"Starting migration: Convert {', '.join(text_columns)} to typed date columns...")
+            
+            # Read migration SQL
+            migration_file = 'migrations/convert_data_analytics_dates.sql'
+            if not os.path.exists(migration_file):
+                print(f"Migration file not found: {migration_file}")
+                return False
+            
+            with open(migration_file, 'r', encoding='utf-8') as f:
+                migration_sql = f.read()
+            
+            # Buang baris komentar lalu split SQL statements
+            migration_sql = '\n'.join(
+                line for line in migration_sql.splitlines() if not line.strip().startswith('--')
+            )
+            statements = [stmt.strip() for stmt in migration_sql.split(';') if stmt.strip()]
+            
+            # Lewati ALTER untuk kolom yang sudah bertipe tanggal
+            statements = [
+                stmt for stmt in statements
+                if not any(f"ALTER COLUMN {col} " in stmt for col in DATE_COLUMNS if col not in text_columns)
+            ]
+            
+            # Semua ALTER dijalankan dalam satu transaksi
+            for i, statement in enumerate(statements, 1):
+                print(f"Executing statement {i}/{len(statements)}...")
+                db.session.execute(text(statement))
+            
+            db.session.commit()
+            
+            column_types = get_column_types()
+            for col in DATE_COLUMNS:
+                print(f"  {col}: {column_types.get(col)}")
+            
+            print("Migration completed successfully!")
+            return True
+            
+        except Exception as e:
+            print(f"Migration failed: {e}")
+            db.session.rollback()
+            return False
+
+if __name__ == "__main__":
+    print("=== Date Columns Migration Tool ===")
+    
+    success = run_migration()
+    
+    if success:
+        sys.exit(0)
+    else:
+        print("Migration failed!")
+        sys.exit(1)
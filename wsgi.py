@@ -0,0 +1,15 @@
+#!/usr/bin/env python3
+"""
+WSGI entry point for production servers (gunicorn)
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+"""
+import sys
+import os
+
+# Add the src directory to Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+from web.app import create_app
+
+app = create_app()